@@ -1,12 +1,21 @@
+import backup_archive
+import config_check
+import config_template
+import device_errors
+import device_ops
+import device_picker
+import fleet
+import messages
 import Settings
 from datetime import datetime
-from time import sleep
-from message_handler import LoggingMessageHandler
-from netmiko import ConnectHandler
-from netmiko.ssh_exception import NetMikoTimeoutException, NetMikoAuthenticationException
-from PyQt5.QtCore import QThread, pyqtSignal
-from PyQt5.QtWidgets import QFileDialog, QGridLayout, QPlainTextEdit, QPushButton, QWidget, QMessageBox
-from serial.serialutil import SerialException
+from fleet_view import FleetView
+from inventory import device_name
+from load_checkpoint import checkpoints
+from load_engine import PushTimeout
+from message_handler import LoggingMessageHandler, MAX_BLOCKS
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
+from PyQt5.QtWidgets import (QCheckBox, QFileDialog, QGridLayout, QGroupBox, QPlainTextEdit, QPushButton, QSpinBox,
+                             QVBoxLayout, QWidget, QMessageBox)
 
 __author__ = "Jason Hernandez"
 __copyright__ = "Copyright 2018"
@@ -18,77 +27,117 @@ __email__ = "JThern@github"
 
 class LoadThread(QThread):
     signal = pyqtSignal('PyQt_PyObject')
+    progress = pyqtSignal(str, 'PyQt_PyObject')  # fleet mode - device name, message
+    device_done = pyqtSignal(str, bool, 'PyQt_PyObject')  # fleet mode - device name, ok, result
     # This Class threads the connection so we don't freeze the entire program waiting on the connection to take place.
 
     def __init__(self):
         QThread.__init__(self)
         self.config = ''
+        self.incremental = False  # only send what differs from the running config
+        self.remove = False  # with incremental, also take out lines the config doesn't have
+        self.resume = False  # carry on from the checkpoint of a load that failed part way
+        self.template = None  # a config_template.Template, rendered for each device instead of config
+        self.variables = None  # the config_template.Variables it is rendered with
+
+    def config_for(self, device):
+        """ The config to load on the device, rendered from the template if there is one. """
+
+        if self.template is None:
+            return self.config
+        return config_template.config_for(self.template, self.variables, device)
 
     # run method gets called when we start() the thread
     def run(self):
-        if self.config == '':
+        if self.config == '' and self.template is None:
             self.signal.emit("No config to load.")
             return
+        if Settings.fleet_mode:
+            self.run_fleet()
+            return
         if Settings.device == []:
             self.signal.emit("Enter Credentials on Router Info tab.")
             self.signal.emit("Once entered click Verify.")
             return
+        try:
+            config = self.config_for(Settings.device)
+        except config_template.TemplateError as e:
+            self.signal.emit(messages.error(str(e)))
+            return
         if Settings.device['device_type'] == 'cisco_ios_serial':
             device = Settings.device
             try:
-                router = ConnectHandler(**device)  # Connect to the Device
-                self.signal.emit('...connected...')
-                router.enable()
-                router.config_mode()
-                for line in self.config.splitlines():
-                    self.signal.emit(line)
-                    router.send_command(line, delay_factor=3, auto_find_prompt=False)
-                router.exit_config_mode()
-                new_config = router.send_command('show run')
-                self.signal.emit(new_config)
-                router.send_command('wr')
-                router.config_mode()
-                router.disconnect()
-                self.signal.emit('Load Complete')
-            except SerialException:
-                self.signal.emit("Console Error: Make sure you have connectivity.")
+                self.signal.emit(device_ops.load_config(device, config, self.signal.emit,
+                                                        self.incremental, self.remove, self.resume))
+            except device_errors.SerialException:
+                self.signal.emit(messages.error("Console Error: Make sure you have connectivity."))
             except OSError:
-                self.signal.emit("Console Error: Make sure you have connectivity.")
+                self.signal.emit(messages.error("Console Error: Make sure you have connectivity."))
             except ValueError:
-                self.signal.emit("Console Error: Make sure you have connectivity.")
-            except NetMikoTimeoutException:
-                self.signal.emit("Timeout Error: Make sure you are still connected")
-            except NetMikoAuthenticationException:
-                self.signal.emit("Check your username/password. Make sure you have an account on this device.")
+                self.signal.emit(messages.error("Console Error: Make sure you have connectivity."))
+            except (device_errors.NetMikoTimeoutException, PushTimeout):
+                self.signal.emit(messages.error("Timeout Error: Make sure you are still connected"))
+            except device_errors.NetMikoAuthenticationException:
+                self.signal.emit(messages.error(
+                    "Check your username/password. Make sure you have an account on this device."))
         else:
             device = Settings.device
             try:
-                router = ConnectHandler(**device)  # Connect to the Device
-                self.signal.emit('...connected...')
-                router.enable()
-                self.signal.emit('...this may take a while...')
-                router.config_mode()
-                for line in self.config.splitlines():
-                    self.signal.emit(line)
-                    router.send_command(line, delay_factor=2, auto_find_prompt=False)
-                router.exit_config_mode()
-                new_config = router.send_command('show run')
-                self.signal.emit(new_config)
-                router.send_command('wr')
-                router.disconnect()
-                self.signal.emit('Load Complete')
+                self.signal.emit(device_ops.load_config(device, config, self.signal.emit,
+                                                        self.incremental, self.remove, self.resume))
             except OSError:
-                self.signal.emit("Verify connection")
+                self.signal.emit(messages.error("Verify connection"))
             except ValueError:
-                self.signal.emit("User does not have permission to make these changes.")
-            except NetMikoTimeoutException:
-                self.signal.emit("SSH Error: Make sure the IP address is correct.")
-            except NetMikoAuthenticationException:
-                self.signal.emit("Check your username/password. Make sure you have an account on this device.")
+                self.signal.emit(messages.error("User does not have permission to make these changes."))
+            except device_errors.NetMikoTimeoutException:
+                self.signal.emit(messages.error("SSH Error: Make sure the IP address is correct."))
+            except PushTimeout:
+                self.signal.emit(messages.error("Timeout Error: Make sure you are still connected"))
+            except device_errors.NetMikoAuthenticationException:
+                self.signal.emit(messages.error(
+                    "Check your username/password. Make sure you have an account on this device."))
+        checkpoint = checkpoints.unfinished(Settings.device, config)
+        if checkpoint is not None:  # it failed part way
+            self.signal.emit(f"Lines 1-{checkpoint['confirmed']} of {checkpoint['lines']} were loaded, "
+                             f"Resume carries on from there.")
+
+    def _unfinished(self, device):  # True if the device has a checkpoint for its config
+        try:
+            return checkpoints.unfinished(device, self.config_for(device)) is not None
+        except config_template.TemplateError:
+            return False  # its load never started
+
+    def run_fleet(self):
+        if Settings.inventory == []:
+            self.signal.emit("Open an inventory on the Router Info tab.")
+            return
+        config_for, incremental, remove, resume = self.config_for, self.incremental, self.remove, self.resume
+
+        def load(device, emit):  # a template is rendered as each device's load starts
+            return device_ops.load_config(device, config_for(device), emit, incremental, remove, resume)
+
+        if Settings.async_io:
+            import async_ops  # asyncio isn't loaded until it is wanted
+
+            def async_load(device, emit):
+                return async_ops.load_config(device, config_for(device), emit, incremental, remove, resume)
+
+            results = async_ops.run_fleet(Settings.inventory, async_load, load, self.progress.emit,
+                                          self.device_done.emit, describe_error=device_ops.describe_error)
+        else:
+            results = fleet.run_fleet(Settings.inventory, load, self.progress.emit, self.device_done.emit,
+                                      Settings.max_workers, device_ops.describe_error)
+        self.signal.emit(fleet.summary('load', results))
+        unfinished = sum(self._unfinished(device) for device in Settings.inventory
+                         if not results[device_name(device)][0])
+        if unfinished:
+            self.signal.emit(f'{unfinished} devices failed part way, Resume carries on where each one stopped.')
 
 
 class BackupThread(QThread):
     signal = pyqtSignal('PyQt_PyObject')
+    progress = pyqtSignal(str, 'PyQt_PyObject')  # fleet mode - device name, message
+    device_done = pyqtSignal(str, bool, 'PyQt_PyObject')  # fleet mode - device name, ok, result
     # This Class threads the connection so we don't freeze the entire program waiting on the connection to take place.
 
     def __init__(self):
@@ -97,6 +146,9 @@ class BackupThread(QThread):
     # run method gets called when we start() the thread
     def run(self):
         today = datetime.now().strftime('%Y%m%d-%H%M')
+        if Settings.fleet_mode:
+            self.run_fleet(today)
+            return
         if Settings.device == []:
             self.signal.emit("Enter Credentials on Router Info tab.")
             self.signal.emit("Once entered click Verify.")
@@ -104,50 +156,82 @@ class BackupThread(QThread):
         if Settings.device['device_type'] == 'cisco_ios_serial':
             device = Settings.device
             try:
-                save_file = open(f'Backup Config {today}.txt', mode='w')
-                router = ConnectHandler(**device)  # Connect to the Device
-                self.signal.emit('...connected...')
-                router.enable()
-                self.signal.emit('...this may take a while...')
-                config = router.send_command('show run')
-                self.signal.emit(config)
-                save_file.write(config)
-                save_file.close()
-                router.disconnect()
-                self.signal.emit('Configuration pulled')
-            except SerialException:
-                self.signal.emit("Console Error: Make sure you have connectivity.")
+                self.signal.emit(device_ops.backup_config(device, self.signal.emit, f'Backup Config {today}.txt',
+                                                          self.isInterruptionRequested))
+            except device_ops.Cancelled:
+                self.signal.emit("Cancelled.")
+            except device_errors.SerialException:
+                self.signal.emit(messages.error("Console Error: Make sure you have connectivity."))
             except OSError:
-                self.signal.emit("Console Error: Make sure you have connectivity.")
+                self.signal.emit(messages.error("Console Error: Make sure you have connectivity."))
             except ValueError:
-                self.signal.emit("Console Error: Make sure you have connectivity.")
-            except NetMikoTimeoutException:
-                self.signal.emit("Timeout Error: Make sure you are still connected")
-            except NetMikoAuthenticationException:
-                self.signal.emit("Check your username/password. Make sure you have an account on this device.")
+                self.signal.emit(messages.error("Console Error: Make sure you have connectivity."))
+            except device_errors.NetMikoTimeoutException:
+                self.signal.emit(messages.error("Timeout Error: Make sure you are still connected"))
+            except device_errors.NetMikoAuthenticationException:
+                self.signal.emit(messages.error(
+                    "Check your username/password. Make sure you have an account on this device."))
         else:
             device = Settings.device
             try:
-                save_file = open(f'Backup Config {today}.txt', mode='w')
                 self.signal.emit('Connecting....')
-                router = ConnectHandler(**device)  # Connect to the Device
-                self.signal.emit('...connected...')
-                router.enable()
-                self.signal.emit('...this may take a while...')
-                config = router.send_command('show run')
-                self.signal.emit(config)
-                save_file.write(config)
-                save_file.close()
-                router.disconnect()
-                self.signal.emit('Configuration pulled')
+                self.signal.emit(device_ops.backup_config(device, self.signal.emit, f'Backup Config {today}.txt',
+                                                          self.isInterruptionRequested))
+            except device_ops.Cancelled:
+                self.signal.emit("Cancelled.")
             except ValueError:
-                self.signal.emit("User does not have permission to make these changes.")
+                self.signal.emit(messages.error("User does not have permission to make these changes."))
             except TimeoutError:
-                self.signal.emit("Telnet Error: Make sure the IP address is correct.")
-            except NetMikoTimeoutException:
-                self.signal.emit("SSH Error: Make sure the IP address is correct.")
-            except NetMikoAuthenticationException:
-                self.signal.emit("Check your username/password. Make sure you have an account on this device.")
+                self.signal.emit(messages.error("Telnet Error: Make sure the IP address is correct."))
+            except device_errors.NetMikoTimeoutException:
+                self.signal.emit(messages.error("SSH Error: Make sure the IP address is correct."))
+            except device_errors.NetMikoAuthenticationException:
+                self.signal.emit(messages.error(
+                    "Check your username/password. Make sure you have an account on this device."))
+
+    def run_fleet(self, today):
+        if Settings.inventory == []:
+            self.signal.emit("Open an inventory on the Router Info tab.")
+            return
+
+        def file_name(device):
+            return f'Backup Config {device_name(device).replace("/", "_")} {today}.txt'
+
+        def backup(device, emit):
+            return device_ops.backup_config(device, emit, file_name(device), self.isInterruptionRequested)
+
+        if Settings.async_io:
+            import async_ops  # asyncio isn't loaded until it is wanted
+
+            def async_backup(device, emit):
+                return async_ops.backup_config(device, emit, file_name(device), self.isInterruptionRequested)
+
+            results = async_ops.run_fleet(Settings.inventory, async_backup, backup, self.progress.emit,
+                                          self.device_done.emit, describe_error=device_ops.describe_error)
+        else:
+            results = fleet.run_fleet(Settings.inventory, backup, self.progress.emit, self.device_done.emit,
+                                      Settings.max_workers, device_ops.describe_error)
+        self.signal.emit(fleet.summary('backup', results))
+
+
+class ArchiveThread(QThread):
+    signal = pyqtSignal('PyQt_PyObject')
+    # Scheduled backups of the device, or every device in fleet mode, into the backup archive.
+
+    def __init__(self):
+        QThread.__init__(self)
+        self.archive = backup_archive.Archive()
+
+    # run method gets called when we start() the thread
+    def run(self):
+        devices = Settings.inventory if Settings.fleet_mode else [Settings.device] if Settings.device else []
+        if devices == []:
+            self.signal.emit("Scheduled backup skipped, enter credentials or open an inventory on Router Info.")
+            return
+        results = backup_archive.archive_fleet(devices, self.archive, lambda name, message: None,
+                                               max_workers=Settings.max_workers, cancelled=self.isInterruptionRequested)
+        when = datetime.now().strftime('%H:%M')
+        self.signal.emit(f'{when} scheduled backup to {self.archive.path}: ' + fleet.summary('backup', results))
 
 
 class ZeroizeThread(QThread):
@@ -166,37 +250,18 @@ class ZeroizeThread(QThread):
         if Settings.device['device_type'] == 'cisco_ios_serial':
             device = Settings.device
             try:
-                router = ConnectHandler(**device)  # Connect to the Device
-                router.enable()
-                self.signal.emit('...connected...')
-                erase = router.send_command_timing('wr er')
-                if 'Erasing' in erase:
-                    router.send_command_timing('y')
-                    self.signal.emit('Erase succeed')
-                else:
-                    self.signal.emit('erase fail')
-                sleep(5)
-                reload = router.send_command_timing('reload')
-                if 'Proceed' in reload:
-                    router.send_command_timing('y')
-                    self.signal.emit('Reload succeed')
-                else:
-                    self.signal.emit('Reload fail')
-                self.signal.emit('Router reloading....\n'
-                                 'After Reboot, username and password can be anything.\n'
-                                 'Ensure the correct com port is selected.\n'
-                                 'Reboot times may vary allow for 3-5 minutes.')
-                router.disconnect()
-            except SerialException:
-                self.signal.emit("Console Error: Make sure you have connectivity.")
+                self.signal.emit(device_ops.zeroize(device, self.signal.emit))
+            except device_errors.SerialException:
+                self.signal.emit(messages.error("Console Error: Make sure you have connectivity."))
             except OSError:
-                self.signal.emit("Console Error: Make sure you have connectivity.")
+                self.signal.emit(messages.error("Console Error: Make sure you have connectivity."))
             except ValueError:
-                self.signal.emit("Console Error: Make sure you have connectivity.")
-            except NetMikoTimeoutException:
-                self.signal.emit("Timeout Error: Make sure you are still connected")
-            except NetMikoAuthenticationException:
-                self.signal.emit("Check your username/password. Make sure you have an account on this device.")
+                self.signal.emit(messages.error("Console Error: Make sure you have connectivity."))
+            except device_errors.NetMikoTimeoutException:
+                self.signal.emit(messages.error("Timeout Error: Make sure you are still connected"))
+            except device_errors.NetMikoAuthenticationException:
+                self.signal.emit(messages.error(
+                    "Check your username/password. Make sure you have an account on this device."))
         else:
             self.signal.emit("Zeroize only possible over Console.")
 
@@ -214,7 +279,15 @@ class LoadPage(QWidget):
         '''Pulls from router tab hopefully'''
 
         self._log_viewer = QPlainTextEdit(readOnly=True)
-        layout.addWidget(self._log_viewer, 0, 0, 5, 1)
+        layout.addWidget(self._log_viewer, 0, 0, 7, 1)
+        self.logger = LoggingMessageHandler(bool(), self._log_viewer, buffered=True, max_blocks=MAX_BLOCKS)
+
+        self.fleet_view = FleetView()  # only shown in fleet mode, click a device to see its output
+        self.fleet_view.cellClicked.connect(self._show_device)
+        self.fleet_view.hide()
+        layout.addWidget(self.fleet_view, 7, 0, 1, 2)
+        self.device_bar = device_picker.DeviceBar()  # what Load and Pull work on, pick it from the device store
+        layout.addWidget(self.device_bar, 8, 0, 1, 2)
 
         self.openfile = QPushButton("Open", clicked=self._open)
         self.openfile.setToolTip("Open a text Config.")
@@ -225,18 +298,67 @@ class LoadPage(QWidget):
         layout.addWidget(self._backup_config, 1, 1)
         self.backup_thread = BackupThread()
         self.backup_thread.signal.connect(self.finished)
+        self.backup_thread.finished.connect(self._done)
+        self.backup_thread.progress.connect(self.fleet_view.progress)
+        self.backup_thread.device_done.connect(self.fleet_view.done)
 
         self.load = QPushButton("Load", clicked=self._load)  # The load button which carries out the load logic.
         self.load.setToolTip("Load a new configuration.")
         layout.addWidget(self.load, 2, 1)
         self.load_thread = LoadThread()
         self.load_thread.signal.connect(self.finished)
+        self.load_thread.finished.connect(self._done)
+        self.load_thread.progress.connect(self.fleet_view.progress)
+        self.load_thread.device_done.connect(self.fleet_view.done)
+
+        load_options = QGroupBox("Load")
+        load_options_layout = QVBoxLayout()
+        self._incremental = QCheckBox("Only changes", checked=False, stateChanged=self._incremental_button)
+        self._incremental.setToolTip("Compare with the running config and only send the lines that differ.")
+        load_options_layout.addWidget(self._incremental)
+        self._remove = QCheckBox("Remove extras", checked=False, stateChanged=self._remove_button)
+        self._remove.setToolTip("With Only changes, also remove lines that are on the router but not in the config.")
+        self._remove.setEnabled(False)
+        load_options_layout.addWidget(self._remove)
+        self.resume = QPushButton("Resume", clicked=self._resume)
+        self.resume.setToolTip("Carry on a load of this config that failed part way, from the last section it applied.")
+        load_options_layout.addWidget(self.resume)
+        self._template = QPushButton("Template", clicked=self._open_template)
+        self._template.setToolTip("Open a config template and a CSV or YAML of variables with a host column,\n"
+                                  "each device gets the template rendered with its row.")
+        load_options_layout.addWidget(self._template)
+        load_options.setLayout(load_options_layout)
+        layout.addWidget(load_options, 5, 1)
+
+        schedule = QGroupBox("Scheduled backup")
+        schedule_layout = QVBoxLayout()
+        self._schedule = QCheckBox("Back up every", checked=False, stateChanged=self._schedule_button)
+        self._schedule.setToolTip("Pull the config (every device in fleet mode) into the Backups archive on a timer.")
+        schedule_layout.addWidget(self._schedule)
+        self._interval = QSpinBox(minimum=5, maximum=24 * 60, value=60, suffix=' min')
+        self._interval.valueChanged.connect(self._interval_changed)
+        schedule_layout.addWidget(self._interval)
+        self._changed = QPushButton("Changed?", clicked=self._show_changed)
+        self._changed.setToolTip("Which devices changed at their last scheduled backup.")
+        schedule_layout.addWidget(self._changed)
+        schedule.setLayout(schedule_layout)
+        layout.addWidget(schedule, 6, 1)
+        self.archive_thread = ArchiveThread()
+        self.archive_thread.signal.connect(self.finished)
+        self.archive_thread.finished.connect(self._archive_done)
+        self.archive_timer = QTimer(self, timeout=self._scheduled_backup)
 
         self.zero = QPushButton("Zeroize", clicked=self._zero)  # The Zero button which carries out the zeroize logic.
         self.zero.setToolTip("Restore the router to factory default settings.")
         layout.addWidget(self.zero, 4, 1)
         self.zero_thread = ZeroizeThread()
         self.zero_thread.signal.connect(self.finished)
+        self.zero_thread.finished.connect(self._done)
+
+        self.cancel = QPushButton("Cancel", clicked=self._cancel)
+        self.cancel.setToolTip("Stop pulling the configuration, or the scheduled backup.")
+        self.cancel.setEnabled(False)
+        layout.addWidget(self.cancel, 3, 1)
 
         self.setLayout(layout)  # Displays the layout
 
@@ -244,7 +366,7 @@ class LoadPage(QWidget):
 
     def _open(self, _):
         """ Invoked when the user clicks the open button. """
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
+        logger = self.logger
         fltr = "Text or Config (*.txt *.cfg)"
         obj = QFileDialog.getOpenFileName(self, 'Config to Load', '', fltr)
         if obj[0] == '':
@@ -254,51 +376,167 @@ class LoadPage(QWidget):
             logger.clear()
             logger.status_message('>======= Configuration Preview ======<\n')
             logger.status_message(config)
-            logger.status_message('>============= Reminder =============<\n'
-                                  'Remove extra lines from the text file, such as:\n '
-                                  ' enable \n config t \n building \n etc...')
-            self.load_thread.config = config
+            lines, problems = config_check.check(config)
+            if problems:
+                logger.status_message('>============== Checks ==============<\n')
+                for problem, line in zip(problems, config_check.report(problems)):
+                    logger.handle(messages.error(line) if problem[1] == config_check.ERROR else line)
+            self.load_thread.config = '\n'.join(lines)  # preamble and repeated lines taken out
+            self.load_thread.template = None
+
+    def _open_template(self, _):
+        """ Invoked when the user clicks the template button. """
+        logger = self.logger
+        obj = QFileDialog.getOpenFileName(self, 'Config Template', '', "Template (*.j2 *.jinja *.tmpl *.txt *.cfg)")
+        if obj[0] == '':
+            return
+        variables = QFileDialog.getOpenFileName(self, 'Variables', '', "Variables (*.csv *.yml *.yaml)")
+        if variables[0] == '':
+            return
+        logger.clear()
+        try:
+            with open(obj[0], 'r') as file:
+                template = config_template.compile_template(file.read())
+            table = config_template.load_variables(variables[0])
+        except (OSError, config_template.TemplateError) as e:
+            logger.handle(messages.error(str(e)))
+            return
+        if not table:
+            logger.handle(messages.error(f'No devices in {variables[0]}.'))
+            return
+        logger.status_message('>========= Template Preview =========<\n')
+        logger.status_message(template.text)
+        logger.status_message(f'{len(table)} devices in {variables[0]}, the template uses: ' +
+                              ', '.join(sorted(template.variables)))
+        first = next(iter(table.rows))  # what the first device will get
+        try:
+            logger.status_message(f'>======= Rendered for {first} =======<\n')
+            logger.status_message(template.render(table.rows[first]))
+        except config_template.TemplateError as e:
+            logger.handle(messages.error(str(e)))
+        self.load_thread.template = template
+        self.load_thread.variables = table
 
     def _backup(self, state):  # backup button triggers the backup thread to start
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
+        logger = self.logger
         logger.clear()
         logger.status_message('Connecting....')
         self.openfile.setEnabled(False)
         self._backup_config.setEnabled(False)  # turn off the buttons so accidents don't happen.
         self.load.setEnabled(False)
+        self.resume.setEnabled(False)
         self.zero.setEnabled(False)
+        self._start_fleet()
+        self.cancel.setEnabled(True)
         self.backup_thread.start()
 
     def _load(self):  # load button triggers the backup thread to start
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
+        self._start_load(False)
+
+    def _resume(self):  # a full load from its checkpoint, devices without one are left alone
+        self._start_load(True)
+
+    def _start_load(self, resume):
+        logger = self.logger
         logger.clear()
-        logger.status_message('Loading Configuration....')
+        template = self.load_thread.template
+        if template is not None:  # every device needs a row with every variable before any of them is loaded
+            devices = Settings.inventory if Settings.fleet_mode else [Settings.device] if Settings.device else []
+            problems = self.load_thread.variables.problems(template, devices)
+            if problems:
+                logger.handle(messages.error('Template not loaded, fix these first:\n' + '\n'.join(problems)))
+                return
+        errors = [] if template is not None else config_check.errors(config_check.check(self.load_thread.config)[1])
+        if errors:  # don't send a config the router will reject
+            logger.handle(messages.error('Config not loaded, fix these first:\n' +
+                                         '\n'.join(config_check.report(errors))))
+            return
+        logger.status_message('Resuming Configuration....' if resume else 'Loading Configuration....')
         self.openfile.setEnabled(False)
         self._backup_config.setEnabled(False)  # turn off the buttons so accidents don't happen.
         self.load.setEnabled(False)
+        self.resume.setEnabled(False)
         self.zero.setEnabled(False)
+        self._start_fleet()
+        self.load_thread.resume = resume
         self.load_thread.start()
 
+    def _incremental_button(self, state):
+        self.load_thread.incremental = state == Qt.Checked
+        self._remove.setEnabled(state == Qt.Checked)
+
+    def _remove_button(self, state):
+        self.load_thread.remove = state == Qt.Checked
+
+    def _schedule_button(self, state):
+        if state == Qt.Checked:
+            self.archive_timer.start(self._interval.value() * 60 * 1000)
+            self._scheduled_backup()  # one now, then on the interval
+        else:
+            self.archive_timer.stop()
+
+    def _interval_changed(self, minutes):
+        if self.archive_timer.isActive():
+            self.archive_timer.start(minutes * 60 * 1000)
+
+    def _scheduled_backup(self):
+        if not self.archive_thread.isRunning():  # a slow fleet may still be on the last one
+            self.cancel.setEnabled(True)
+            self.archive_thread.start()
+
+    def _archive_done(self):  # the other buttons were left alone, only Cancel goes back unless a pull still needs it
+        self.cancel.setEnabled(self.backup_thread.isRunning())
+
+    def _show_changed(self, _):  # read from the archive's index, no configs are opened
+        logger = self.logger
+        logger.clear()
+        changes = self.archive_thread.archive.changed()
+        if changes == []:
+            logger.status_message('No scheduled backups yet.')
+        for device, when, changed in changes:
+            logger.status_message(f'{device}  {"changed" if changed else "unchanged"} at {when}')
+
     def _zero(self,):
         zero_msg = "Are you sure you want Zero the router?"
         reply = QMessageBox.question(self, 'Zero?', zero_msg, QMessageBox.Yes, QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            logger = LoggingMessageHandler(bool(), self._log_viewer)
+            logger = self.logger
             logger.clear()
             logger.status_message('Zeroizing router...')
             self.openfile.setEnabled(False)
             self._backup_config.setEnabled(False)  # turn off the buttons so accidents don't happen.
             self.load.setEnabled(False)
+            self.resume.setEnabled(False)
             self.zero.setEnabled(False)
             self.zero_thread.start()
         else:
             return
 
+    def _start_fleet(self):
+        if Settings.fleet_mode:
+            self.fleet_view.start([device_name(device) for device in Settings.inventory])
+        else:
+            self.fleet_view.hide()
+
+    def _show_device(self, row, _):  # show everything one device in the fleet has reported
+        logger = self.logger
+        logger.clear()
+        logger.status_message(self.fleet_view.stream(row))
+
+    def _cancel(self, _):  # only the pulls can be stopped part way, a half loaded config is worse than a slow one
+        for thread in (self.backup_thread, self.archive_thread):
+            if thread.isRunning():
+                thread.requestInterruption()
+
     def finished(self, result):  # Pull all messages into the main thread so we can see them.
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
-        logger.status_message(result)
+        logger = self.logger
+        logger.handle(result)
+
+    def _done(self):  # the thread has stopped, nothing else will be emitted
+        self.cancel.setEnabled(self.archive_thread.isRunning())
         self.openfile.setEnabled(True)
         self._backup_config.setEnabled(True)  # turn the buttons on again.
         self.load.setEnabled(True)
+        self.resume.setEnabled(True)
         self.zero.setEnabled(True)
@@ -0,0 +1,164 @@
+import tracing
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QColor, QPainter
+from PyQt5.QtWidgets import (QCheckBox, QFileDialog, QGridLayout, QLabel, QPushButton, QSpinBox, QSizePolicy,
+                             QWidget)
+from record_table import INT, STR, Table
+from record_view import RecordView
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Where the time goes: a row per phase of the device operations since SNAP started (or the last Clear), and the
+histogram of the phase picked in the table.  The figures come from tracing.default_tracer, which every connection
+records into, this tab only reads them.'''
+
+COLUMNS = [('phase', STR), ('count', INT), ('errors', INT), ('median ms', INT), ('p90 ms', INT), ('max ms', INT),
+           ('bytes', INT)]
+REFRESH = 2000  # ms between refreshes while the tab is showing
+
+
+class Histogram(QWidget):
+    """ A bar per tracing bucket. """
+
+    def __init__(self):
+        """ Initialise the chart, empty. """
+
+        super().__init__()
+        self.counts = []
+        self.setMinimumHeight(160)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+    def set_counts(self, counts):
+        self.counts = counts
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if not any(self.counts):
+            painter.drawText(self.rect(), Qt.AlignCenter, 'Nothing recorded yet.')
+            return
+        text_height = self.fontMetrics().height()
+        width = self.width() / len(self.counts)
+        height = self.height() - 2 * text_height - 4
+        for number, count in enumerate(self.counts):
+            bar = round(height * count / max(self.counts))
+            left = round(number * width)
+            painter.fillRect(left + 2, text_height + height - bar, max(round(width) - 4, 1), bar, QColor(70, 130, 180))
+            painter.drawText(left, text_height + height - bar - text_height, round(width), text_height,
+                             Qt.AlignCenter, str(count) if count else '')
+            painter.drawText(left, self.height() - text_height, round(width), text_height, Qt.AlignCenter,
+                             tracing.bucket_label(number))
+
+
+class Profile(QWidget):
+    """ The GUI for the profiling page. """
+
+    # The page's label.
+    label = "Profile"
+
+    def __init__(self):
+        """ Initialise the page. """
+
+        super().__init__()
+        layout = QGridLayout()
+        self.phase = ''
+
+        self.summary = RecordView()
+        self.summary.filter.hide()  # a handful of phases, nothing to filter
+        self.summary.table.clicked.connect(self._pick)
+        layout.addWidget(self.summary, 0, 0, 1, 6)
+
+        self.title = QLabel()
+        layout.addWidget(self.title, 1, 0, 1, 6)
+        self.histogram = Histogram()
+        layout.addWidget(self.histogram, 2, 0, 1, 6)
+
+        self.refresh = QPushButton("Refresh", clicked=self._refresh)
+        layout.addWidget(self.refresh, 3, 0)
+
+        self.clear = QPushButton("Clear", clicked=self._clear)
+        self.clear.setToolTip("Forget the spans recorded so far, /metrics keeps counting.")
+        layout.addWidget(self.clear, 3, 1)
+
+        self.save = QPushButton("Save Spans", clicked=self._save)
+        self.save.setToolTip("Save the recorded spans as JSON.")
+        layout.addWidget(self.save, 3, 2)
+
+        self.serve = QCheckBox("Serve /metrics on port", toggled=self._serve)
+        self.serve.setToolTip("Prometheus text format at http://127.0.0.1:port/metrics, the spans at /spans.")
+        layout.addWidget(self.serve, 3, 3)
+        self.port = QSpinBox(minimum=1024, maximum=65535, value=tracing.METRICS_PORT)
+        layout.addWidget(self.port, 3, 4)
+
+        self.status = QLabel()
+        layout.addWidget(self.status, 4, 0, 1, 6)
+        self.setLayout(layout)
+
+        self._server = None
+        self._rows = None
+        self.timer = QTimer(self, interval=REFRESH, timeout=self._refresh)
+        self._refresh()
+
+    def showEvent(self, event):
+        self._refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def _refresh(self):
+        rows = tracing.default_tracer.summary()
+        if rows != self._rows:  # a reset loses the sort and selection, only do it when something changed
+            self._rows = rows
+            self.summary.set_table(Table.from_rows(COLUMNS, rows))
+        if not self.phase and rows:
+            self.phase = rows[0][0]
+        spans = tracing.default_tracer.recent(self.phase) if self.phase else []
+        self.title.setText(f'{self.phase}: {len(spans)} of the last {tracing.RING_SIZE} spans'
+                           if self.phase else 'Connect to a device and its phases show up here.')
+        self.histogram.set_counts(tracing.histogram(entry['seconds'] for entry in spans))
+
+    def _pick(self, index):
+        self.phase = self.summary.model.index(index.row(), 0).data()
+        self._refresh()
+
+    def _clear(self, _):
+        tracing.default_tracer.clear()
+        self.phase = ''
+        self._refresh()
+
+    def _save(self, _):
+        obj = QFileDialog.getSaveFileName(self, 'Spans', 'spans.json', "JSON (*.json)")
+        if obj[0] == '':
+            return
+        try:
+            with open(obj[0], 'w') as file:
+                file.write(tracing.default_tracer.to_json())
+        except OSError as e:
+            self.status.setText(str(e))
+            return
+        self.status.setText(f'Spans saved to {obj[0]}.')
+
+    def _serve(self, on):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.port.setEnabled(not on)
+        if not on:
+            self.status.setText('Metrics endpoint stopped.')
+            return
+        try:
+            self._server = tracing.serve(self.port.value())
+        except OSError as e:
+            self.serve.setChecked(False)
+            self.status.setText(f'Port {self.port.value()}: {e.strerror or e}')
+            return
+        self.status.setText(f'Serving http://127.0.0.1:{self.port.value()}/metrics and /spans.')
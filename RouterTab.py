@@ -1,12 +1,16 @@
+import console_discovery
+import device_errors
+import device_ops
+import device_picker
+import fleet_audit
+import messages
 import Settings
-import serial.tools.list_ports
-import re
-from message_handler import LoggingMessageHandler
-from netmiko import ConnectHandler
-from netmiko.ssh_exception import NetMikoTimeoutException, NetMikoAuthenticationException
+from inventory import METHOD_NAMES, build_device, device_name, load_inventory
+from message_handler import LoggingMessageHandler, MAX_BLOCKS
+from record_view import RecordView
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtWidgets import (QCheckBox, QHBoxLayout, QGridLayout, QGroupBox, QLabel, QLineEdit, QPlainTextEdit,
-                             QPushButton, QWidget)
+from PyQt5.QtWidgets import (QCheckBox, QFileDialog, QHBoxLayout, QGridLayout, QGroupBox, QLabel, QLineEdit,
+                             QPlainTextEdit, QPushButton, QSpinBox, QWidget)
 
 __author__ = "Jason Hernandez"
 __copyright__ = "Copyright 2018"
@@ -18,118 +22,90 @@ __email__ = "JThern@github"
 
 class Thread(QThread):
     signal = pyqtSignal('PyQt_PyObject')
+    found = pyqtSignal(str, int)  # console port and baud rate discovery found the router on
     # This Class threads the connection so we don't freeze the entire program waiting on the connection to take place.
 
     def __init__(self):
         QThread.__init__(self)
         self.device = {}
 
-    @staticmethod
-    def get_version_cisco(show_ver):
-        match = re.search(r"1.*", show_ver)
-        return float(match.group(0))
-
     # run method gets called when we start() the thread
     def run(self):
         if self.device['device_type'] == 'cisco_ios_serial':
+            if self.device['serial_settings']['port'].lower() in ('', console_discovery.AUTO) and not self._discover():
+                return
             try:
-                console = ConnectHandler(**self.device)  # Connect to the Device to verify credentials.
-                config_mode = console.check_config_mode()
-                if config_mode is True:
-                    console.exit_config_mode()
-                    self.signal.emit('Router was in config mode try again.')
-                    return
-                console.enable()  # Enter Enable Mode
-                show_ver = console.send_command('show run | inc version 1')
-                self.signal.emit(show_ver)
-                version = self.get_version_cisco(show_ver)
-                if version >= 15.4:
-                    pass
-                else:
-                    show_flash = console.send_command('dir flash: | i .bin')
-                    self.signal.emit('----ERROR----\n'
-                                     ' Old version of IOS Detected\n'
-                                     ' Correct version may be in flash:')
-                    self.signal.emit(show_flash)
-                    self.signal.emit('\n>========== Reminder ==========<\n'
-                                     'Ensure the config you plan to load is compatible\n'
-                                     ' with the version of IOS you are using.\n '
-                                     'If not contact the help desk.\n'
-                                     '>========== Reminder ==========<\n')
-                console.disconnect()  # disconnect so it can be modified later on the LoadTab
-                self.signal.emit('Credentials Verified on Console!')  # Congrats you made it
+                self.signal.emit(device_ops.verify(self.device, self.signal.emit))  # Congrats you made it
             except ValueError:  # most likely com port fault.
-                self.signal.emit('...COM Port does not appear to be working. \nTry one of these:')
-                ports = list(serial.tools.list_ports.comports())  # You used the wrong one here let me help you.
-                for p in ports:  # may just automate this in the future using this method if only one port is found
-                    self.signal.emit(p[0])
+                self.signal.emit(messages.error('...COM Port does not appear to be working.'))
+                if self._discover():  # You used the wrong one here let me help you.
+                    self.signal.emit('Click Verify to use it.')
                 return
-            except NetMikoAuthenticationException:  # Exactly what it says in the error.
-                self.signal.emit("Check your username/password. Make sure you have an account on this device.")
+            except device_errors.NetMikoAuthenticationException:  # Exactly what it says in the error.
+                self.signal.emit(messages.error(
+                    "Check your username/password. Make sure you have an account on this device."))
                 return
         elif self.device['device_type'] == 'cisco_ios_telnet':
             try:
-                telnet = ConnectHandler(**self.device)  # Connect to the Device to verify credentials.
-                telnet.enable()  # Enter Enable Mode
-                if telnet == True:
-                    telnet.send_command('exit')
-                show_ver = telnet.send_command('show run | inc version 1')
-                self.signal.emit(show_ver)
-                version = self.get_version_cisco(show_ver)
-                if version >= 15.4:
-                    pass
-                else:
-                    show_flash = telnet.send_command('dir flash: | i .bin')
-                    self.signal.emit('----ERROR----\n'
-                                     ' Old version of IOS Detected\n'
-                                     ' Correct version may be in flash:')
-                    self.signal.emit(show_flash)
-                    self.signal.emit('\n>========== Reminder ==========<\n'
-                                     'Ensure the config you plan to load is compatible\n'
-                                     ' with the version of IOS you are using.\n '
-                                     'If not contact the help desk.\n'
-                                     '>========== Reminder ==========<\n')
-                telnet.disconnect()
-                self.signal.emit('Credentials Verified on Telnet!')
+                self.signal.emit(device_ops.verify(self.device, self.signal.emit))
             except TimeoutError:  # Exactly what it says in the error.
-                self.signal.emit("Telnet Error: Make sure the IP address is correct.")
+                self.signal.emit(messages.error("Telnet Error: Make sure the IP address is correct."))
                 return
-            except NetMikoAuthenticationException:  # Exactly what it says in the error.
-                self.signal.emit("Check your username/password. Make sure you have an account on this device.")
+            except device_errors.NetMikoAuthenticationException:  # Exactly what it says in the error.
+                self.signal.emit(messages.error(
+                    "Check your username/password. Make sure you have an account on this device."))
                 return
         elif self.device['device_type'] == 'cisco_ios':
             try:
-                ssh = ConnectHandler(**self.device)  # Connect to the Device to verify credentials.
-                ssh.enable()  # Enter Enable Mode
-                if ssh == True:
-                    ssh.send_command('exit')
-                show_ver = ssh.send_command('show run | inc version 1')
-                self.signal.emit(show_ver)
-                version = self.get_version_cisco(show_ver)
-                if version >= 15.4:
-                    pass
-                else:
-                    show_flash = ssh.send_command('dir flash: | i .bin')
-                    self.signal.emit('----ERROR----\n'
-                                     ' Old version of IOS Detected\n'
-                                     ' Correct version may be in flash:')
-                    self.signal.emit(show_flash)
-                    self.signal.emit('\n>========== Reminder ==========<\n'
-                                     'Ensure the config you plan to load is compatible\n'
-                                     ' with the version of IOS you are using.\n '
-                                     'If not contact the help desk.\n'
-                                     '>========== Reminder ==========<\n')
-                ssh.disconnect()
-                self.signal.emit('Credentials Verified on SSH!')
-            except NetMikoTimeoutException:  # Exactly what it says in the error.
-                self.signal.emit("SSH Error: Make sure the IP address is correct.")
+                self.signal.emit(device_ops.verify(self.device, self.signal.emit))
+            except device_errors.NetMikoTimeoutException:  # Exactly what it says in the error.
+                self.signal.emit(messages.error("SSH Error: Make sure the IP address is correct."))
                 return
-            except NetMikoAuthenticationException:  # Exactly what it says in the error.
-                self.signal.emit("Check your username/password. Make sure you have an account on this device.")
+            except device_errors.NetMikoAuthenticationException:  # Exactly what it says in the error.
+                self.signal.emit(messages.error(
+                    "Check your username/password. Make sure you have an account on this device."))
                 return
         else:
             return
 
+    def _discover(self):
+        """ Probe every serial port and point the device at the one a router
+        answers on.  False if none do, or more than one does.
+        """
+
+        self.signal.emit('Looking for the router on every serial port...')
+        found = console_discovery.discover(emit=self.signal.emit)
+        if len(found) != 1:
+            self.signal.emit(messages.error('No router answered on any serial port.' if not found else
+                                            'Routers answered on ' + ', '.join(port for port, _, _ in found) +
+                                            ', enter the one you want.'))
+            return False
+        port, baud, _ = found[0]
+        console_discovery.apply(self.device, port, baud)
+        self.found.emit(port, baud)
+        self.signal.emit(f'Router found on {port} at {baud} baud.')
+        return True
+
+
+class AuditThread(QThread):
+    signal = pyqtSignal('PyQt_PyObject')
+    device_done = pyqtSignal(str, bool, 'PyQt_PyObject')  # device name, ok, result
+    table = pyqtSignal('PyQt_PyObject')  # the fleet_audit report
+    # Verify every device in the inventory without freezing the window.
+
+    def __init__(self):
+        QThread.__init__(self)
+
+    # run method gets called when we start() the thread
+    def run(self):
+        if Settings.inventory == []:
+            self.signal.emit("Open an inventory first.")
+            return
+        table = fleet_audit.audit_fleet(Settings.inventory, lambda name, message: None, self.device_done.emit,
+                                        Settings.max_workers, Settings.async_io)
+        self.table.emit(table)
+        self.signal.emit(fleet_audit.summary(table))
+
 
 class RouterInfo(QWidget):
     label = "RouterInfo"
@@ -165,6 +141,7 @@ class RouterInfo(QWidget):
         label1 = QLabel('           Username')
         layout.addWidget(label1, 1, 0)
         self.username = QLineEdit()
+        self.username.textChanged.connect(self._credentials)
         layout.addWidget(self.username, 1, 1)
 
         '''The password field and label'''
@@ -172,6 +149,7 @@ class RouterInfo(QWidget):
         layout.addWidget(label2, 2, 0)
         self.password = QLineEdit()
         self.password.setEchoMode(QLineEdit.Password)  # turn off echo mode for password
+        self.password.textChanged.connect(self._credentials)
 
         layout.addWidget(self.password, 2, 1)
 
@@ -179,7 +157,7 @@ class RouterInfo(QWidget):
         label3 = QLabel('     COM Port or IP')
         layout.addWidget(label3, 3, 0)
         self.ip = QLineEdit()
-        self.ip.setToolTip("Com Port = COM1 or IP = 192.168.0.1")
+        self.ip.setToolTip("Com Port = COM1 (blank to find it) or IP = 192.168.0.1 (192.168.0.1:2323 for another port)")
         layout.addWidget(self.ip, 3, 1)
 
         '''The verify pushbutton'''
@@ -188,6 +166,8 @@ class RouterInfo(QWidget):
         layout.addWidget(self.verify_button, 3, 2)
         self.verify_thread = Thread()
         self.verify_thread.signal.connect(self.finished)
+        self.verify_thread.found.connect(self._found)
+        self._bauds = {}  # console port -> the baud rate discovery found a router at
 
         label0 = QLabel('Once credentials are set click Verify.') # label at bottom of screen
         layout.addWidget(label0, 4, 1)
@@ -195,48 +175,92 @@ class RouterInfo(QWidget):
         '''The output screen'''
         self._log_viewer = QPlainTextEdit(readOnly=True)
         layout.addWidget(self._log_viewer, 5, 1, 1, 1)
+        self.logger = LoggingMessageHandler(bool(), self._log_viewer, buffered=True, max_blocks=MAX_BLOCKS)
+
+        '''Fleet mode - run the Load and Troubleshoot tabs against every device in an inventory'''
+        fleet_sel = QGroupBox("Fleet")
+        fleet_sel_layout = QHBoxLayout()
+
+        self._inventory_button = QPushButton("Open Inventory", clicked=self._open_inventory)
+        self._inventory_button.setToolTip("CSV with method (console/telnet/ssh) and host columns.\n"
+                                          "The username and password above are used for every device.")
+        fleet_sel_layout.addWidget(self._inventory_button)
+
+        self._devices_button = QPushButton("Devices", clicked=self._pick_devices)
+        self._devices_button.setToolTip("Pick one or many devices from the device store (inventory.db),\n"
+                                        "or import an inventory CSV into it. One device fills in the fields above.")
+        fleet_sel_layout.addWidget(self._devices_button)
+
+        self._inventory_label = QLabel('No inventory')
+        fleet_sel_layout.addWidget(self._inventory_label)
+
+        self._fleet_button = QCheckBox("Fleet mode", checked=False, stateChanged=self._fleet_button)
+        self._fleet_button.setToolTip("Load, Pull and Troubleshoot work on every device in the inventory.")
+        fleet_sel_layout.addWidget(self._fleet_button)
+
+        fleet_sel_layout.addWidget(QLabel('Parallel'))
+        self._workers = QSpinBox(minimum=1, maximum=64, value=Settings.max_workers)
+        self._workers.setToolTip("How many devices are worked on at the same time.")
+        self._workers.valueChanged.connect(self._set_workers)
+        fleet_sel_layout.addWidget(self._workers)
+
+        self._async_button = QCheckBox("Async I/O", checked=Settings.async_io, stateChanged=self._async_button)
+        self._async_button.setToolTip("Run SSH and Telnet devices on one asyncio thread, hundreds at a time,\n"
+                                      "instead of a thread per device. Console devices still use Parallel.")
+        fleet_sel_layout.addWidget(self._async_button)
+
+        self._audit_button = QPushButton("Audit", clicked=self._audit)
+        self._audit_button.setToolTip("Log in to every device in the inventory and report the credentials,\n"
+                                      "IOS version, images in flash and round trip, Parallel at a time.")
+        fleet_sel_layout.addWidget(self._audit_button)
+        self.audit_thread = AuditThread()
+        self.audit_thread.signal.connect(self.finished)
+        self.audit_thread.device_done.connect(self._audited)
+        self.audit_thread.table.connect(self._show_report)
+        self.audit_thread.finished.connect(lambda: self._audit_button.setEnabled(True))
+
+        self._save_report_button = QPushButton("Save Report", clicked=self._save_report)
+        self._save_report_button.setToolTip("Save the audit report as CSV or JSON.")
+        self._save_report_button.setEnabled(False)
+        fleet_sel_layout.addWidget(self._save_report_button)
+
+        fleet_sel.setLayout(fleet_sel_layout)
+        layout.addWidget(fleet_sel, 6, 1)
+
+        self.report = RecordView()  # the audit report, click a column to sort it
+        self.report.hide()
+        layout.addWidget(self.report, 7, 1)
 
         self.setLayout(layout)  # Displays the layout
 
     '''The fields below allow for actions to take place based on the above input and button pushes.'''
 
     def _verify(self):  # We want to verify the information in a new thread so we don't freeze up the entire app.
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
-        if self.ip.text() == '' or self.username.text() == '' or self.password.text() == '':
+        logger = self.logger
+        if self.username.text() == '' or self.password.text() == '' or (
+                self.ip.text() == '' and self.con_method != 'cisco_ios_serial'):
             logger.clear()
             logger.status_message("All Fields must be Completed.")
             return
         if self.con_method == 'cisco_ios_serial':
-            if 'COM' not in self.ip.text().upper():
+            port = self.ip.text().strip()
+            if port.lower() not in ('', console_discovery.AUTO) and 'COM' not in port.upper() \
+                    and not port.startswith('/dev/'):
                 logger.clear()
-                logger.status_message("Com Port field requires COM1 or COM2 or COM3 etc...")
+                logger.status_message("Com Port field requires COM1 or COM2 or COM3 etc... (or /dev/ttyUSB0, "
+                                      "or leave it blank to find the router)")
                 return
-            device = {
-                'device_type': self.con_method,
-                'global_delay_factor': 2,
-                'username': self.username.text(),
-                'password': self.password.text(),
-                'serial_settings': {
-                    'port': self.ip.text()}
-            }
+            device = build_device(self.con_method, port, self.username.text(), self.password.text())
+            if port in self._bauds:
+                console_discovery.apply(device, port, self._bauds[port])
             Settings.device = device
             self.verify_thread.device = device
         elif self.con_method == 'cisco_ios_telnet':
-            device = {
-                'device_type': self.con_method,
-                'ip': self.ip.text(),
-                'username': self.username.text(),
-                'password': self.password.text()
-            }
+            device = build_device(self.con_method, self.ip.text(), self.username.text(), self.password.text())
             Settings.device = device
             self.verify_thread.device = device
         elif self.con_method == 'cisco_ios':
-            device = {
-                'device_type': self.con_method,
-                'ip': self.ip.text(),
-                'username': self.username.text(),
-                'password': self.password.text()
-            }
+            device = build_device(self.con_method, self.ip.text(), self.username.text(), self.password.text())
             Settings.device = device
             self.verify_thread.device = device
         else:
@@ -249,10 +273,93 @@ class RouterInfo(QWidget):
         self.verify_thread.start()
 
     def finished(self, result):
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
-        logger.status_message(result)
+        logger = self.logger
+        logger.handle(result)
         self.verify_button.setEnabled(True)  # Enable the pushButton
 
+    def _found(self, port, baud):  # console discovery found the router, so the next Verify goes straight there
+        self.ip.setText(port)
+        self._bauds[port] = baud
+
+    def _open_inventory(self, _):
+        logger = self.logger
+        if self.username.text() == '' or self.password.text() == '':
+            logger.clear()
+            logger.status_message("Enter the username and password before opening an inventory.")
+            return
+        obj = QFileDialog.getOpenFileName(self, 'Inventory', '', "Inventory (*.csv)")
+        if obj[0] == '':
+            return
+        try:
+            Settings.inventory = load_inventory(obj[0], self.username.text(), self.password.text())
+        except (OSError, ValueError) as e:
+            logger.clear()
+            logger.status_message(str(e))
+            return
+        self._inventory_label.setText(f'{len(Settings.inventory)} devices')
+        logger.status_message(f'Inventory loaded: {len(Settings.inventory)} devices.')
+
+    def _credentials(self, _):
+        Settings.credentials = (self.username.text(), self.password.text())
+
+    def _pick_devices(self, _):
+        devices = device_picker.pick_devices(self)
+        if len(devices) == 1:  # ready to Verify
+            device = devices[0]
+            {'console': self._console_button, 'telnet': self._telnet_button,
+             'ssh': self._ssh_button}[METHOD_NAMES[device['device_type']]].setCheckState(Qt.Checked)
+            self.ip.setText(device_name(device))
+        self._show_fleet()
+
+    def showEvent(self, event):  # the Devices button on another tab may have changed the fleet
+        self._show_fleet()
+        super().showEvent(event)
+
+    def _show_fleet(self):
+        self._fleet_button.setChecked(Settings.fleet_mode)
+        if Settings.inventory:
+            self._inventory_label.setText(f'{len(Settings.inventory)} devices')
+
+    def _audit(self, _):
+        logger = self.logger
+        logger.clear()
+        if Settings.inventory == []:
+            logger.status_message("Open an inventory before running an audit.")
+            return
+        logger.status_message(f'Auditing {len(Settings.inventory)} devices...')
+        self._audit_button.setEnabled(False)
+        self.audit_thread.start()
+
+    def _audited(self, name, ok, result):
+        self.logger.handle(f'{name}: {result}' if ok else messages.error(f'{name}: {result}'))
+
+    def _show_report(self, table):
+        self.report.set_table(table)
+        self.report.show()
+        self._save_report_button.setEnabled(True)
+
+    def _save_report(self, _):
+        obj = QFileDialog.getSaveFileName(self, 'Audit Report', 'audit.csv', "CSV (*.csv);;JSON (*.json)")
+        if obj[0] == '':
+            return
+        try:
+            fleet_audit.save(self.report.model.table, obj[0])
+        except OSError as e:
+            self.logger.status_message(str(e))
+            return
+        self.logger.status_message(f'Report saved to {obj[0]}')
+
+    def _fleet_button(self, state):
+        """ fleet mode on or off """
+
+        Settings.fleet_mode = state == Qt.Checked
+
+    def _set_workers(self, value):
+        Settings.max_workers = value
+
+    def _async_button(self, state):
+        Settings.async_io = state == Qt.Checked
+
     def _console_button(self, state):
         """ if console is checked uncheck the others """
 
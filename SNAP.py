@@ -1,10 +1,10 @@
 import sys
 import Settings
-from LoadTab import LoadPage
+from importlib import import_module
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabWidget, QVBoxLayout, QWidget)
 from RouterTab import RouterInfo
-from TroubleshootTab import Troubleshoot
+from session_pool import pool
 
 __author__ = "Jason Hernandez"
 __copyright__ = "Copyright 2018"
@@ -13,6 +13,10 @@ __license__ = "MIT"
 __version__ = "1.0"
 __email__ = "JThern@github"
 
+# (module, page, label) of the tabs built the first time they are shown rather than at start up
+LAZY_TABS = [('LoadTab', 'LoadPage', "Load Page"), ('TroubleshootTab', 'Troubleshoot', "Troubleshoot"),
+             ('ProfileTab', 'Profile', "Profile")]
+
 
 class SNAPWindow(QMainWindow):
     def __init__(self, parent=None):
@@ -23,15 +27,43 @@ class SNAPWindow(QMainWindow):
         lay = QVBoxLayout(central_widget)
         self.setCentralWidget(central_widget)
         Settings.creds()
-        tab_widget = QTabWidget()
+        self.tab_widget = tab_widget = QTabWidget()
         lay.addWidget(tab_widget)  # Tab Layout below.
         tab_widget.addTab(RouterInfo(), "Router Info")
-        tab_widget.addTab(LoadPage(), "Load Page")
-        tab_widget.addTab(Troubleshoot(), "Troubleshoot")
+        self._lazy_tabs = {}  # placeholder widget -> (module, class), swapped for the real page when first shown
+        for module, page, label in LAZY_TABS:
+            placeholder = QWidget()
+            self._lazy_tabs[placeholder] = (module, page)
+            tab_widget.addTab(placeholder, label)
         tab_widget.addTab(Settings.AboutTab(), "About")
+        tab_widget.currentChanged.connect(self.build_tab)
+
+    def build_tab(self, index):
+        """ Build the page for a tab the first time it is shown. """
+
+        tab_widget = self.tab_widget
+        placeholder = tab_widget.widget(index)
+        if placeholder not in self._lazy_tabs:
+            return
+        module, page = self._lazy_tabs.pop(placeholder)
+        label = tab_widget.tabText(index)
+        widget = getattr(import_module(module), page)()
+        tab_widget.blockSignals(True)  # the swap moves the current tab about, don't build anything else
+        tab_widget.removeTab(index)
+        tab_widget.insertTab(index, widget, label)
+        tab_widget.setCurrentIndex(index)
+        tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+
+    def build_all_tabs(self):  # everything up front, the way SNAP used to start
+        current = self.tab_widget.currentIndex()
+        for index in range(self.tab_widget.count()):
+            self.build_tab(index)
+        self.tab_widget.setCurrentIndex(current)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(pool.close_all)  # log out of anything still connected
     snap = SNAPWindow()
     snap.show()
     sys.exit(app.exec_())
@@ -1,3 +1,4 @@
+import fleet
 from message_handler import LoggingMessageHandler
 from PyQt5.QtWidgets import (QGridLayout, QPlainTextEdit, QWidget)
 
@@ -10,8 +11,13 @@ __email__ = "JThern@github"
 
 
 def creds():
-    global device
+    global device, inventory, fleet_mode, max_workers, async_io, credentials
     device = []
+    credentials = ('', '')  # username and password typed on the Router Info tab, the device store never has them
+    inventory = []  # device dicts opened from an inventory file on the Router Info tab
+    fleet_mode = False  # when set the Load and Troubleshoot tabs work on the inventory instead of device
+    max_workers = fleet.MAX_WORKERS  # how many devices are worked on at once in fleet mode
+    async_io = False  # fleet mode runs SSH and Telnet devices on the asyncio transport (async_ops.py)
 
 
 class AboutTab(QWidget):
@@ -1,9 +1,22 @@
+import command_cache
+import device_errors
+import device_ops
+import device_picker
+import fleet
+import messages
+import route_index
 import Settings
-from message_handler import LoggingMessageHandler
-from netmiko import ConnectHandler
-from netmiko.ssh_exception import NetMikoTimeoutException, NetMikoAuthenticationException
-from PyQt5.QtCore import (QThread, pyqtSignal)
-from PyQt5.QtWidgets import (QGridLayout, QLineEdit, QPlainTextEdit, QPushButton, QWidget)
+import show_parsers
+import sweep
+from datetime import datetime, timedelta
+from fleet_view import FleetView
+from inventory import device_name
+from message_handler import LoggingMessageHandler, MAX_BLOCKS
+from PyQt5.QtCore import (Qt, QThread, QTimer, pyqtSignal)
+from PyQt5.QtWidgets import (QCheckBox, QGridLayout, QLabel, QLineEdit, QPlainTextEdit, QPushButton, QTabWidget,
+                             QWidget)
+from record_view import RecordView
+from time import monotonic
 
 __author__ = "Jason Hernandez"
 __copyright__ = "Copyright 2018"
@@ -15,53 +28,151 @@ __email__ = "JThern@github"
 
 class CommandThread(QThread):
     signal = pyqtSignal('PyQt_PyObject')
+    progress = pyqtSignal(str, 'PyQt_PyObject')  # fleet mode - device name, message
+    device_done = pyqtSignal(str, bool, 'PyQt_PyObject')  # fleet mode - device name, ok, result
+    table = pyqtSignal('PyQt_PyObject')  # the output parsed into a record_table.Table
     # This Class threads the connection so we don't freeze the entire program waiting on the connection to take place.
 
     def __init__(self):
         QThread.__init__(self)
         self.command = ''
+        self.force = False  # run it on the device even if the output is cached
 
     # run method gets called when we start() the thread
     def run(self):
         if self.command == '':
             self.signal.emit("No command to run.")
             return
+        if Settings.fleet_mode:
+            self.run_fleet()
+            return
         if Settings.device == []:
             self.signal.emit("Enter Credentials on Router Info tab.")
             self.signal.emit("Once entered click Verify.")
             return
+        cached = None if self.force else command_cache.cache.get(Settings.device, self.command)
+        if cached is not None:
+            output, age = cached
+            self.signal.emit(messages.output(output))
+            self.signal.emit(command_cache.describe_age(age))
+            self.emit_table(output, age)
+            return
         if Settings.device['device_type'] == 'cisco_ios_serial':
             device = Settings.device
             try:
-                router = ConnectHandler(**device)  # Connect to the Device
-                router.enable()
-                result = router.send_command(self.command)
-                self.signal.emit(result)
-                router.disconnect()
+                result = device_ops.run_command(device, self.command, self.signal.emit, self.isInterruptionRequested)
+                if result == '':
+                    self.signal.emit(result)
+                command_cache.cache.put(device, self.command, result)
+                self.emit_table(result)
+            except device_ops.Cancelled:
+                self.signal.emit("Cancelled.")
             except ValueError:
-                self.signal.emit("Console Error: Make sure you have connectivity and try again.")
+                self.signal.emit(messages.error("Console Error: Make sure you have connectivity and try again."))
             except TimeoutError:
-                self.signal.emit("Timeout Error: Make sure you are still connected")
-            except NetMikoTimeoutException:
-                self.signal.emit("Timeout Error: Make sure you are still connected")
-            except NetMikoAuthenticationException:
-                self.signal.emit("Check your username/password. Make sure you have an account on this device.")
+                self.signal.emit(messages.error("Timeout Error: Make sure you are still connected"))
+            except device_errors.NetMikoTimeoutException:
+                self.signal.emit(messages.error("Timeout Error: Make sure you are still connected"))
+            except device_errors.NetMikoAuthenticationException:
+                self.signal.emit(messages.error(
+                    "Check your username/password. Make sure you have an account on this device."))
         else:
             device = Settings.device
             try:
-                router = ConnectHandler(**device)  # Connect to the Device
-                router.enable()
-                result = router.send_command(self.command)
-                self.signal.emit(result)
-                router.disconnect()
+                result = device_ops.run_command(device, self.command, self.signal.emit, self.isInterruptionRequested)
+                if result == '':
+                    self.signal.emit(result)
+                command_cache.cache.put(device, self.command, result)
+                self.emit_table(result)
+            except device_ops.Cancelled:
+                self.signal.emit("Cancelled.")
             except ValueError:
-                self.signal.emit("User does not have permission to make these changes.")
+                self.signal.emit(messages.error("User does not have permission to make these changes."))
             except TimeoutError:
-                self.signal.emit("Telnet Error: Make sure the IP address is correct.")
-            except NetMikoTimeoutException:
-                self.signal.emit("SSH Error: Make sure the IP address is correct.")
-            except NetMikoAuthenticationException:
-                self.signal.emit("Check your username/password. Make sure you have an account on this device.")
+                self.signal.emit(messages.error("Telnet Error: Make sure the IP address is correct."))
+            except device_errors.NetMikoTimeoutException:
+                self.signal.emit(messages.error("SSH Error: Make sure the IP address is correct."))
+            except device_errors.NetMikoAuthenticationException:
+                self.signal.emit(messages.error(
+                    "Check your username/password. Make sure you have an account on this device."))
+
+    def emit_table(self, output, age=0):  # parsed here so a big routing table doesn't hold up the window
+        table = show_parsers.parse(self.command, output)
+        if table is not None and len(table):
+            if self.command == 'show ip route':  # route lookups can use it too, as old as the output it came from
+                route_index.store(Settings.device, table, datetime.now() - timedelta(seconds=age))
+            self.table.emit(table)
+
+    def run_fleet(self):
+        if Settings.inventory == []:
+            self.signal.emit("Open an inventory on the Router Info tab.")
+            return
+        command = self.command
+        if Settings.async_io:
+            import async_ops  # asyncio isn't loaded until it is wanted
+            results = async_ops.run_fleet(Settings.inventory,
+                                          lambda device, emit: async_ops.run_command(device, command),
+                                          lambda device, emit: device_ops.run_command(device, command),
+                                          self.progress.emit, self.device_done.emit,
+                                          describe_error=device_ops.describe_error)
+        else:
+            results = fleet.run_fleet(Settings.inventory,
+                                      lambda device, emit: device_ops.run_command(device, command),
+                                      self.progress.emit, self.device_done.emit, Settings.max_workers,
+                                      device_ops.describe_error)
+        self.signal.emit(fleet.summary(f'"{command}"', results))
+
+
+class RouteThread(QThread):
+    signal = pyqtSignal('PyQt_PyObject')
+    # Pulls and indexes the routing table for route lookups, then answers the lookup if there is one.
+
+    def __init__(self):
+        QThread.__init__(self)
+        self.address = ''
+
+    # run method gets called when we start() the thread
+    def run(self):
+        if Settings.device == []:
+            self.signal.emit("Enter Credentials on Router Info tab.")
+            self.signal.emit("Once entered click Verify.")
+            return
+        try:
+            self.signal.emit(messages.progress('...pulling the routing table...'))
+            index = route_index.refresh(Settings.device)
+        except Exception as e:
+            self.signal.emit(messages.error(device_ops.describe_error(e)))
+            return
+        self.signal.emit(route_index.describe_age(index))
+        if self.address:
+            self.signal.emit('\n'.join(route_index.describe(self.address, index.lookup(self.address))))
+
+
+class SweepThread(QThread):
+    signal = pyqtSignal('PyQt_PyObject')
+    table = pyqtSignal('PyQt_PyObject')  # a record_table.Table with a record per target
+    # Pings or traceroutes a list of targets from the router, a few at once.
+
+    def __init__(self):
+        QThread.__init__(self)
+        self.kind = 'ping'
+        self.targets = []
+
+    # run method gets called when we start() the thread
+    def run(self):
+        if Settings.device == []:
+            self.signal.emit("Enter Credentials on Router Info tab.")
+            self.signal.emit("Once entered click Verify.")
+            return
+        start = monotonic()
+        try:
+            table = sweep.sweep(Settings.device, self.targets, self.kind, self.signal.emit,
+                                self.isInterruptionRequested)
+        except Exception as e:
+            self.signal.emit(messages.error(device_ops.describe_error(e)))
+            return
+        self.signal.emit(sweep.summary(table, monotonic() - start))
+        self.table.emit(table)
 
 
 class Troubleshoot(QWidget):
@@ -76,20 +187,35 @@ class Troubleshoot(QWidget):
         super().__init__()
         layout = QGridLayout()
 
+        self.results = QTabWidget()  # the raw output, and the output as a table when it can be parsed
+        layout.addWidget(self.results, 0, 0, 3, 5)
         self._log_viewer = QPlainTextEdit(readOnly=True)  # the message window
-        layout.addWidget(self._log_viewer, 0, 0, 3, 5)
+        self.results.addTab(self._log_viewer, "Output")
+        self.record_view = RecordView()
+        self.results.addTab(self.record_view, "Table")
+        self.logger = LoggingMessageHandler(bool(), self._log_viewer, buffered=True, max_blocks=MAX_BLOCKS)
+
+        self.fleet_view = FleetView()  # only shown in fleet mode, click a device to see its output
+        self.fleet_view.cellClicked.connect(self._show_device)
+        self.fleet_view.hide()
+        layout.addWidget(self.fleet_view, 3, 0, 1, 5)
 
         self.ping = QPushButton("Ping", clicked=self._ping)
-        self.ping.setToolTip("ping [x.x.x.x]")
+        self.ping.setToolTip("ping [x.x.x.x], or sweep a list or prefix like 10.0.0.1, 10.0.0.5 10.0.1.0/28")
         layout.addWidget(self.ping, 4, 0)
 
         self.traceroute = QPushButton("Traceroute", clicked=self._traceroute)
-        self.traceroute.setToolTip("traceroute [x.x.x.x]")
+        self.traceroute.setToolTip("traceroute [x.x.x.x], or sweep a list or prefix like 10.0.0.1, 10.0.1.0/28")
         layout.addWidget(self.traceroute, 4, 1)
 
         self.ip = QLineEdit()
-        self.ip.setToolTip("[x.x.x.x]")
-        layout.addWidget(self.ip, 4, 2, 1, 3)
+        self.ip.setToolTip("[x.x.x.x], or several separated by commas or spaces, or a prefix like 10.0.1.0/28")
+        layout.addWidget(self.ip, 4, 2, 1, 2)
+
+        self.cancel = QPushButton("Cancel", clicked=self._cancel)
+        self.cancel.setToolTip("Stop the running command.")
+        self.cancel.setEnabled(False)
+        layout.addWidget(self.cancel, 4, 4)
 
         self.routes = QPushButton("Routes", clicked=self._routes)
         self.routes.setToolTip("show ip route")
@@ -111,8 +237,41 @@ class Troubleshoot(QWidget):
         self.eigrp.setToolTip("show ip eigrp neigh")
         layout.addWidget(self.eigrp, 5, 4)
 
+        self.lookup = QPushButton("Route Lookup", clicked=self._lookup)
+        self.lookup.setToolTip("Which route [x.x.x.x] would use, answered from the cached routing table.")
+        layout.addWidget(self.lookup, 6, 0)
+
+        self.refresh_routes = QPushButton("Refresh Routes", clicked=self._refresh_routes)
+        self.refresh_routes.setToolTip("Pull the routing table again for route lookups.")
+        layout.addWidget(self.refresh_routes, 6, 1)
+
+        self.routes_age = QLabel()  # how old the cached routing table is
+        layout.addWidget(self.routes_age, 6, 2, 1, 2)
+
+        self.force = QCheckBox("Force refresh", checked=False, stateChanged=self._force_button)
+        self.force.setToolTip("Run show commands on the device even if SNAP has the output from a few seconds ago.")
+        layout.addWidget(self.force, 6, 4)
+
+        self.device_bar = device_picker.DeviceBar()  # what the commands run on, pick it from the device store
+        layout.addWidget(self.device_bar, 7, 0, 1, 5)
+        self.routes_age_timer = QTimer(self, interval=10000, timeout=self._show_routes_age)
+        self.routes_age_timer.start()
+
+        self.route_thread = RouteThread()
+        self.route_thread.signal.connect(self.finished)
+        self.route_thread.finished.connect(self._done)
+
         self.command_thread = CommandThread()
         self.command_thread.signal.connect(self.finished)
+        self.command_thread.finished.connect(self._done)
+        self.command_thread.progress.connect(self.fleet_view.progress)
+        self.command_thread.device_done.connect(self.fleet_view.done)
+        self.command_thread.table.connect(self._show_table)
+
+        self.sweep_thread = SweepThread()
+        self.sweep_thread.signal.connect(self.finished)
+        self.sweep_thread.finished.connect(self._done)
+        self.sweep_thread.table.connect(self._show_table)
 
         self.setLayout(layout)  # Displays the layout
 
@@ -120,33 +279,43 @@ class Troubleshoot(QWidget):
 
     def _ping(self, _):
         """ Invoked when the user clicks the ping button. """
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
+        logger = self.logger
         if self.ip.text() == '':
             logger.clear()
             logger.status_message("No IP to ping.")
             return
+        elif sweep.is_sweep(self.ip.text()):
+            self._sweep('ping')
+            return
         else:
             command = f'ping {self.ip.text()}'
             self.command_thread.command = command
             logger.status_message("Running....")
-            self.command_thread.start()
+            self._start_fleet()
+        self.cancel.setEnabled(True)
+        self.command_thread.start()
 
     def _traceroute(self, _):
         """ Invoked when the user clicks the traceroute button. """
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
+        logger = self.logger
         if self.ip.text() == '':
             logger.clear()
             logger.status_message("No IP to traceroute.")
             return
+        elif sweep.is_sweep(self.ip.text()):
+            self._sweep('traceroute')
+            return
         else:
             command = f'traceroute {self.ip.text()}'
             self.command_thread.command = command
             logger.status_message("Running....")
-            self.command_thread.start()
+            self._start_fleet()
+        self.cancel.setEnabled(True)
+        self.command_thread.start()
 
     def _routes(self, _):
         """ Invoked when the user clicks the routes button. """
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
+        logger = self.logger
         command = 'show ip route'
         self.command_thread.command = command
         logger.clear()
@@ -159,11 +328,13 @@ class Troubleshoot(QWidget):
         self.dmvpn.setEnabled(False)
         self.ospf.setEnabled(False)
         self.eigrp.setEnabled(False)
+        self._start_fleet()
+        self.cancel.setEnabled(True)
         self.command_thread.start()
 
     def _interfaces(self, _):
         """ Invoked when the user clicks the interfaces button. """
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
+        logger = self.logger
         command = 'show ip interface brief'
         self.command_thread.command = command
         logger.clear()
@@ -176,11 +347,13 @@ class Troubleshoot(QWidget):
         self.dmvpn.setEnabled(False)
         self.ospf.setEnabled(False)
         self.eigrp.setEnabled(False)
+        self._start_fleet()
+        self.cancel.setEnabled(True)
         self.command_thread.start()
 
     def _dmvpn(self, _):
         """ Invoked when the user clicks the dmvpn button. """
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
+        logger = self.logger
         command = 'show crypto ikev2 sa'
         self.command_thread.command = command
         logger.clear()
@@ -193,11 +366,13 @@ class Troubleshoot(QWidget):
         self.dmvpn.setEnabled(False)
         self.ospf.setEnabled(False)
         self.eigrp.setEnabled(False)
+        self._start_fleet()
+        self.cancel.setEnabled(True)
         self.command_thread.start()
 
     def _ospf(self, _):
         """ Invoked when the user clicks the ospf button. """
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
+        logger = self.logger
         command = 'show ip ospf neigh'
         self.command_thread.command = command
         logger.clear()
@@ -210,11 +385,13 @@ class Troubleshoot(QWidget):
         self.dmvpn.setEnabled(False)
         self.ospf.setEnabled(False)
         self.eigrp.setEnabled(False)
+        self._start_fleet()
+        self.cancel.setEnabled(True)
         self.command_thread.start()
 
     def _eigrp(self, _):
         """ Invoked when the user clicks the eigrp button. """
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
+        logger = self.logger
         command = 'show ip eigrp neigh'
         self.command_thread.command = command
         logger.clear()
@@ -227,10 +404,97 @@ class Troubleshoot(QWidget):
         self.dmvpn.setEnabled(False)
         self.ospf.setEnabled(False)
         self.eigrp.setEnabled(False)
+        self._start_fleet()
+        self.cancel.setEnabled(True)
         self.command_thread.start()
 
+    def _sweep(self, kind):
+        """ Ping or traceroute every target in the IP box. """
+        logger = self.logger
+        try:
+            targets = sweep.targets(self.ip.text())
+        except ValueError as e:
+            logger.handle(messages.error(str(e)))
+            return
+        self.sweep_thread.kind = kind
+        self.sweep_thread.targets = targets
+        logger.clear()
+        logger.status_message(f"Sweeping {len(targets)} targets....")
+        self.results.setCurrentWidget(self._log_viewer)
+        self.fleet_view.hide()
+        self.ping.setEnabled(False)
+        self.traceroute.setEnabled(False)
+        self.ip.setEnabled(False)
+        self.cancel.setEnabled(True)
+        self.sweep_thread.start()
+
+    def _force_button(self, state):
+        self.command_thread.force = state == Qt.Checked
+
+    def _lookup(self, _):
+        """ Invoked when the user clicks the route lookup button. """
+        logger = self.logger
+        address = self.ip.text().strip()
+        if address == '':
+            logger.status_message("No IP to look up.")
+            return
+        try:
+            route_index.address_number(address)
+        except ValueError as e:
+            logger.handle(messages.error(str(e)))
+            return
+        index = route_index.cached(Settings.device) if Settings.device else None
+        if index is None:  # nothing cached for this device yet, pull the routing table first
+            self._refresh_routes(None, address)
+            return
+        logger.status_message('\n'.join(route_index.describe(address, index.lookup(address))))
+        self._show_routes_age()
+
+    def _refresh_routes(self, _, address=''):
+        """ Invoked when the user clicks the refresh routes button. """
+        self.results.setCurrentWidget(self._log_viewer)
+        self.route_thread.address = address
+        self.lookup.setEnabled(False)
+        self.refresh_routes.setEnabled(False)
+        self.route_thread.start()
+
+    def _show_routes_age(self):
+        index = route_index.cached(Settings.device) if Settings.device else None
+        self.routes_age.setText('Routes: ' + (route_index.describe_age(index) if index else 'not pulled yet'))
+
+    def _start_fleet(self):
+        self.results.setCurrentWidget(self._log_viewer)  # the output streams in here
+        if Settings.fleet_mode:
+            self.fleet_view.start([device_name(device) for device in Settings.inventory])
+        else:
+            self.fleet_view.hide()
+
+    def _show_device(self, row, _):  # show everything one device in the fleet has reported
+        logger = self.logger
+        logger.clear()
+        logger.status_message(self.fleet_view.stream(row))
+
+    def _show_table(self, table):
+        self.record_view.set_table(table)
+        self.results.setCurrentWidget(self.record_view)
+
+    def _cancel(self, _):
+        """ Invoked when the user clicks the cancel button. """
+        self.command_thread.requestInterruption()
+        self.sweep_thread.requestInterruption()
+
     def finished(self, result):  # Pull all messages into the main thread so we can see them.
-        logger = LoggingMessageHandler(bool(), self._log_viewer)
+        logger = self.logger
+        if result == '':
+            logger.status_message('Process not running.')
+        else:
+            logger.handle(result)
+
+    def _done(self):  # the command thread has stopped, turn the buttons back on
+        self.lookup.setEnabled(True)
+        self.refresh_routes.setEnabled(True)
+        self._show_routes_age()
+        self.cancel.setEnabled(False)
         self.ping.setEnabled(True)
         self.traceroute.setEnabled(True)
         self.ip.setEnabled(True)
@@ -239,7 +503,3 @@ class Troubleshoot(QWidget):
         self.dmvpn.setEnabled(True)
         self.ospf.setEnabled(True)
         self.eigrp.setEnabled(True)
-        if result == '':
-            logger.status_message('Process not running.')
-        else:
-            logger.status_message(result)
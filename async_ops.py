@@ -0,0 +1,199 @@
+import asyncio
+import async_transport
+import command_cache
+import config_model
+import device_ops
+import device_store
+import fleet_audit
+import latency_profile
+import load_engine
+import messages
+import tracing
+from functools import partial
+from inventory import device_name
+from load_checkpoint import checkpoints
+from statistics import median
+from time import monotonic
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''device_ops for the async transport: the same verify, load, backup and command, as coroutines, and a fleet
+runner that keeps hundreds of them in flight on the one async_transport loop.  Emits happen on the loop's
+thread, a QThread's pyqtSignal.emit queues them over to the window like it does from any other thread.
+No Qt in here.'''
+
+MAX_SESSIONS = 200  # devices in flight at once on the async loop
+
+
+async def measure(router, samples=latency_profile.SAMPLES):
+    """ latency_profile.measure on an async connection: the prompt round
+    trips in seconds.  There is no delay factor to apply afterwards, the
+    async transport reads until the prompt instead of sleeping.
+    """
+
+    round_trips = []
+    for _ in range(samples):
+        start = monotonic()
+        await router.find_prompt()
+        round_trips.append(monotonic() - start)
+    return round_trips
+
+
+async def verify(device, emit):
+    router = await async_transport.connect(device)
+    try:
+        samples = await measure(router)
+        latency_profile.profiles.measured(device, samples)
+        emit(messages.status(latency_profile.profiles.describe(device)))
+        show_ver = await router.send_command('show run | inc version 1')
+        emit(messages.output(show_ver))
+        device_store.store.verified(device, config_model.parse(show_ver).value('version'), median(samples))
+        version = device_ops.get_version_cisco(show_ver)
+        if version is None:
+            emit(messages.error(device_ops.VERSION_UNKNOWN))
+        elif version < device_ops.MIN_VERSION:
+            device_ops.warn_old_version(await router.send_command('dir flash: | i .bin'), emit)
+    finally:
+        await router.disconnect()
+    return device_ops.VERIFIED[device['device_type']]
+
+
+async def audit(device, emit):
+    """ fleet_audit.audit on the async transport. """
+
+    router = await async_transport.connect(device)
+    try:
+        emit(messages.progress('...connected...'))
+        samples = await measure(router)
+        latency_profile.profiles.measured(device, samples)
+        show_ver = await router.send_command(fleet_audit.VERSION_COMMAND)
+        show_flash = await router.send_command(fleet_audit.FLASH_COMMAND)
+    finally:
+        await router.disconnect()
+    return fleet_audit.record(device, 'ok', show_ver, show_flash, median(samples))
+
+
+async def push_config(router, lines, profile, emit, tuner=None, start=0, confirmed=None):
+    """ load_engine.push_config on an async connection, the wait for each
+    chunk's sync line lets the other sessions run.
+    """
+
+    errors = []
+    chunks = load_engine.split_chunks(lines, profile['chunk_size'], start)
+    for count, (first_line, last_line, chunk) in enumerate(chunks):
+        emit(messages.progress('\n'.join(chunk)))
+        detail = f'lines {first_line}-{last_line}'
+        with tracing.default_tracer.span('config', tracing.device_of(router), detail) as span:
+            span['bytes'] = sum(len(line) + 1 for line in chunk)
+            for line in chunk:
+                router.write_channel(line + '\n')
+                if profile['line_pace']:
+                    await asyncio.sleep(profile['line_pace'])
+            sentinel = load_engine.SYNC_LINE.format(count)
+            router.write_channel(sentinel + '\n')
+            sync_started = monotonic()
+            try:
+                output = await router.read_until(load_engine.sync_pattern(sentinel), profile['sync_timeout'])
+            except asyncio.TimeoutError:
+                raise load_engine.PushTimeout(f"No response from the router after {profile['sync_timeout']} "
+                                              "seconds.")
+        if tuner is not None:
+            profile = tuner(len(chunk), monotonic() - sync_started)
+        errors += load_engine.report_errors(output[:output.find(sentinel)], chunk, first_line, emit)
+        if confirmed is not None:
+            confirmed(last_line)
+    return errors
+
+
+async def load_config(device, config, emit, incremental=False, remove=False, resume=False):
+    lines = config.splitlines()
+    first, confirmed = 0, None
+    if not incremental:
+        first, confirmed = checkpoints.start(device, lines, resume, emit)
+        if first is None:
+            return device_ops.NOTHING_TO_RESUME
+    router = await async_transport.connect(device)
+    try:
+        emit(messages.progress('...connected...'))
+        if incremental:
+            emit(messages.progress('...comparing with the running config...'))
+            lines = config_model.diff(await router.send_command('show run'), config, remove)
+            if not lines:
+                return 'Nothing to load, the running config already matches.'
+            emit(messages.status(f'{len(lines)} lines to change.'))
+        await router.config_mode()
+        command_cache.cache.invalidate(device)  # from here on the device's show output may change
+        profiles = latency_profile.profiles
+        try:
+            errors = await push_config(router, lines, profiles.push_profile(device), emit,
+                                       profiles.tuner(device, emit), first, confirmed)
+        except load_engine.PushTimeout:
+            profiles.timed_out(device)
+            raise
+        await router.exit_config_mode()
+        emit(messages.output(await router.send_command('show run')))
+        await router.send_command('wr')
+    finally:
+        await router.disconnect()
+    checkpoints.clear(device)
+    return device_ops.load_result(errors)
+
+
+async def backup_config(device, emit, file_name, cancelled=None):
+    router = await async_transport.connect(device)
+    try:
+        emit(messages.progress('...connected...'))
+        config = await router.send_command('show run', cancelled=cancelled)
+        emit(messages.output(config))
+    finally:
+        await router.disconnect()
+    return device_ops.save_backup(config, file_name)
+
+
+async def run_command(device, command, emit=None):
+    router = await async_transport.connect(device)
+    try:
+        output = await router.send_command(command, device_ops.STREAM_TIMEOUT)
+    finally:
+        await router.disconnect()
+    if emit is not None:
+        emit(messages.output(output))
+    return output
+
+
+async def _run_fleet(devices, job, fallback, progress, done, max_sessions, describe_error):
+    in_flight = asyncio.Semaphore(max(1, max_sessions))
+    results = {}
+
+    async def one(device):
+        name = device_name(device)
+        emit = partial(progress, name)
+        async with in_flight:
+            try:
+                if async_transport.available(device):
+                    result = await job(device, emit)
+                else:  # console, or SSH without asyncssh, runs the usual way on the loop's thread pool
+                    result = await asyncio.get_running_loop().run_in_executor(None, fallback, device, emit)
+                results[name] = (True, result)
+            except Exception as e:
+                results[name] = (False, describe_error(e))
+        if done is not None:
+            done(name, *results[name])
+
+    await asyncio.gather(*(one(device) for device in devices))
+    return results
+
+
+def run_fleet(devices, job, fallback, progress, done=None, max_sessions=MAX_SESSIONS, describe_error=str):
+    """ fleet.run_fleet with job a coroutine, job(device, emit), for every
+    device the async transport can reach and fallback, the device_ops
+    version, for the rest.  Blocks the calling thread (a QThread or the
+    command line) until every device is done and returns {name: (ok, result)}.
+    """
+
+    return async_transport.run(_run_fleet(devices, job, fallback, progress, done, max_sessions, describe_error))
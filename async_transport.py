@@ -0,0 +1,337 @@
+import asyncio
+import device_errors
+import re
+import threading
+import tracing
+from device_ops import Cancelled
+from inventory import device_name
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''SSH and Telnet sessions on asyncio instead of a blocking netmiko connection per thread.  Every session runs on
+one event loop on one background thread, so hundreds of devices cost hundreds of sockets rather than hundreds of
+threads.  Telnet only needs the standard library, SSH needs asyncssh which is imported on the first SSH session.
+Each session records the same tracing spans as a netmiko one.  No Qt in here.'''
+
+ASYNC_TYPES = ('cisco_ios', 'cisco_ios_telnet')  # device types that can use this transport, console can't
+CONNECT_TIMEOUT = 20  # seconds to connect and log in
+READ_TIMEOUT = 60  # seconds without the expected prompt before a command is given up on
+CANCEL_POLL = 0.2  # seconds between looks at a command's cancelled while no output comes
+
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+
+_LOGIN = re.compile(r'(?i)(?:username|login): *$|password: *$|[>#] *$')
+_ANY_PROMPT = re.compile(r'(?:^|\n)([^\n]*?)[>#] *$')
+_LOGIN_FAILED = ('% Login invalid', '% Authentication failed', '% Bad passwords')
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def loop():
+    """ The event loop every async session runs on, started on a daemon
+    thread the first time it is needed.
+    """
+
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='snap-async-io', daemon=True).start()
+        return _loop
+
+
+def run(coroutine):
+    """ Run a coroutine on the async loop and wait for its result, from any thread but the loop's own. """
+
+    return asyncio.run_coroutine_threadsafe(coroutine, loop()).result()
+
+
+def available(device):
+    """ True if the device can use this transport here. """
+
+    if device['device_type'] == 'cisco_ios_telnet':
+        return True
+    if device['device_type'] != 'cisco_ios':
+        return False
+    try:
+        import asyncssh  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _Telnet:
+    """ A telnet connection with every option the router offers refused,
+    which leaves plain text both ways, the same thing telnetlib does for
+    netmiko.
+    """
+
+    def __init__(self, reader, writer):
+        """ Initialise the stream. """
+
+        self._reader = reader
+        self._writer = writer
+        self._pending = b''  # a command split over two reads
+        self._subnegotiation = False
+
+    async def read(self):
+        data = await self._reader.read(65536)
+        if not data:
+            raise ConnectionResetError('The device closed the connection.')
+        return self._filter(self._pending + data)
+
+    def _filter(self, data):
+        text = bytearray()
+        self._pending = b''
+        position = 0
+        while position < len(data):
+            byte = data[position]
+            if self._subnegotiation:
+                end = data.find(bytes([IAC, SE]), position)
+                if end < 0:
+                    self._pending = data[-1:] if data[-1] == IAC else b''
+                    break
+                self._subnegotiation = False
+                position = end + 2
+            elif byte != IAC:
+                end = data.find(bytes([IAC]), position)
+                end = len(data) if end < 0 else end
+                text += data[position:end]
+                position = end
+            elif position + 1 >= len(data) or (data[position + 1] in (DO, DONT, WILL, WONT)
+                                               and position + 2 >= len(data)):
+                self._pending = data[position:]
+                break
+            else:
+                command = data[position + 1]
+                if command == IAC:
+                    text.append(IAC)
+                elif command in (DO, WILL):
+                    self._writer.write(bytes([IAC, WONT if command == DO else DONT, data[position + 2]]))
+                elif command == SB:
+                    self._subnegotiation = True
+                position += 3 if command in (DO, DONT, WILL, WONT) else 2
+        return text.decode('utf-8', 'replace')
+
+    def write(self, text):
+        self._writer.write(text.encode().replace(bytes([IAC]), bytes([IAC, IAC])))
+
+    def close(self):
+        self._writer.close()
+
+
+class _SSH:
+    """ An interactive shell channel on an asyncssh connection. """
+
+    def __init__(self, connection, process):
+        """ Initialise the stream. """
+
+        self._connection = connection
+        self._process = process
+
+    async def read(self):
+        data = await self._process.stdout.read(65536)
+        if not data:
+            raise ConnectionResetError('The device closed the connection.')
+        return data
+
+    def write(self, text):
+        self._process.stdin.write(text)
+
+    def close(self):
+        self._connection.close()
+
+
+class AsyncConnection:
+    """ The netmiko calls SNAP makes, as coroutines.  write_channel doesn't
+    wait, everything that reads waits for the prompt (or another pattern)
+    without holding up the other sessions on the loop.
+    """
+
+    def __init__(self, stream, device, read_timeout=READ_TIMEOUT):
+        """ Initialise the connection. """
+
+        self.stream = stream
+        self.device = device
+        self.trace_name = device_name(device)  # for tracing.device_of
+        self.read_timeout = read_timeout
+        self.base_prompt = ''
+        self._prompt = _ANY_PROMPT
+        self._last_prompt = ''
+        self._buffer = ''  # read but not used yet, carriage returns already taken out
+
+    def write_channel(self, data):
+        self.stream.write(data)
+
+    async def read_until(self, pattern, timeout=None, cancelled=None):
+        """ Everything up to and including the first match of pattern.
+        cancelled is polled while waiting, like device_ops.stream_command's.
+        """
+
+        while True:
+            match = pattern.search(self._buffer)
+            if match:
+                text, self._buffer = self._buffer[:match.end()], self._buffer[match.end():]
+                return text
+            if cancelled is None:
+                data = await asyncio.wait_for(self.stream.read(), timeout or self.read_timeout)
+            else:
+                data = await self._read_or_cancel(timeout or self.read_timeout, cancelled)
+            self._buffer += data.replace('\r', '')
+
+    async def _read_or_cancel(self, timeout, cancelled):
+        read = asyncio.ensure_future(self.stream.read())
+        waited = 0
+        try:
+            while not read.done():
+                if cancelled():
+                    self.write_channel('\x1e')  # Ctrl+Shift+6 stops a ping or traceroute
+                    raise Cancelled()
+                if waited >= timeout:
+                    raise asyncio.TimeoutError()
+                await asyncio.wait({read}, timeout=CANCEL_POLL)
+                waited += CANCEL_POLL
+        finally:
+            read.cancel()  # nothing if it finished
+        return read.result()
+
+    async def _read_prompt(self):
+        """ Output up to the prompt, which is kept in _last_prompt rather than returned. """
+
+        text = await self.read_until(self._prompt)
+        output, _, prompt = text.rstrip(' ').rpartition('\n')
+        self._last_prompt = prompt
+        return output
+
+    def _learn_prompt(self):
+        self.base_prompt = re.sub(r'\(.*\)', '', self._last_prompt)[:-1]
+        self._prompt = re.compile(r'(?:^|\n)' + re.escape(self.base_prompt) + r'(?:\([\w.\-]*\))?[>#] *$')
+
+    async def set_base_prompt(self):
+        with tracing.default_tracer.span('prompt', self.trace_name):
+            self._prompt = _ANY_PROMPT
+            self.write_channel('\n')
+            await self._read_prompt()
+            self._learn_prompt()
+        return self.base_prompt
+
+    async def find_prompt(self):
+        self.write_channel('\n')
+        await self._read_prompt()
+        return self._last_prompt
+
+    async def send_command(self, command, timeout=None, cancelled=None):
+        """ Run an exec command and return its output without the echo or the
+        prompt.  If cancelled returns True while it runs, Cancelled is raised.
+        """
+
+        with tracing.default_tracer.span('command', self.trace_name, command) as span:
+            self.write_channel(command + '\n')
+            text = await self.read_until(self._prompt, timeout, cancelled)
+            output, _, self._last_prompt = text.rstrip(' ').rpartition('\n')
+            output = output.split('\n', 1)[1] if '\n' in output else ''
+            span['bytes'] = len(output)
+        return output
+
+    async def enable(self):
+        if self._last_prompt.endswith('#'):
+            return
+        with tracing.default_tracer.span('enable', self.trace_name):
+            self.write_channel('enable\n')
+            text = await self.read_until(re.compile(r'(?i)password: *$|' + self._prompt.pattern))
+            if text.rstrip().lower().endswith('password:'):
+                self.write_channel((self.device.get('secret') or self.device['password']) + '\n')
+                await self._read_prompt()
+            else:
+                self._last_prompt = text.rstrip(' ').rpartition('\n')[2]
+            if not self._last_prompt.endswith('#'):
+                raise ValueError('Failed to enter enable mode.')  # what netmiko raises
+
+    def check_config_mode(self):
+        return '(config' in self._last_prompt
+
+    async def config_mode(self):
+        if not self.check_config_mode():
+            await self.send_command('configure terminal')
+
+    async def exit_config_mode(self):
+        if self.check_config_mode():
+            self._prompt = _ANY_PROMPT  # the config may have changed the hostname
+            await self.send_command('end')
+            self._learn_prompt()
+
+    async def disconnect(self):
+        with tracing.default_tracer.span('disconnect', self.trace_name):
+            try:
+                self.write_channel('exit\n')
+            except Exception:
+                pass  # it's already gone
+            self.stream.close()
+
+
+async def _open_telnet(device):
+    with tracing.default_tracer.span('connect', device_name(device)):
+        reader, writer = await asyncio.open_connection(device['ip'], device.get('port') or 23)
+    router = AsyncConnection(_Telnet(reader, writer), device)
+    try:
+        with tracing.default_tracer.span('auth', router.trace_name):
+            for _ in range(6):  # banner, username, password, maybe one retry
+                text = await router.read_until(_LOGIN, CONNECT_TIMEOUT)
+                tail = text.rstrip().lower()
+                if any(failed in text for failed in _LOGIN_FAILED):
+                    break
+                if tail.endswith(('username:', 'login:')):
+                    router.write_channel(device['username'] + '\r\n')
+                elif tail.endswith('password:'):
+                    router.write_channel(device['password'] + '\r\n')
+                else:
+                    router._last_prompt = text.rstrip(' ').rpartition('\n')[2]
+                    return router
+            raise device_errors.NetMikoAuthenticationException(f"Telnet login failed: {device['ip']}")
+    except BaseException:  # connect's wait_for cancels a login that takes too long
+        router.stream.close()
+        raise
+
+
+async def _open_ssh(device):
+    import asyncssh  # only needed for SSH, and not every install has it
+    try:
+        with tracing.default_tracer.span('connect', device_name(device)):  # the SSH handshake logs in too
+            connection = await asyncssh.connect(device['ip'], port=device.get('port') or 22,
+                                                username=device['username'], password=device['password'],
+                                                known_hosts=None)
+    except asyncssh.PermissionDenied:
+        raise device_errors.NetMikoAuthenticationException(f"Authentication failure: {device['ip']}")
+    try:
+        process = await connection.create_process(term_type='vt100', term_size=(511, 24))
+    except BaseException:
+        connection.close()
+        raise
+    return AsyncConnection(_SSH(connection, process), device)
+
+
+async def connect(device):
+    """ Open a session and get it to enable mode with paging off, like session_pool.connect. """
+
+    opener = _open_telnet if device['device_type'] == 'cisco_ios_telnet' else _open_ssh
+    try:
+        router = await asyncio.wait_for(opener(device), CONNECT_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise device_errors.NetMikoTimeoutException(f"Connection to device timed-out: {device['ip']}")
+    try:
+        await router.set_base_prompt()
+        if router.check_config_mode():
+            await router.exit_config_mode()
+        await router.enable()
+        await router.send_command('terminal length 0')
+        await router.send_command('terminal width 511')
+    except BaseException:  # a session that never made it into the pool would never be closed
+        router.stream.close()
+        raise
+    return router
@@ -0,0 +1,150 @@
+import csv
+import device_ops
+import fleet
+import gzip
+import hashlib
+import messages
+import os
+import re
+import threading
+from datetime import datetime
+from inventory import device_name
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Scheduled backups go into an archive rather than loose text files.  Each config is stored once, gzipped,
+under the sha256 of the config with the lines that change on every show run taken out, so a router that
+hasn't changed costs one index line per backup.  No Qt in here.
+  Backups/index.csv                 time, device, hash, lines - one row per backup
+  Backups/objects/ab/abcdef....gz   the configs'''
+
+DEFAULT_ARCHIVE = 'Backups'
+INDEX_FIELDS = ['time', 'device', 'hash', 'lines']
+_VOLATILE = re.compile(r'^(Building configuration|Current configuration|Last configuration change|'
+                       r'NVRAM config last updated|ntp clock-period)')
+
+
+def normalize(config):
+    """ The config without the lines that differ between two show runs of
+    the same config (byte counts, timestamps, ntp drift) or trailing space.
+    """
+
+    lines = [line.rstrip() for line in config.replace('\r', '').splitlines()]
+    lines = [line for line in lines if not _VOLATILE.match(line)]
+    while lines and lines[0] == '':
+        lines.pop(0)
+    while lines and lines[-1] == '':
+        lines.pop()
+    return '\n'.join(lines) + '\n'
+
+
+class Archive:
+    """ A content addressed, compressed store of configs with an index of
+    which device had which config when.
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE):
+        """ Initialise the archive, the directory is made on the first store. """
+
+        self.path = path
+        self.index_path = os.path.join(path, 'index.csv')
+        self._lock = threading.Lock()  # backups from several worker threads share the index
+        self._latest = {}  # each device's last index row, so a store doesn't read the whole index
+        self._index_size = 0  # size of the index when _latest was built, another process may append
+
+    def _object_path(self, digest):
+        return os.path.join(self.path, 'objects', digest[:2], digest + '.gz')
+
+    def store(self, device, config, when=None):
+        """ Archive a config pulled from device and return (hash, changed)
+        where changed is False if it matches the device's last backup.
+        """
+
+        text = normalize(config)
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):  # the same config is only ever written once
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp = f'{path}.{threading.get_ident()}.tmp'
+            with gzip.open(temp, 'wt') as file:
+                file.write(text)
+            os.replace(temp, path)
+        when = (when or datetime.now()).isoformat(timespec='seconds')
+        entry = {'time': when, 'device': device, 'hash': digest, 'lines': str(text.count('\n'))}
+        with self._lock:
+            previous = self.latest().get(device)
+            new_index = not os.path.exists(self.index_path)
+            with open(self.index_path, 'a', newline='') as file:
+                writer = csv.DictWriter(file, INDEX_FIELDS)
+                if new_index:
+                    writer.writeheader()
+                writer.writerow(entry)
+            self._latest[device] = entry
+            self._index_size = os.path.getsize(self.index_path)
+        return digest, previous is None or previous['hash'] != digest
+
+    def entries(self):
+        """ Every index row, oldest first.  Never opens a config. """
+
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, newline='') as file:
+            return list(csv.DictReader(file))
+
+    def latest(self):
+        """ {device: index row} of each device's last backup. """
+
+        size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        if size != self._index_size:
+            self._latest = {entry['device']: entry for entry in self.entries()}
+            self._index_size = size
+        return dict(self._latest)
+
+    def changed(self):
+        """ [(device, time of last backup, changed)] where changed is True if
+        the last backup differs from the one before it (or is the first).
+        Read from the index only, no config is decompressed.
+        """
+
+        last, before = {}, {}
+        for entry in self.entries():
+            if entry['device'] in last:
+                before[entry['device']] = last[entry['device']]
+            last[entry['device']] = entry
+        return [(device, entry['time'], device not in before or before[device]['hash'] != entry['hash'])
+                for device, entry in sorted(last.items())]
+
+    def history(self, device):
+        return [entry for entry in self.entries() if entry['device'] == device]
+
+    def read(self, digest):
+        """ The config stored under a hash. """
+
+        with gzip.open(self._object_path(digest), 'rt') as file:
+            return file.read()
+
+
+def archive_fleet(devices, archive, progress, done=None, max_workers=fleet.MAX_WORKERS, cancelled=None):
+    """ Pull every device's running config into the archive, max_workers at
+    a time.  Same callbacks and result as fleet.run_fleet.  cancelled is
+    polled while each config comes in, once it returns True the pulls still
+    going and the devices not started yet fail as cancelled.
+    """
+
+    def backup(device, emit):
+        if cancelled is not None and cancelled():
+            raise device_ops.Cancelled()
+        emit(messages.progress('...pulling the running config...'))
+        if cancelled is None:
+            config = device_ops.run_command(device, 'show run')
+        else:  # streamed, only so it can be stopped part way, the config isn't shown
+            config = device_ops.run_command(device, 'show run', lambda output: None, cancelled)
+        digest, changed = archive.store(device_name(device), config)
+        return f'Archived {digest[:12]}, {"changed" if changed else "unchanged"}'
+
+    return fleet.run_fleet(devices, backup, progress, done, max_workers, device_ops.describe_error)
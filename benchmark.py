@@ -0,0 +1,604 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+from time import perf_counter
+import config_model
+import config_template
+import csv
+import device_store
+import fake_ios
+import fleet
+import load_engine
+import messages
+import route_index
+import show_parsers
+import sweep
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Timing benchmarks against the fake IOS shell.  Run with: python benchmark.py load --lines 100'''
+
+
+def sample_config(lines):
+    """ Build a branch style config of roughly the requested number of lines. """
+
+    config = ['hostname BRANCH-01', 'service timestamps log datetime msec', 'banner motd ^',
+              'Authorized access only', '^']
+    number = 0
+    while len(config) < lines:
+        number += 1
+        config += [f'interface GigabitEthernet0/{number}',
+                   f' description Link {number}',
+                   f' ip address 10.{number // 250}.{number % 250}.1 255.255.255.0',
+                   ' no shutdown',
+                   '!']
+    return config[:lines]
+
+
+def bench_load(lines, transport, latency, baud):
+    """ Time the old line-at-a-time load against the chunked push. """
+
+    config = sample_config(lines)
+
+    router = fake_ios.FakeConnection(latency=latency, baud=baud)
+    router.enable()
+    router.config_mode()
+    start = perf_counter()
+    for line in config:
+        router.send_command(line, delay_factor=3, auto_find_prompt=False)
+    per_line = perf_counter() - start
+
+    router = fake_ios.FakeConnection(latency=latency, baud=baud)
+    router.enable()
+    router.config_mode()
+    start = perf_counter()
+    errors = load_engine.push_config(router, config, load_engine.PUSH_PROFILES[transport], lambda message: None)
+    chunked = perf_counter() - start
+
+    print(f'{lines} lines over {transport} (latency {latency * 1000:.0f} ms, baud {baud or "unlimited"})')
+    print(f'  per-line send_command : {per_line:8.2f} s')
+    print(f'  chunked push          : {chunked:8.2f} s  ({len(errors)} errors)')
+    print(f'  speed up              : {per_line / chunked:8.1f} x')
+
+
+def bench_fleet(devices, lines, latency, workers):
+    """ Time loading the same config onto several fake routers one after the
+    other and through the fleet worker pool.
+    """
+
+    config = sample_config(lines)
+    profile = load_engine.PUSH_PROFILES['cisco_ios']
+    inventory = [{'device_type': 'cisco_ios', 'ip': f'10.0.0.{number}'} for number in range(1, devices + 1)]
+
+    def job(device, emit):
+        router = fake_ios.FakeConnection(latency=latency)
+        router.enable()
+        router.config_mode()
+        load_engine.push_config(router, config, profile, emit)
+        router.exit_config_mode()
+        return 'Load Complete'
+
+    start = perf_counter()
+    for device in inventory:
+        job(device, lambda message: None)
+    sequential = perf_counter() - start
+
+    start = perf_counter()
+    fleet.run_fleet(inventory, job, lambda name, message: None, max_workers=workers)
+    parallel = perf_counter() - start
+
+    print(f'{devices} devices x {lines} lines (latency {latency * 1000:.0f} ms, {workers} workers)')
+    print(f'  one at a time : {sequential:8.2f} s')
+    print(f'  fleet pool    : {parallel:8.2f} s')
+    print(f'  single device : {sequential / devices:8.2f} s')
+
+
+def bench_viewer(lines):
+    """ Per-message cost of getting a config into a log viewer: what the
+    pages used to do, a new handler with its four formats and an
+    appendPlainText for every line, against one buffered handler per page.
+    Needs PyQt5, runs off screen.
+    """
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtGui import QColor
+    from PyQt5.QtWidgets import QAbstractSlider, QApplication, QPlainTextEdit
+    from message_handler import LoggingMessageHandler, MAX_BLOCKS
+
+    app = QApplication.instance() or QApplication([])
+    config = [messages.progress(line) for line in sample_config(lines)]
+
+    def old_status_message(viewer, text):  # LoggingMessageHandler(...).status_message(text) before buffering
+        formats = []
+        for colour in ('#1E90FF', '#F8F8FF', '#000000', '#1E90FF'):  # default, error, status, title
+            char_format = viewer.currentCharFormat()
+            char_format.setForeground(QColor(colour))
+            formats.append(char_format)
+        formats[3].setFontPointSize(20)
+        viewer.setCurrentCharFormat(formats[2])
+        viewer.appendPlainText(text)
+        viewer.setCurrentCharFormat(formats[0])
+        viewer.verticalScrollBar().triggerAction(QAbstractSlider.SliderToMaximum)
+
+    viewer = QPlainTextEdit(readOnly=True)
+    start = perf_counter()
+    for line in config:
+        old_status_message(viewer, line)
+    app.processEvents()
+    before = perf_counter() - start
+
+    viewer = QPlainTextEdit(readOnly=True)
+    logger = LoggingMessageHandler(bool(), viewer, buffered=True, max_blocks=MAX_BLOCKS)
+    start = perf_counter()
+    for line in config:
+        logger.handle(line)
+    logger.flush()
+    app.processEvents()
+    after = perf_counter() - start
+
+    print(f'{lines} messages into a log viewer')
+    print(f'  handler per message, unbuffered : {before / lines * 1e6:8.1f} us/message  ({before:.2f} s)')
+    print(f'  one buffered handler            : {after / lines * 1e6:8.1f} us/message  ({after:.2f} s)')
+
+
+STARTUP = '''
+import os, sys
+from time import perf_counter
+start = perf_counter()
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+if {eager}:
+    import netmiko, serial.tools.list_ports
+import SNAP
+window = SNAP.SNAPWindow()
+if {eager}:
+    window.build_all_tabs()
+window.show()
+app.processEvents()
+print(perf_counter() - start)
+'''
+
+
+def bench_startup(runs):
+    """ Time from a fresh interpreter to the window being shown, importing
+    netmiko and pyserial and building every tab up front (the way SNAP used
+    to start) against the lazy start.  Each run is a new process so nothing
+    is already imported, the best of the runs is reported.  Needs PyQt5.
+    """
+
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def time_start(eager):
+        times = []
+        for _ in range(runs):
+            start = perf_counter()
+            result = subprocess.run([sys.executable, '-c', STARTUP.format(eager=eager)], cwd=here,
+                                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True,
+                                    check=True)
+            times.append((perf_counter() - start, float(result.stdout.split()[-1])))
+        return min(times)
+
+    before, before_window = time_start(True)
+    after, after_window = time_start(False)
+    print(f'time to window shown, best of {runs}')
+    print(f'  everything up front : {before:6.2f} s  ({before_window:.2f} s after the interpreter started)')
+    print(f'  lazy                : {after:6.2f} s  ({after_window:.2f} s after the interpreter started)')
+
+
+def bench_parse(lines):
+    """ Time parsing a large config into the indexed tree and looking sections up in it. """
+
+    text = '\n'.join(sample_config(lines))
+    start = perf_counter()
+    config = config_model.parse(text)
+    parsed = perf_counter() - start
+
+    headers = [node.line for node in config.find('interface', top_level=True)]
+    start = perf_counter()
+    for header in headers:
+        config.section(header)
+    lookup = perf_counter() - start
+
+    start = perf_counter()
+    config_model.diff(text, text.replace('no shutdown', 'shutdown'))
+    diffed = perf_counter() - start
+
+    print(f'{lines} line config')
+    print(f'  parse          : {parsed:8.3f} s')
+    print(f'  section lookup : {lookup / len(headers) * 1e6:8.2f} us each ({len(headers)} interfaces)')
+    print(f'  diff           : {diffed:8.3f} s  (every interface changed)')
+
+
+def bench_template(devices, lines):
+    """ Time rendering one template for many devices, compiling it for
+    every device vs once from the cache, and the config_check each
+    rendered config gets before it is loaded.
+    """
+
+    text = '\n'.join(sample_config(lines)).replace('BRANCH-01', '{{ hostname }}').replace('Link', '{{ site }} link')
+    variables = config_template.Variables([{'host': f'10.0.{number // 250}.{number % 250}', 'hostname': f'BR-{number}',
+                                            'site': f'Site {number}'} for number in range(devices)])
+    inventory = [{'device_type': 'cisco_ios', 'ip': host} for host in variables.rows]
+
+    start = perf_counter()
+    for device in inventory:
+        config_template.Template(text).render(variables.for_device(device))
+    uncached = perf_counter() - start
+
+    config_template.compile_template.cache_clear()
+    start = perf_counter()
+    for device in inventory:
+        config_template.compile_template(text).render(variables.for_device(device))
+    cached = perf_counter() - start
+
+    template = config_template.compile_template(text)
+    start = perf_counter()
+    for device in inventory:
+        config_template.config_for(template, variables, device)
+    checked = perf_counter() - start
+
+    print(f'{devices} devices x {lines} line template')
+    print(f'  compile every device : {uncached:8.3f} s')
+    print(f'  compile once, cached : {cached:8.3f} s')
+    print(f'  render + config_check: {checked:8.3f} s  ({checked / devices * 1000:.2f} ms a device)')
+
+
+def bench_store(devices, sites):
+    """ Time importing an inventory into the device store and picking a
+    site and a tag out of it, against reading the CSV and filtering it.
+    """
+
+    import tempfile
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'inventory.csv')
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['method', 'host', 'hostname', 'site', 'tags'])
+        for number in range(devices):
+            writer.writerow(['ssh', f'10.{number // 62500}.{number // 250 % 250}.{number % 250 + 1}', f'R{number}',
+                             f'site{number % sites}', 'core' if number % 100 == 0 else 'edge'])
+    store = device_store.DeviceStore(os.path.join(folder, 'inventory.db'))
+    start = perf_counter()
+    store.import_csv(path)
+    imported = perf_counter() - start
+
+    runs = 100
+    start = perf_counter()
+    for run in range(runs):
+        with open(path, newline='') as file:
+            picked = [row for row in csv.DictReader(file) if row['site'] == f'site{run % sites}']
+    scanned = (perf_counter() - start) / runs
+    start = perf_counter()
+    for run in range(runs):
+        by_site = store.search(site=f'site{run % sites}')
+    site_search = (perf_counter() - start) / runs
+    start = perf_counter()
+    for run in range(runs):
+        by_tag = store.search(tag='core')
+    tag_search = (perf_counter() - start) / runs
+    start = perf_counter()
+    for run in range(runs):
+        store.devices([row[0] for row in by_site], 'user', 'password')
+    built = (perf_counter() - start) / runs
+    store.close()
+
+    print(f'{devices} devices over {sites} sites')
+    print(f'  import CSV            : {imported:8.3f} s')
+    print(f'  CSV scan for a site   : {scanned * 1000:8.2f} ms  ({len(picked)} devices)')
+    print(f'  store, one site       : {site_search * 1000:8.2f} ms  ({len(by_site)} devices)')
+    print(f'  store, one tag        : {tag_search * 1000:8.2f} ms  ({len(by_tag)} devices)')
+    print(f'  device dicts for site : {built * 1000:8.2f} ms')
+
+
+def bench_routes(routes):
+    """ Time parsing a big show ip route into a table, then sorting and filtering it. """
+
+    output = fake_ios.route_table(routes)
+    start = perf_counter()
+    table = show_parsers.parse('show ip route', output)
+    parsed = perf_counter() - start
+
+    rows = list(range(len(table)))
+    start = perf_counter()
+    table.sort(rows, table.column('prefix'), reverse=True)
+    first_sort = perf_counter() - start
+    start = perf_counter()
+    table.sort(rows, table.column('prefix'))
+    sort = perf_counter() - start
+
+    start = perf_counter()
+    table.filter('172.16.4')
+    first_filter = perf_counter() - start
+    start = perf_counter()
+    matches = table.filter('interface:gigabitethernet0/3')
+    one_column = perf_counter() - start
+    start = perf_counter()
+    table.filter('10.0.0.3')
+    all_columns = perf_counter() - start
+
+    print(f'show ip route with {len(table)} routes')
+    print(f'  parse                         : {parsed:6.2f} s')
+    print(f'  sort by prefix, first / again : {first_sort:6.2f} s / {sort:.2f} s')
+    print(f'  filter every column, first    : {first_filter:6.2f} s')
+    print(f'  filter every column, again    : {all_columns:6.2f} s')
+    print(f'  filter one column             : {one_column:6.2f} s  ({len(matches)} matches)')
+
+    start = perf_counter()
+    index = route_index.RouteIndex(table)
+    built = perf_counter() - start
+    start = perf_counter()
+    for number in range(10000):
+        index.lookup(f'172.{16 + number % 16}.{number % 256}.{number % 200}')
+    lookup = (perf_counter() - start) / 10000
+    print(f'  route index build             : {built:6.2f} s')
+    print(f'  longest prefix match          : {lookup * 1e6:6.1f} us')
+
+
+def bench_sweep(targets, dead, latency, timeout):
+    """ Time a ping sweep from a fake router one target at a time against
+    the sweep's sessions.  dead targets never answer and cost the full
+    ping timeout.
+    """
+
+    from session_pool import pool
+
+    addresses = [f'10.1.{number // 250}.{number % 250 + 1}' for number in range(targets)]
+
+    def connect(device):
+        router = fake_ios.FakeConnection(latency=latency)
+        router.shell.unreachable = set(addresses[:dead])
+        router.enable()
+        return router
+
+    saved = pool._connect, sweep.PING_TIMEOUT  # put back afterwards, so later benchmarks get real sessions
+    pool._connect = connect
+    sweep.PING_TIMEOUT = timeout  # the fake takes fractions of a second, real IOS only whole ones
+    device = {'device_type': 'cisco_ios', 'host': 'bench'}
+    times = {}
+    try:
+        for sessions in (1, sweep.SESSIONS, targets):
+            start = perf_counter()
+            sweep.sweep(device, addresses, sessions=sessions)
+            times[sessions] = perf_counter() - start
+    finally:
+        pool.close_all()
+        pool._connect, sweep.PING_TIMEOUT = saved
+
+    print(f'{targets} targets, {dead} dead, {latency * 1000:.0f} ms latency, {timeout} s ping timeout')
+    for sessions, seconds in times.items():
+        print(f'  {sessions:4} sessions : {seconds:8.2f} s')
+
+
+def bench_async(devices, latency, workers):
+    """ Run a command on many fake telnet routers with netmiko a thread per
+    device against the async transport, and count the threads each needs.
+    """
+
+    import async_ops
+    import device_ops
+    import fake_server
+    from inventory import build_device
+    from session_pool import pool
+
+    server = fake_server.FakeServer(latency=latency)
+    inventory = [build_device('cisco_ios_telnet', '127.0.0.1', 'bench', 'bench', port)
+                 for port in server.telnet(devices)]
+    command = 'show ip interface brief'
+    baseline = threading.active_count()  # this thread and the fake server's
+
+    def timed(run):
+        peak = [0]
+        running = threading.Event()
+
+        def sample():
+            while not running.wait(0.05):
+                peak[0] = max(peak[0], threading.active_count() - baseline - 1)
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        start = perf_counter()
+        results = run()
+        seconds = perf_counter() - start
+        running.set()
+        sampler.join()
+        failed = sum(1 for ok, _ in results.values() if not ok)
+        return seconds, peak[0], failed
+
+    def netmiko_job(device, emit):
+        return device_ops.run_command(device, command)
+
+    def async_job(device, emit):
+        return async_ops.run_command(device, command)
+
+    rows = [('async transport', *timed(lambda: async_ops.run_fleet(inventory, async_job, netmiko_job,
+                                                                    lambda name, message: None,
+                                                                    max_sessions=devices)))]
+    for count in dict.fromkeys((workers, devices)):
+        rows.append((f'netmiko x{count}', *timed(lambda: fleet.run_fleet(inventory, netmiko_job,
+                                                                         lambda name, message: None,
+                                                                         max_workers=count))))
+        fleet.run_fleet(inventory, lambda device, emit: pool.close(device), lambda name, message: None,
+                        max_workers=devices)  # netmiko takes a couple of seconds to log out
+    server.close()
+
+    print(f'"{command}" on {devices} telnet routers, {latency * 1000:.0f} ms latency')
+    for name, seconds, threads, failed in rows:
+        print(f'  {name:16}: {seconds:8.2f} s  {threads:4} threads  {failed} failed')
+
+
+E2E_TRANSPORTS = {'telnet': 'cisco_ios_telnet', 'ssh': 'cisco_ios', 'serial': 'cisco_ios_serial'}
+
+
+def bench_e2e(transports, latency, baud, lines, routes, serial_link, save, compare, tolerance):
+    """ Time verify, load, backup and troubleshoot end to end, through the
+    session pool and netmiko, against fake routers on real sockets and ptys,
+    plus the async transport over telnet.  save writes the times to a JSON
+    file, compare checks them against one saved earlier and returns the
+    steps more than tolerance slower than it was.
+    """
+
+    import tempfile
+    import async_ops
+    import async_transport
+    import device_ops
+    import fake_server
+    from inventory import build_device
+    from session_pool import pool
+
+    config = '\n'.join(sample_config(lines))
+    quiet = lambda message: None  # noqa: E731
+    server = fake_server.FakeServer(latency=latency, baud=baud, credentials=('bench', 'bench'))
+    devices = {}
+    for transport in transports:
+        if transport == 'serial':
+            port = server.serial(1, serial_link)[0]
+            devices[transport] = build_device(E2E_TRANSPORTS[transport], port, 'bench', 'bench')
+        else:
+            port = getattr(server, transport)(1)[0]
+            devices[transport] = build_device(E2E_TRANSPORTS[transport], '127.0.0.1', 'bench', 'bench', port)
+        server.shells[-1].outputs['show ip route'] = fake_ios.route_table(routes)
+
+    def troubleshoot(device):
+        return show_parsers.parse('show ip route', device_ops.run_command(device, 'show ip route'))
+
+    settings = {'lines': lines, 'routes': routes, 'latency': latency, 'baud': baud}
+    print(f'{lines} line load, {routes} routes, {latency * 1000:.0f} ms latency, baud {baud or "unlimited"}')
+    baseline = {}
+    if compare:
+        with open(compare) as baseline_file:
+            saved = json.load(baseline_file)
+        baseline = saved['times']
+        changed = [f'{name} {saved.get(name)}' for name, value in settings.items() if saved.get(name) != value]
+        if changed:
+            print(f'{compare} was run with {", ".join(changed)}, the times may not compare')
+    times = {}
+    regressions = []
+
+    def report(step, seconds):  # as each step finishes, a console run takes a while
+        times[step] = seconds
+        line = f'  {step:24}: {seconds:8.2f} s'
+        if step.endswith(' load'):
+            line += f'  ({lines / seconds:6.0f} lines/s)'
+        if step in baseline:
+            change = seconds / baseline[step] - 1
+            line += f'  {change:+6.0%} on {baseline[step]:.2f} s'
+            if change > tolerance:
+                regressions.append(step)
+                line += '  SLOWER'
+        print(line, flush=True)
+
+    backup_file = os.path.join(tempfile.mkdtemp(), 'backup.txt')
+    try:
+        for transport, device in devices.items():
+            steps = [('verify', lambda: device_ops.verify(device, quiet)),
+                     ('load', lambda: device_ops.load_config(device, config, quiet)),
+                     ('backup', lambda: device_ops.backup_config(device, quiet, backup_file)),
+                     ('troubleshoot', lambda: troubleshoot(device))]
+            if async_transport.available(device):
+                steps += [('async verify', lambda: async_transport.run(async_ops.verify(device, quiet))),
+                          ('async load', lambda: async_transport.run(async_ops.load_config(device, config, quiet)))]
+            for step, run in steps:
+                start = perf_counter()
+                run()
+                report(f'{transport} {step}', perf_counter() - start)
+            pool.close(device)
+    finally:
+        server.close()
+        if os.path.exists(backup_file):
+            os.remove(backup_file)
+
+    if save:
+        with open(save, 'w') as save_file:
+            json.dump(dict(settings, times=times), save_file, indent=1)
+    if regressions:
+        print(f'{len(regressions)} steps more than {tolerance:.0%} slower than {compare}: {", ".join(regressions)}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SNAP benchmarks against a fake IOS shell.')
+    commands = parser.add_subparsers(dest='benchmark')
+    load = commands.add_parser('load', help='per-line vs chunked config load')
+    load.add_argument('--lines', type=int, default=100)
+    load.add_argument('--transport', default='cisco_ios_serial', choices=sorted(load_engine.PUSH_PROFILES))
+    load.add_argument('--latency', type=float, default=0.01, help='one-way latency in seconds')
+    load.add_argument('--baud', type=int, default=None)
+    fleet_load = commands.add_parser('fleet', help='one device at a time vs the fleet worker pool')
+    fleet_load.add_argument('--devices', type=int, default=20)
+    fleet_load.add_argument('--lines', type=int, default=500)
+    fleet_load.add_argument('--latency', type=float, default=0.05, help='one-way latency in seconds')
+    fleet_load.add_argument('--workers', type=int, default=fleet.MAX_WORKERS)
+    viewer = commands.add_parser('viewer', help='per-message cost of the log viewer (needs PyQt5)')
+    viewer.add_argument('--lines', type=int, default=10000)
+    parse = commands.add_parser('parse', help='parse, look up and diff a large config')
+    parse.add_argument('--lines', type=int, default=100000)
+    startup = commands.add_parser('startup', help='time to window shown, eager vs lazy imports (needs PyQt5)')
+    startup.add_argument('--runs', type=int, default=5)
+    template = commands.add_parser('template', help='render a config template for many devices')
+    template.add_argument('--devices', type=int, default=200)
+    template.add_argument('--lines', type=int, default=500)
+    store = commands.add_parser('store', help='device store import and site/tag search vs scanning a CSV')
+    store.add_argument('--devices', type=int, default=20000)
+    store.add_argument('--sites', type=int, default=200)
+    routes = commands.add_parser('routes', help='parse, sort and filter a big routing table')
+    routes.add_argument('--routes', type=int, default=900000)
+    sweep_targets = commands.add_parser('sweep', help='ping sweep one target at a time vs several sessions')
+    sweep_targets.add_argument('--targets', type=int, default=40)
+    sweep_targets.add_argument('--dead', type=int, default=4, help='targets that never answer')
+    sweep_targets.add_argument('--latency', type=float, default=0.02, help='one-way latency in seconds')
+    sweep_targets.add_argument('--timeout', type=float, default=0.5, help='ping timeout in seconds')
+    async_io = commands.add_parser('async', help='netmiko thread per device vs the asyncio transport')
+    async_io.add_argument('--devices', type=int, default=100)
+    async_io.add_argument('--latency', type=float, default=0.05, help='one-way latency in seconds')
+    async_io.add_argument('--workers', type=int, default=fleet.MAX_WORKERS, help='netmiko threads')
+    e2e = commands.add_parser('e2e', help='verify, load, backup and troubleshoot against fake routers on sockets and '
+                                          'ptys, exits 1 if slower than a saved run')
+    e2e.add_argument('--transports', nargs='+', default=['telnet', 'ssh'], choices=sorted(E2E_TRANSPORTS),
+                     help='serial needs write access to /dev for the pty symlink')
+    e2e.add_argument('--latency', type=float, default=0.01, help='one-way latency in seconds')
+    e2e.add_argument('--baud', type=int, default=None, help='console speed')
+    e2e.add_argument('--lines', type=int, default=500, help='lines in the config loaded')
+    e2e.add_argument('--routes', type=int, default=5000, help='routes in show ip route')
+    e2e.add_argument('--serial-link', default='/dev/ttyUSBsnap', help='what the serial pty is symlinked as')
+    e2e.add_argument('--save', help='write the times to this JSON file')
+    e2e.add_argument('--compare', help='JSON file from an earlier --save to check the times against')
+    e2e.add_argument('--tolerance', type=float, default=0.25, help='how much slower than --compare is a regression')
+    args = parser.parse_args()
+    if args.benchmark == 'load':
+        bench_load(args.lines, args.transport, args.latency, args.baud)
+    elif args.benchmark == 'fleet':
+        bench_fleet(args.devices, args.lines, args.latency, args.workers)
+    elif args.benchmark == 'viewer':
+        bench_viewer(args.lines)
+    elif args.benchmark == 'parse':
+        bench_parse(args.lines)
+    elif args.benchmark == 'startup':
+        bench_startup(args.runs)
+    elif args.benchmark == 'template':
+        bench_template(args.devices, args.lines)
+    elif args.benchmark == 'store':
+        bench_store(args.devices, args.sites)
+    elif args.benchmark == 'routes':
+        bench_routes(args.routes)
+    elif args.benchmark == 'sweep':
+        bench_sweep(args.targets, args.dead, args.latency, args.timeout)
+    elif args.benchmark == 'async':
+        bench_async(args.devices, args.latency, args.workers)
+    elif args.benchmark == 'e2e':
+        if bench_e2e(args.transports, args.latency, args.baud, args.lines, args.routes, args.serial_link, args.save,
+                     args.compare, args.tolerance):
+            sys.exit(1)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
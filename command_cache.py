@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+from session_pool import session_key
+from time import monotonic
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Output of read only show commands kept for a short while per device, so pressing a Troubleshoot button twice
+doesn't cost two runs over a 9600 baud console.  Anything that changes a device (load, zeroize) invalidates
+that device.  No Qt in here.'''
+
+TTLS = {  # seconds each command's output is good for, commands not in here are never cached
+    'show ip interface brief': 30,
+    'show ip ospf neigh': 30,
+    'show ip eigrp neigh': 30,
+    'show crypto ikev2 sa': 30,
+    'show ip route': 60,
+}
+MAX_ENTRIES = 64  # least recently used output is dropped past this
+
+
+class CommandCache:
+    """ A TTL and LRU cache of command output keyed by device and command. """
+
+    def __init__(self, ttls=TTLS, max_entries=MAX_ENTRIES):
+        """ Initialise the cache. """
+
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.listeners = []  # called with the device whenever it is invalidated
+        self._entries = OrderedDict()  # (session_key, command) -> (output, monotonic time stored)
+        self._lock = threading.Lock()
+
+    def get(self, device, command):
+        """ (output, age in seconds) if the command ran on the device recently enough, otherwise None. """
+
+        ttl = self.ttls.get(command)
+        if ttl is None:
+            return None
+        key = (session_key(device), command)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            age = monotonic() - entry[1]
+            if age > ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], age
+
+    def put(self, device, command, output):
+        if command not in self.ttls or not output:  # nothing back usually means it didn't work
+            return
+        key = (session_key(device), command)
+        with self._lock:
+            self._entries[key] = (output, monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, device):
+        """ Forget everything cached for a device, its config has changed. """
+
+        device_key = session_key(device)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == device_key]:
+                del self._entries[key]
+        for listener in self.listeners:
+            listener(device)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def describe_age(age):
+    return f'From cache, {int(age)} s old.  Tick Force refresh to run it on the device again.'
+
+
+cache = CommandCache()  # shared by every tab
@@ -0,0 +1,98 @@
+import re
+from config_model import _BANNER
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Checks a config file on the workstation before any of it is sent, so a load that would fail fails here
+in milliseconds instead of half way through on the router.  No Qt in here.'''
+
+ERROR = 'error'  # the load won't be started
+STRIPPED = 'stripped'  # the line was taken out, it would only upset the router
+DUPLICATE = 'duplicate'  # the line was taken out, it is already in the config
+
+_PREAMBLE = re.compile(r'^(en|enable|conf|conf t|config t|configure|configure terminal|end|'
+                       r'Building configuration.*|Current configuration.*|Last configuration change.*|'
+                       r'NVRAM config last updated.*|[\w.-]+(\(config[\w-]*\))?[>#].*)$', re.IGNORECASE)
+_POSITIONAL = re.compile(r'^(exit\S*|remark|access-list \S+ remark)( |$)')  # where they are matters, repeats stay
+_EXEC_ONLY = ('write', 'wr', 'copy', 'reload', 'show', 'sh', 'ping', 'traceroute', 'dir', 'erase', 'delete')
+
+
+def check(text):
+    """ Check a config and return (lines, problems).  lines is the config
+    with the preamble (enable, conf t, Building configuration..., end, pasted
+    prompts) and repeated lines blanked out, so a push still reports errors
+    at the line numbers of text.  A line is only a repeat of one under the
+    same parent lines, ' neighbor 10.0.0.1 activate' can be in every
+    address-family, and exit-address-family and ACL remarks never are, they
+    belong where they are.  problems is a list of (line_no, kind, message) in line
+    order, the config shouldn't be loaded if any of them are ERROR.
+    """
+
+    problems = []
+    lines = []
+    entries = []  # (index in lines, indent) of the lines left after the preamble is stripped
+    banner = None  # (delimiter, line_no) while inside a banner
+    for line_no, line in enumerate(text.splitlines(), 1):
+        stripped = line.strip()
+        lines.append(line)
+        if banner is not None:
+            entries.append((line_no - 1, None))  # banner text is sent as it is
+            if banner[0] in line:
+                banner = None
+            continue
+        if _PREAMBLE.match(stripped):
+            problems.append((line_no, STRIPPED, f'"{stripped}" is not config, taken out'))
+            lines[-1] = ''
+            continue
+        words = stripped.split()
+        if words and words[0] in _EXEC_ONLY:
+            problems.append((line_no, ERROR, f'"{stripped}" is an exec command, it fails in config mode '
+                                             f'(use "do {stripped}")'))
+        match = _BANNER.match(stripped)
+        if match:
+            entries.append((line_no - 1, None))
+            if match.group(1) not in stripped[match.end():]:
+                banner = (match.group(1), line_no)
+            continue
+        entries.append((line_no - 1, len(line) - len(line.lstrip())))
+    if banner is not None:
+        problems.append((banner[1], ERROR, f'banner never ends, "{banner[0]}" does not appear again'))
+
+    seen = set()
+    stack = []  # (indent, line) of the sections the current line is under, like config_model.parse
+    for number, (index, indent) in enumerate(entries):
+        stripped = ' '.join(lines[index].split())
+        if indent is None:
+            stack = []  # a banner is a top level line
+            continue
+        if stripped in ('', '!'):
+            continue
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        key = tuple(line for _, line in stack) + (stripped,)
+        stack.append((indent, stripped))
+        if key not in seen or _POSITIONAL.match(stripped):
+            seen.add(key)
+            continue
+        following = next((entry[1] for entry in entries[number + 1:] if entry[1] is None or
+                          ' '.join(lines[entry[0]].split()) not in ('', '!')), None)
+        if following is None or following <= indent:  # a repeated section header still has lines to add
+            problems.append((index + 1, DUPLICATE, f'"{stripped}" is repeated, taken out'))
+            lines[index] = ''
+    problems.sort()
+    return lines, problems
+
+
+def report(problems):
+    """ The problems as lines for the operator, one per problem. """
+
+    return [f' line {line_no}: {message}' for line_no, kind, message in problems]
+
+
+def errors(problems):
+    return [problem for problem in problems if problem[1] == ERROR]
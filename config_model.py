@@ -0,0 +1,201 @@
+import re
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''IOS configs as a tree of sections (interface, router ospf, line vty...) with an index so the load, backup
+and troubleshoot code can look lines up and two configs can be compared without going back over the text.'''
+
+_NOISE = re.compile(r'^(!|Building configuration|Current configuration|Last configuration change|'
+                    r'NVRAM config last updated|end$)')
+_BANNER = re.compile(r'^banner\s+\S+\s+(\^C|\S)')
+NEVER_REMOVE = ('version', 'hostname', 'boot-start-marker', 'boot-end-marker', 'interface')
+
+
+class Node:
+    """ One line of config and the lines indented under it. """
+
+    __slots__ = ('line', 'parent', 'children', 'body')  # a big config has a lot of these
+
+    def __init__(self, line, parent=None):
+        """ Initialise the node. """
+
+        self.line = line  # stripped of indentation
+        self.parent = parent
+        self.children = []
+        self.body = None  # the lines of a banner, kept as they are
+
+    @property
+    def keyword(self):
+        return self.line.split(None, 1)[0] if self.line else ''
+
+    def render(self, depth=0):
+        """ The node and everything under it as config lines. """
+
+        lines = [' ' * depth + self.line]
+        if self.body is not None:
+            return lines + self.body
+        for child in self.children:
+            lines += child.render(depth + 1)
+        return lines
+
+    def child(self, line):
+        """ The child with this line, or None. """
+
+        line = ' '.join(line.split())
+        return next((child for child in self.children if child.line == line), None)
+
+
+class Config(Node):
+    """ The root of a parsed config.  Top level lines are indexed by the
+    whole line (section('interface Gi0/1')) and every line by its first word
+    (find('interface')) so nothing has to scan the text again.
+    """
+
+    __slots__ = ('_sections', '_keywords')
+
+    def __init__(self):
+        """ Initialise the root. """
+
+        super().__init__('')
+        self._sections = {}
+        self._keywords = {}
+
+    def _add(self, node):
+        if node.parent is self:
+            self._sections[node.line] = node
+        self._keywords.setdefault(node.keyword, []).append(node)
+
+    def section(self, header):
+        """ The top level node for a header like 'interface Gi0/1' or 'router ospf 1', or None. """
+
+        return self._sections.get(' '.join(header.split()))
+
+    def find(self, keyword, top_level=False):
+        """ Every node whose line starts with keyword, in config order. """
+
+        nodes = self._keywords.get(keyword, [])
+        if top_level:
+            return [node for node in nodes if node.parent is self]
+        return list(nodes)
+
+    def value(self, keyword):
+        """ The rest of the first top level line starting with keyword, like
+        value('hostname'), or None.
+        """
+
+        nodes = self.find(keyword, top_level=True)
+        if not nodes:
+            return None
+        return nodes[0].line[len(keyword):].strip()
+
+    def render(self, depth=0):
+        lines = []
+        for child in self.children:
+            lines += child.render(depth)
+        return lines
+
+
+def parse(text):
+    """ Parse a config file or show run output into a tree and return its
+    Config.  Comment lines and the show run header and end are dropped.
+    """
+
+    root = Config()
+    stack = [(-1, root)]  # (indent, node) of the sections we are in
+    noise = _NOISE.match
+    banner_match = _BANNER.match
+    lines = iter(text.splitlines())
+    for raw in lines:
+        stripped = raw.strip()
+        if not stripped or noise(stripped):
+            continue
+        indent = len(raw) - len(raw.lstrip())
+        while stack[-1][0] >= indent:
+            stack.pop()
+        parent = stack[-1][1]
+        node = Node(' '.join(stripped.split()), parent)
+        parent.children.append(node)
+        root._add(node)
+        stack.append((indent, node))
+
+        banner = banner_match(stripped)
+        if banner:
+            delimiter = banner.group(1)
+            node.body = []
+            rest = stripped[banner.end():]
+            while delimiter not in rest:  # a banner runs until its delimiter turns up again
+                rest = next(lines, None)
+                if rest is None:
+                    break
+                node.body.append(rest)
+    return root
+
+
+def _removal(node):
+    """ The line that takes node back out of a config, or None if it shouldn't be. """
+
+    if node.line.startswith(NEVER_REMOVE):
+        return None
+    if node.body is not None:
+        return 'no ' + ' '.join(node.line.split()[:2])  # no banner motd
+    if node.line.startswith('no '):
+        return node.line[3:]
+    return 'no ' + node.line
+
+
+def _banner(node):
+    """ A banner's line and text, with ^ (as typed) and ^C (as show run
+    prints it) made the same delimiter.
+    """
+
+    lines = [node.line] + node.body
+    if _BANNER.match(node.line).group(1) in ('^', '^C'):
+        lines = [line.replace('^C', '^') for line in lines]
+    return lines
+
+
+def _key(node):
+    """ What a node is matched on between two configs. """
+
+    return node.line if node.body is None else _banner(node)[0]
+
+
+def _diff(have, want, depth, remove):
+    lines = []
+    indent = ' ' * depth
+    have_children = {_key(child): child for child in have.children}
+    want_lines = {_key(child) for child in want.children}
+    for child in have.children:  # removals go first so a changed value isn't removed after it is set
+        if remove and _key(child) not in want_lines:
+            removal = _removal(child)
+            if removal is not None:
+                lines.append(indent + removal)
+    for child in want.children:
+        old = have_children.get(_key(child))
+        if old is None:
+            lines += child.render(depth)
+        elif child.body is not None or old.body is not None:
+            if old.body is None or child.body is None or _banner(child) != _banner(old):
+                lines += child.render(depth)
+        else:
+            changes = _diff(old, child, depth + 1, remove)
+            if changes:
+                lines.append(indent + child.line)
+                lines += changes
+    return lines
+
+
+def diff(running, intended, remove=False):
+    """ The config lines that turn the running config into the intended one.
+    Anything missing is added, with its section header.  If remove is set,
+    anything in the running config but not the intended one is taken out
+    with a 'no' line (headers like hostname and interfaces are never
+    removed), otherwise it is left alone.
+    """
+
+    return _diff(parse(running), parse(intended), 0, remove)
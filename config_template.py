@@ -0,0 +1,184 @@
+import config_check
+import csv
+import re
+from functools import lru_cache
+from inventory import device_name
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''One config template and a table of variables instead of a config file per router.  A template that only has
+{{ name }} placeholders is compiled here into its text pieces, anything more (if, for, filters) needs jinja2,
+which is imported the first time such a template is opened.  Each template is compiled once and kept.  The
+variables come from a CSV with a host column, like an inventory, or a YAML list or host -> variables mapping
+(YAML needs PyYAML).  Configs are rendered per device as its load starts, nothing is written to disk.
+No Qt in here.'''
+
+HOST_COLUMN = 'host'  # the variables row for a device is the one whose host (and port) match it
+CACHE_SIZE = 32  # compiled templates kept
+
+_PLACEHOLDER = re.compile(r'{{\s*([A-Za-z_]\w*)\s*}}')
+_JINJA = re.compile(r'{{|{%|{#')  # anything still there after the placeholders needs jinja2
+
+
+class TemplateError(Exception):
+    """ Raised for a template or variables file that can't be used, and a
+    device whose config can't be rendered or fails config_check.
+    """
+
+
+class Template:
+    """ A compiled template.  variables is the set of names it uses. """
+
+    def __init__(self, text):
+        """ Compile the template. """
+
+        self.text = text
+        pieces = _PLACEHOLDER.split(text)  # text, name, text, name ... text
+        if not _JINJA.search(''.join(pieces[::2])):
+            self.variables = set(pieces[1::2])
+            self._pieces = pieces
+            self._jinja = None
+            return
+        try:
+            import jinja2
+            import jinja2.meta
+        except ImportError:
+            raise TemplateError('This template uses more than {{ name }} placeholders, that needs jinja2 '
+                                '(pip install jinja2).')
+        environment = jinja2.Environment(undefined=jinja2.StrictUndefined, keep_trailing_newline=True)
+        try:
+            self.variables = jinja2.meta.find_undeclared_variables(environment.parse(text))
+            self._jinja = environment.from_string(text)
+        except jinja2.TemplateSyntaxError as e:
+            raise TemplateError(f'Template line {e.lineno}: {e.message}')
+        self._pieces = None
+
+    def missing(self, variables):
+        """ The names the template uses that variables doesn't have, sorted. """
+
+        return sorted(self.variables - set(variables))
+
+    def render(self, variables):
+        """ The config for one set of variables. """
+
+        missing = self.missing(variables)
+        if missing:
+            raise TemplateError('No value for ' + ', '.join(missing))
+        if self._jinja is not None:
+            import jinja2  # already loaded, the template was compiled with it
+            try:
+                return self._jinja.render(variables)
+            except jinja2.TemplateError as e:  # UndefinedError for an attribute or key a value doesn't have too
+                raise TemplateError(str(e))
+        pieces = self._pieces[:]
+        pieces[1::2] = [str(variables[name]) for name in pieces[1::2]]
+        return ''.join(pieces)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_template(text):
+    """ The Template for text, compiled the first time it is seen. """
+
+    return Template(text)
+
+
+def _row_key(row):
+    host = str(row.get(HOST_COLUMN) or '').strip()
+    port = str(row.get('port') or '').strip()
+    return f'{host}:{port}' if port else host
+
+
+class Variables:
+    """ The rows of a variables file, by the device name they are for. """
+
+    def __init__(self, rows, source=''):
+        """ Index the rows, each needs a host and a device can only have one. """
+
+        self.source = source
+        self.rows = {}
+        numbers = {}  # row key: the row it is on
+        for number, row in enumerate(rows, 1):
+            if not isinstance(row, dict) or not _row_key(row):
+                raise TemplateError(f'{source} row {number}: no {HOST_COLUMN}.')
+            key = _row_key(row)
+            if key in numbers:
+                raise TemplateError(f'{source} row {number}: {key} is already in row {numbers[key]}, '
+                                    'each device can only have one row.')
+            numbers[key] = number
+            self.rows[key] = row
+
+    def __len__(self):
+        return len(self.rows)
+
+    def for_device(self, device):
+        """ The device's row. """
+
+        row = self.rows.get(device_name(device))
+        if row is None:
+            raise TemplateError(f'No variables for {device_name(device)} in {self.source or "the variables"}.')
+        return row
+
+    def problems(self, template, devices):
+        """ What would stop the template rendering for the devices, found
+        before any of them is loaded: devices without a row and rows without
+        a value the template needs.
+        """
+
+        problems = []
+        for device in devices:
+            try:
+                row = self.for_device(device)
+            except TemplateError as e:
+                problems.append(str(e))
+                continue
+            missing = template.missing(row)
+            if missing:
+                problems.append(f'{device_name(device)}: no value for ' + ', '.join(missing))
+        return problems
+
+
+def load_variables(path):
+    """ Variables from a CSV file, or YAML if path ends in .yml or .yaml. """
+
+    with open(path, 'r', newline='') as file:
+        if not path.lower().endswith(('.yml', '.yaml')):
+            rows = [{name.strip(): (value or '').strip() for name, value in row.items() if name}
+                    for row in csv.DictReader(file)]
+            return Variables(rows, path)
+        try:
+            import yaml  # only needed for YAML variables
+        except ImportError:
+            raise TemplateError('YAML variables need PyYAML (pip install pyyaml), or use a CSV.')
+        try:
+            data = yaml.safe_load(file)
+        except yaml.YAMLError as e:
+            raise TemplateError(f'{path}: {e}')
+    if isinstance(data, dict):  # host: {name: value}
+        data = [dict(row if isinstance(row, dict) else {}, **{HOST_COLUMN: str(host)}) for host, row in data.items()]
+    if not isinstance(data, list):
+        raise TemplateError(f'{path}: expected a list of devices or a mapping of host to variables.')
+    return Variables(data, path)
+
+
+def config_for(template, variables, device):
+    """ The device's config rendered and put through config_check, ready
+    for device_ops.load_config.  TemplateError if it can't be rendered or
+    has errors config_check won't let through.
+    """
+
+    row = variables.for_device(device)
+    try:
+        text = template.render(row)
+    except TemplateError as e:
+        raise TemplateError(f'{device_name(device)}: {e}')
+    lines, problems = config_check.check(text)
+    errors = config_check.errors(problems)
+    if errors:
+        raise TemplateError(f'Config for {device_name(device)} not loaded, fix these first:\n' +
+                            '\n'.join(config_check.report(errors)))
+    return '\n'.join(lines)
@@ -0,0 +1,93 @@
+import re
+import threading
+from time import monotonic, sleep
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Find which serial port the router's console is on.  Every port is probed at the same time, each at the usual
+console speeds in turn: send Return and see if an IOS prompt (or its login prompt) comes back.  A probe only
+waits a fraction of a second at each speed, so a hub full of adapters takes about as long as one port.
+pyserial is imported when discovery runs, like the rest of SNAP's serial code.  No Qt in here.'''
+
+BAUD_RATES = (9600, 115200, 38400, 19200, 57600)  # 9600 is the Cisco default, 115200 the usual change
+PROBE_TIMEOUT = 0.4  # seconds to wait for a prompt at each speed
+DEFAULT_BAUD = 9600  # what netmiko opens a console at if serial_settings doesn't say
+AUTO = 'auto'  # a console port of auto, or none at all, means find it
+
+_PROMPT = re.compile(r'(?im)^[\w.\-]+(?:\([\w.\-]+\))?[>#] *$|(?:username|login|password): *$'
+                     r'|press return to get started')
+
+
+def candidates():
+    """ The serial ports on this machine, as pyserial names them. """
+
+    from serial.tools.list_ports import comports
+    return sorted(port.device for port in comports())
+
+
+def probe(port, bauds=BAUD_RATES, timeout=PROBE_TIMEOUT, cancelled=None):
+    """ (baud, what the router printed) for the first speed a prompt comes
+    back from the port at, None if the port is busy, missing or silent.
+    """
+
+    import serial
+    try:
+        connection = serial.Serial(port, bauds[0], timeout=0, write_timeout=timeout)
+    except (serial.SerialException, OSError, ValueError):
+        return None  # in use by something else, or gone
+    try:
+        for baud in bauds:
+            if cancelled is not None and cancelled():
+                return None
+            connection.baudrate = baud
+            connection.reset_input_buffer()
+            connection.write(b'\r\n')
+            text = ''
+            start = monotonic()
+            while monotonic() - start < timeout:
+                text += connection.read(4096).decode('ascii', 'replace')
+                if _PROMPT.search(text.replace('\r', '')):
+                    return baud, text.strip()
+                sleep(0.02)
+    except (serial.SerialException, OSError):
+        return None
+    finally:
+        connection.close()
+    return None
+
+
+def discover(ports=None, bauds=BAUD_RATES, timeout=PROBE_TIMEOUT, emit=None, cancelled=None):
+    """ Probe every port (all of candidates() if ports is None) on its own
+    thread.  Returns [(port, baud, prompt text)] for the ports a router
+    answered on, in the order the ports were given.
+    """
+
+    ports = candidates() if ports is None else list(ports)
+    results = [None] * len(ports)
+
+    def run(number, port):
+        results[number] = probe(port, bauds, timeout, cancelled)
+        if emit is not None:
+            emit(f'{port}: ' + (f'router at {results[number][0]} baud' if results[number] else 'no answer'))
+
+    threads = [threading.Thread(target=run, args=item, daemon=True) for item in enumerate(ports)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [(port, result[0], result[1]) for port, result in zip(ports, results) if result is not None]
+
+
+def apply(device, port, baud):
+    """ Point a console device dict at the port and speed discovery found. """
+
+    device['serial_settings']['port'] = port
+    if baud == DEFAULT_BAUD:
+        device['serial_settings'].pop('baudrate', None)
+    else:
+        device['serial_settings']['baudrate'] = baud
@@ -0,0 +1,27 @@
+from importlib import import_module
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''The netmiko and pyserial exceptions the tabs catch.  Importing netmiko pulls in paramiko, cryptography and
+textfsm, which is most of SNAP's start up time, so nothing is imported until an exception is first looked up.
+Use them as device_errors.NetMikoTimeoutException, an except clause only looks the name up once something
+has been raised, by which time netmiko has been imported to connect anyway.'''
+
+_MODULES = {
+    'NetMikoTimeoutException': 'netmiko.ssh_exception',
+    'NetMikoAuthenticationException': 'netmiko.ssh_exception',
+    'SerialException': 'serial.serialutil',
+}
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_MODULES[name]), name)
+    globals()[name] = value  # only looked up the hard way once
+    return value
@@ -0,0 +1,268 @@
+import command_cache
+import config_model
+import config_template
+import device_errors
+import device_store
+import latency_profile
+import load_engine
+import messages
+import re
+import tracing
+from time import monotonic, sleep
+from load_checkpoint import checkpoints
+from session_pool import connect, pool
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''The work done against a single device.  No Qt in here, the threads on each tab pass in their
+signal's emit so the same code runs for one router or a whole inventory.  Connections come from the
+shared session pool so a tab doesn't log in again if another tab already has.'''
+
+MIN_VERSION = 15.4  # older IOS gets a warning on verify
+STREAM_TIMEOUT = 120  # seconds of silence before a streamed command is given up on, traceroute can be quiet a while
+NOTHING_TO_RESUME = 'Nothing to resume, there is no unfinished load of this config.'
+VERSION_UNKNOWN = 'IOS version unknown, the old version check was skipped.'
+
+_VERSION = re.compile(r'\d+(?:\.\d+)?')
+
+VERIFIED = {
+    'cisco_ios_serial': 'Credentials Verified on Console!',
+    'cisco_ios_telnet': 'Credentials Verified on Telnet!',
+    'cisco_ios': 'Credentials Verified on SSH!',
+}
+
+
+class Cancelled(Exception):
+    """ Raised when the operator cancels a command part way through. """
+
+
+class NotSupported(Exception):
+    """ Raised when an action can't be done over the device's connection method. """
+
+
+def get_version_cisco(show_ver):
+    """ The IOS version in show_ver as a number, like 15.4 (16.9 for 16.9.4),
+    or None if there is no version line or it doesn't start with a number.
+    """
+
+    match = _VERSION.match(config_model.parse(show_ver).value('version') or '')
+    return float(match.group()) if match else None
+
+
+def verify(device, emit):
+    """ Log in with fresh credentials, time the prompt round trip for the
+    device's latency profile, check the IOS version and return the result line.
+    The version and round trip go in the device store if the device is there.
+    """
+
+    pool.close(device)  # make sure the credentials are really checked
+    with pool.session(device) as router:
+        latency_profile.profiles.measured(device, latency_profile.measure(router))
+        latency_profile.apply(router, latency_profile.profiles.delay_factor(device))
+        emit(messages.status(latency_profile.profiles.describe(device)))
+        show_ver = router.send_command('show run | inc version 1')
+        emit(messages.output(show_ver))
+        device_store.store.verified(device, config_model.parse(show_ver).value('version'),
+                                    latency_profile.profiles.get(device)['rtt'])
+        version = get_version_cisco(show_ver)
+        if version is None:
+            emit(messages.error(VERSION_UNKNOWN))
+        elif version < MIN_VERSION:
+            warn_old_version(router.send_command('dir flash: | i .bin'), emit)
+    return VERIFIED[device['device_type']]
+
+
+def warn_old_version(show_flash, emit):
+    emit(messages.error('----ERROR----\n'
+                        ' Old version of IOS Detected\n'
+                        ' Correct version may be in flash:'))
+    emit(messages.output(show_flash))
+    emit('\n>========== Reminder ==========<\n'
+         'Ensure the config you plan to load is compatible\n'
+         ' with the version of IOS you are using.\n '
+         'If not contact the help desk.\n'
+         '>========== Reminder ==========<\n')
+
+
+def load_config(device, config, emit, incremental=False, remove=False, resume=False):
+    """ Push a config to the device, save it and return the result line.  If
+    incremental is set only the lines that differ from the running config are
+    sent, and with remove set lines the config doesn't have are taken out.
+    A full load keeps a checkpoint of how far it got until it is saved, with
+    resume set it carries on from the device's checkpoint for this config
+    (an incremental load needs no checkpoint, running it again only sends
+    what is left).
+    """
+
+    lines = config.splitlines()
+    first, confirmed = 0, None
+    if not incremental:
+        first, confirmed = checkpoints.start(device, lines, resume, emit)
+        if first is None:
+            return NOTHING_TO_RESUME
+    with pool.session(device) as router:
+        emit(messages.progress('...connected...'))
+        if incremental:
+            emit(messages.progress('...comparing with the running config...'))
+            lines = config_model.diff(router.send_command('show run'), config, remove)
+            if not lines:
+                return 'Nothing to load, the running config already matches.'
+            emit(messages.status(f'{len(lines)} lines to change.'))
+        if device['device_type'] != 'cisco_ios_serial':
+            emit(messages.progress('...this may take a while...'))
+        router.config_mode()
+        command_cache.cache.invalidate(device)  # from here on the device's show output may change
+        profiles = latency_profile.profiles
+        try:
+            errors = load_engine.push_config(router, lines, profiles.push_profile(device), emit,
+                                             profiles.tuner(device, emit), first, confirmed)
+        except load_engine.PushTimeout:
+            profiles.timed_out(device)
+            raise
+        router.exit_config_mode()
+        router.set_base_prompt()  # the config may have changed the hostname
+        new_config = router.send_command('show run')
+        emit(messages.output(new_config))
+        router.send_command('wr')
+    checkpoints.clear(device)
+    return load_result(errors)
+
+
+def load_result(errors):
+    if errors:
+        return f'Load Complete with {len(errors)} errors:\n' + '\n'.join(
+            f' line {line_no}: {line}  ({marker})' for line_no, line, marker in errors)
+    return 'Load Complete'
+
+
+def stream_command(router, command, emit, cancelled=None, timeout=STREAM_TIMEOUT):
+    """ Run an exec command and emit its output a few lines at a time as it
+    arrives rather than all at once at the end.  cancelled is polled while
+    waiting, if it returns True the command is interrupted and Cancelled is
+    raised.  Returns the whole output without the echo or the prompt.
+    """
+
+    with tracing.default_tracer.span('command', tracing.device_of(router), command) as span:
+        router.clear_buffer()
+        prompt = re.compile(re.escape(router.base_prompt) + r'[>#]\s*$')
+        router.write_channel(command + '\n')
+        output = ''
+        pending = ''  # output not emitted yet, only whole lines are sent to the viewer
+        echo = True
+        last_data = monotonic()
+        while True:
+            if cancelled is not None and cancelled():
+                router.write_channel('\x1e')  # Ctrl+Shift+6 stops a ping or traceroute
+                raise Cancelled()
+            data = router.read_channel()
+            if not data:
+                if monotonic() - last_data > timeout:
+                    raise device_errors.NetMikoTimeoutException(f'No output from "{command}" for {timeout} seconds.')
+                sleep(0.02)
+                continue
+            last_data = monotonic()
+            pending += data.replace('\r', '')
+            if echo:
+                if '\n' not in pending:
+                    continue
+                pending = pending.split('\n', 1)[1]  # drop the echo of the command
+                echo = False
+            match = prompt.search(pending)
+            if match:  # the prompt is back so the command is done
+                pending = pending[:match.start()].rstrip('\n')
+                if pending:
+                    emit(messages.output(pending))
+                output = (output + pending).rstrip('\n')
+                span['bytes'] = len(output)
+                return output
+            lines, newline, pending = pending.rpartition('\n')
+            if newline:
+                emit(messages.output(lines))
+                output += lines + newline
+
+
+def backup_config(device, emit, file_name, cancelled=None):
+    """ Pull the running config and save it to file_name.  The config is
+    emitted as it arrives.
+    """
+
+    with pool.session(device) as router:
+        emit(messages.progress('...connected...'))
+        emit(messages.progress('...this may take a while...'))
+        config = stream_command(router, 'show run', emit, cancelled)
+    return save_backup(config, file_name)
+
+
+def save_backup(config, file_name):
+    """ Write a pulled config to file_name and return the result line. """
+
+    with open(file_name, mode='w') as save_file:
+        save_file.write(config)
+    parsed = config_model.parse(config)
+    return (f"Configuration pulled from {parsed.value('hostname') or 'the device'}: "
+            f"{len(parsed.children)} top level lines, {len(parsed.find('interface', top_level=True))} interfaces")
+
+
+def run_command(device, command, emit=None, cancelled=None):
+    """ Run one exec command and return its output, which is also streamed
+    to emit if one is given.
+    """
+
+    with pool.session(device) as router:
+        if emit is None:
+            return router.send_command(command)
+        return stream_command(router, command, emit, cancelled)
+
+
+def zeroize(device, emit):
+    """ Erase the startup config and reload the router.  Console only, over
+    the network the router would be unreachable afterwards.
+    """
+
+    if device['device_type'] != 'cisco_ios_serial':
+        raise NotSupported("Zeroize only possible over Console.")
+    pool.close(device)  # frees the COM port, the session is no good after the reload anyway
+    command_cache.cache.invalidate(device)
+    router = connect(device)
+    emit(messages.progress('...connected...'))
+    erase = router.send_command_timing('wr er')
+    if 'Erasing' in erase:
+        router.send_command_timing('y')
+        emit('Erase succeed')
+    else:
+        emit(messages.error('erase fail'))
+    sleep(5)
+    reload = router.send_command_timing('reload')
+    if 'Proceed' in reload:
+        router.send_command_timing('y')
+        emit('Reload succeed')
+    else:
+        emit(messages.error('Reload fail'))
+    router.disconnect()
+    return ('Router reloading....\n'
+            'After Reboot, username and password can be anything.\n'
+            'Ensure the correct com port is selected.\n'
+            'Reboot times may vary allow for 3-5 minutes.')
+
+
+def describe_error(e):
+    """ Turn an exception from one of the functions above into the message the operator sees. """
+
+    if isinstance(e, (NotSupported, config_template.TemplateError)):
+        return str(e)
+    if isinstance(e, Cancelled):
+        return "Cancelled."
+    if isinstance(e, device_errors.NetMikoAuthenticationException):
+        return "Check your username/password. Make sure you have an account on this device."
+    if isinstance(e, (device_errors.NetMikoTimeoutException, load_engine.PushTimeout, TimeoutError)):
+        return "Timeout Error: Make sure the address is correct and you are still connected."
+    if isinstance(e, OSError):  # SerialException is an OSError too
+        return "Connection Error: Make sure you have connectivity."
+    if isinstance(e, ValueError):
+        return "User does not have permission to make these changes."
+    return f'Error: {e}'
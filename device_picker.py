@@ -0,0 +1,180 @@
+import device_store
+import Settings
+import sqlite3
+from inventory import device_name
+from PyQt5.QtWidgets import (QAbstractItemView, QComboBox, QDialog, QFileDialog, QGridLayout, QHBoxLayout, QLabel,
+                             QMessageBox, QPushButton, QWidget)
+from record_table import Table
+from record_view import RecordView
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+
+def describe_target():
+    """ What the Load and Troubleshoot tabs will work on, in a few words. """
+
+    if Settings.fleet_mode:
+        return f'Fleet: {len(Settings.inventory)} devices'
+    return f'Device: {device_name(Settings.device)}' if Settings.device else 'No device yet'
+
+
+def use(devices):
+    """ Make devices what the tabs work on, one is the device and several are the fleet. """
+
+    if len(devices) == 1:
+        Settings.device = devices[0]
+        Settings.fleet_mode = False
+    else:
+        Settings.inventory = devices
+        Settings.fleet_mode = True
+
+
+class DevicePicker(QDialog):
+    """ Pick one or many devices out of the device store, by site, tag or
+    the filter box.  devices is what was picked once it is accepted.
+    """
+
+    def __init__(self, parent=None):
+        """ Initialise the dialog. """
+
+        super().__init__(parent)
+        self.setWindowTitle('Devices')
+        self.resize(900, 500)
+        self.devices = []
+        layout = QGridLayout()
+
+        layout.addWidget(QLabel('Site'), 0, 0)
+        self.site = QComboBox()
+        layout.addWidget(self.site, 0, 1)
+        layout.addWidget(QLabel('Tag'), 0, 2)
+        self.tag = QComboBox()
+        layout.addWidget(self.tag, 0, 3)
+
+        self.view = RecordView()
+        self.view.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.view.table.doubleClicked.connect(self.accept)
+        layout.addWidget(self.view, 1, 0, 1, 6)
+
+        self.import_button = QPushButton("Import CSV", clicked=self._import)
+        self.import_button.setToolTip("Add the devices in a CSV with method and host columns, and optionally\n"
+                                      "port, hostname, site and tags. Devices already in the store are updated.")
+        layout.addWidget(self.import_button, 2, 0)
+
+        self.remove_button = QPushButton("Remove", clicked=self._remove)
+        self.remove_button.setToolTip("Take the selected devices out of the store.")
+        layout.addWidget(self.remove_button, 2, 1)
+
+        self.use_button = QPushButton("Use", clicked=self.accept, default=True)
+        self.use_button.setToolTip("One device works on its own, several run in fleet mode.")
+        layout.addWidget(self.use_button, 2, 4)
+        layout.addWidget(QPushButton("Cancel", clicked=self.reject), 2, 5)
+
+        self.status = QLabel(f'{device_store.store.path}, Ctrl+A picks every device shown.')
+        layout.addWidget(self.status, 3, 0, 1, 6)
+        self.setLayout(layout)
+
+        self._fill_filters()
+        self.site.currentIndexChanged.connect(self._search)
+        self.tag.currentIndexChanged.connect(self._search)
+        self._search()
+
+    def _fill_filters(self):
+        for box, everything, values in ((self.site, 'All sites', device_store.store.sites()),
+                                        (self.tag, 'All tags', device_store.store.tags())):
+            current = box.currentText()
+            box.blockSignals(True)
+            box.clear()
+            box.addItem(everything, None)
+            for value in values:
+                box.addItem(value, value)
+            box.setCurrentIndex(max(box.findText(current), 0))
+            box.blockSignals(False)
+
+    def _search(self):
+        rows = device_store.store.search(self.site.currentData(), self.tag.currentData())
+        self.view.set_table(Table.from_rows(device_store.COLUMNS, rows))
+
+    def selected_ids(self):
+        rows = sorted({index.row() for index in self.view.table.selectionModel().selectedRows()})
+        return [int(self.view.model.index(row, 0).data()) for row in rows]
+
+    def accept(self):
+        ids = self.selected_ids()
+        if not ids:
+            self.status.setText('Pick one or more devices, Ctrl+A picks every device shown.')
+            return
+        username, password = Settings.credentials
+        password = password or device_store.keyring_password(username)
+        if not username or not password:
+            self.status.setText(f'Enter the username and password on the Router Info tab first (or keep the '
+                                f'password in the OS keyring: keyring set {device_store.KEYRING_SERVICE} username).')
+            return
+        try:
+            self.devices = device_store.store.devices(ids, username, password)
+        except ValueError as e:
+            self.status.setText(str(e))
+            return
+        super().accept()
+
+    def _import(self, _):
+        obj = QFileDialog.getOpenFileName(self, 'Inventory', '', "Inventory (*.csv)")
+        if obj[0] == '':
+            return
+        try:
+            count = device_store.store.import_csv(obj[0])
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self.status.setText(str(e))
+            return
+        self._fill_filters()
+        self._search()
+        self.status.setText(f'{count} devices imported from {obj[0]}.')
+
+    def _remove(self, _):
+        ids = self.selected_ids()
+        if not ids or QMessageBox.question(self, 'Remove', f'Remove {len(ids)} devices from the store?') \
+                != QMessageBox.Yes:
+            return
+        device_store.store.remove(ids)
+        self._fill_filters()
+        self._search()
+        self.status.setText(f'{len(ids)} devices removed.')
+
+
+def pick_devices(parent):
+    """ Run the picker and use what is picked.  The devices, [] if cancelled. """
+
+    picker = DevicePicker(parent)
+    if picker.exec_() != QDialog.Accepted:
+        return []
+    use(picker.devices)
+    return picker.devices
+
+
+class DeviceBar(QWidget):
+    """ What the tab works on and a button to pick it from the device store. """
+
+    def __init__(self, parent=None):
+        """ Initialise the bar. """
+
+        super().__init__(parent)
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.label = QLabel()
+        layout.addWidget(self.label, 1)
+        self.pick = QPushButton("Devices", clicked=self._pick)
+        self.pick.setToolTip("Pick one or many devices from the device store.")
+        layout.addWidget(self.pick)
+        self.setLayout(layout)
+
+    def showEvent(self, event):
+        self.label.setText(describe_target())  # another tab may have changed it
+        super().showEvent(event)
+
+    def _pick(self, _):
+        pick_devices(self)
+        self.label.setText(describe_target())
@@ -0,0 +1,229 @@
+import csv
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from inventory import DEVICE_TYPES, METHOD_NAMES, build_device, repeated
+from record_table import INT, IP, STR
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''The devices SNAP manages, kept in SQLite: hostname, transport (console, telnet or ssh), address (IP or serial
+port) and port, site, tags, and the IOS version and round trip the last verify or audit found.  Site and tag are
+indexed, so picking every router at a site or with a tag out of thousands doesn't read them all.  There are no
+credentials in here: devices are built with the username and password of the session, or the OS keyring's
+password for the username when none was typed (keyring is imported when it is asked for).  The database is made
+the first time a device is added, a verify never creates it.  No Qt in here.'''
+
+DEFAULT_PATH = 'inventory.db'
+KEYRING_SERVICE = 'SNAP'  # keyring set SNAP <username> stores the password SNAP uses
+COLUMNS = [('id', INT), ('hostname', STR), ('transport', STR), ('address', IP), ('port', INT), ('site', STR),
+           ('tags', STR), ('version', STR), ('rtt ms', INT), ('verified', STR)]
+_BATCH = 500  # ids per query, under SQLite's limit on parameters
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS devices (
+    id INTEGER PRIMARY KEY,
+    hostname TEXT NOT NULL DEFAULT '',
+    transport TEXT NOT NULL,
+    address TEXT NOT NULL,
+    port INTEGER NOT NULL DEFAULT 0,
+    site TEXT NOT NULL DEFAULT '',
+    version TEXT NOT NULL DEFAULT '',
+    rtt_ms INTEGER,
+    verified TEXT NOT NULL DEFAULT '',
+    UNIQUE (transport, address, port)
+);
+CREATE INDEX IF NOT EXISTS devices_site ON devices (site);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    device_id INTEGER NOT NULL REFERENCES devices (id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, device_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_device ON tags (device_id);
+'''
+
+
+def split_tags(text):
+    """ 'core, wan edge' -> ['core', 'wan', 'edge'] """
+
+    return [tag for tag in text.replace(',', ' ').split() if tag]
+
+
+def keyring_password(username):
+    """ The OS keyring's password for username, None if it has none or keyring isn't installed. """
+
+    try:
+        import keyring
+        from keyring.errors import KeyringError
+    except ImportError:
+        return None
+    try:
+        return keyring.get_password(KEYRING_SERVICE, username)
+    except KeyringError:
+        return None
+
+
+def _key(device):
+    """ (transport, address, port) of a device dict, its row's unique key. """
+
+    address = device['ip'] if 'ip' in device else device['serial_settings']['port']
+    return METHOD_NAMES[device['device_type']], address, device.get('port') or 0
+
+
+class DeviceStore:
+    """ The inventory database.  One connection, used by one thread at a
+    time, the fleet workers record verifies through it.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        """ Initialise the store, the database is opened on first use. """
+
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)  # _lock keeps it to one thread at once
+            self._db.execute('PRAGMA foreign_keys = ON')
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def exists(self):
+        return self._db is not None or os.path.exists(self.path)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def add(self, transport, address, port=0, hostname='', site='', tags=()):
+        """ Add a device, or update the hostname, site and tags of the one
+        already at transport, address and port (blank ones are left alone).
+        Returns its id.
+        """
+
+        with self._lock, self._open() as db:
+            return self._add(db, transport, address, port, hostname, site, tags)
+
+    @staticmethod
+    def _add(db, transport, address, port, hostname, site, tags):
+        if transport.lower() not in DEVICE_TYPES or not address:
+            raise ValueError(f'{transport} {address}: needs a transport (console/telnet/ssh) and an address.')
+        key = (METHOD_NAMES[DEVICE_TYPES[transport.lower()]], address, int(port or 0))
+        db.execute('INSERT INTO devices (hostname, site, transport, address, port) VALUES (?, ?, ?, ?, ?) '
+                   'ON CONFLICT (transport, address, port) DO UPDATE SET '
+                   "hostname = COALESCE(NULLIF(excluded.hostname, ''), hostname), "
+                   "site = COALESCE(NULLIF(excluded.site, ''), site)", (hostname, site) + key)
+        device_id = db.execute('SELECT id FROM devices WHERE transport = ? AND address = ? AND port = ?',
+                               key).fetchone()[0]
+        if tags:
+            db.execute('DELETE FROM tags WHERE device_id = ?', (device_id,))
+            db.executemany('INSERT OR IGNORE INTO tags (tag, device_id) VALUES (?, ?)',
+                           [(tag, device_id) for tag in tags])
+        return device_id
+
+    def import_csv(self, path):
+        """ Add every device in an inventory CSV: method and host columns
+        like fleet mode's, and optional port, hostname, site and tags
+        (separated by spaces or commas).  All of it or none of it is added.
+        Returns how many rows there were.
+        """
+
+        with open(path, newline='') as file:
+            rows = list(csv.DictReader(file))
+        with self._lock, self._open() as db:
+            for row_no, row in enumerate(rows, 2):
+                row = {name.strip().lower(): (value or '').strip() for name, value in row.items() if name}
+                if row.get('port') and not row['port'].isdigit():
+                    raise ValueError(f'{path} line {row_no}: port {row["port"]} is not a number.')
+                try:
+                    self._add(db, row.get('method', ''), row.get('host', ''), row.get('port'), row.get('hostname', ''),
+                              row.get('site', ''), split_tags(row.get('tags', '')))
+                except ValueError:
+                    raise ValueError(f'{path} line {row_no}: needs a method (console/telnet/ssh) and a host.')
+        return len(rows)
+
+    def remove(self, ids):
+        with self._lock, self._open() as db:
+            db.executemany('DELETE FROM devices WHERE id = ?', [(device_id,) for device_id in ids])
+
+    def search(self, site=None, tag=None, text=''):
+        """ Rows (in COLUMNS order) of the devices at site, with tag and
+        whose hostname or address has text in it, each only if given.
+        """
+
+        conditions, values = [], []
+        if site is not None:
+            conditions.append('d.site = ?')
+            values.append(site)
+        if tag is not None:
+            conditions.append('d.id IN (SELECT device_id FROM tags WHERE tag = ?)')
+            values.append(tag)
+        if text:
+            conditions.append('(d.hostname LIKE ? OR d.address LIKE ?)')
+            values += [f'%{text}%'] * 2
+        query = ("SELECT d.id, d.hostname, d.transport, d.address, NULLIF(d.port, 0), d.site, "
+                 "(SELECT group_concat(tag, ' ') FROM tags WHERE device_id = d.id), "
+                 "d.version, d.rtt_ms, d.verified FROM devices d")
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        with self._lock:
+            return self._open().execute(query + ' ORDER BY d.site, d.hostname, d.address, d.port', values).fetchall()
+
+    def sites(self):
+        with self._lock:
+            return [site for site, in self._open().execute("SELECT DISTINCT site FROM devices WHERE site != '' "
+                                                           "ORDER BY site")]
+
+    def tags(self):
+        with self._lock:
+            return [tag for tag, in self._open().execute('SELECT DISTINCT tag FROM tags ORDER BY tag')]
+
+    def devices(self, ids, username, password):
+        """ Device dicts for the ids, in the order given, with the session's
+        credentials (the keyring's password for username if password is
+        blank).  ValueError if two of them are the same device to a fleet
+        run, telnet and ssh to one address say.
+        """
+
+        password = password or keyring_password(username) or ''
+        ids = list(ids)
+        found = {}
+        with self._lock:
+            db = self._open()
+            for start in range(0, len(ids), _BATCH):
+                batch = ids[start:start + _BATCH]
+                found.update((row[0], row[1:]) for row in db.execute(
+                    'SELECT id, transport, address, port FROM devices WHERE id IN '
+                    f'({", ".join("?" * len(batch))})', batch))
+        devices = [build_device(DEVICE_TYPES[transport], address, username, password, port or None)
+                   for transport, address, port in (found[device_id] for device_id in ids if device_id in found)]
+        names = repeated(devices)
+        if names:
+            raise ValueError(f'{", ".join(names)} picked more than once (by telnet and ssh, say), '
+                             'pick each device once.')
+        return devices
+
+    def verified(self, device, version, rtt):
+        """ Note the IOS version and round trip (seconds) a verify or audit
+        found, if the device is in the store.
+        """
+
+        if not self.exists():
+            return
+        rtt = None if rtt is None else round(rtt * 1000)
+        with self._lock, self._open() as db:
+            db.execute('UPDATE devices SET version = ?, rtt_ms = ?, verified = ? '
+                       'WHERE transport = ? AND address = ? AND port = ?',
+                       (version or '', rtt, datetime.now().isoformat(timespec='seconds')) + _key(device))
+
+
+store = DeviceStore()  # shared by every tab
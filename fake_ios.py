@@ -0,0 +1,329 @@
+from time import monotonic, sleep
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''A pretend Cisco router so the load/backup/troubleshoot logic can be timed without real hardware.'''
+
+KNOWN_COMMANDS = ('aaa', 'access-list', 'banner', 'boot', 'clock', 'control-plane', 'crypto', 'description',
+                  'dial-peer', 'duplex', 'enable', 'encapsulation', 'end', 'exit', 'hostname', 'interface', 'ip',
+                  'ipv6', 'license', 'line', 'logging', 'login', 'network', 'no', 'ntp', 'passive-interface',
+                  'password', 'redistribute', 'router', 'router-id', 'service', 'shutdown', 'snmp-server', 'spanning-tree',
+                  'speed', 'switchport', 'transport', 'tunnel', 'username', 'version', 'vlan', 'vrf', '!')
+NEEDS_ARGUMENT = ('hostname', 'interface', 'router', 'username', 'description', 'network', 'line', 'vlan')
+SECTIONS = {'interface': 'config-if', 'router': 'config-router', 'line': 'config-line', 'vlan': 'config-vlan',
+            'crypto': 'config-crypto', 'vrf': 'config-vrf', 'control-plane': 'config-cp'}
+
+INVALID = "% Invalid input detected at '^' marker.\n"
+INCOMPLETE = '% Incomplete command.\n'
+
+
+def route_table(routes):
+    """ show ip route output with roughly the requested number of OSPF routes. """
+
+    lines = ['Codes: L - local, C - connected, S - static, O - OSPF, IA - OSPF inter area', '',
+             'Gateway of last resort is 10.0.0.1 to network 0.0.0.0', '',
+             'S*    0.0.0.0/0 [1/0] via 10.0.0.1',
+             '      10.0.0.0/8 is variably subnetted, 2 subnets, 2 masks',
+             'C        10.0.0.0/24 is directly connected, GigabitEthernet0/0',
+             'L        10.0.0.2/32 is directly connected, GigabitEthernet0/0']
+    for number in range(routes):
+        lines.append(f'O IA     172.{16 + number // 65536 % 16}.{number // 256 % 256}.{number % 256}/32 '
+                     f'[110/{number % 50 + 2}] via 10.0.0.{number % 4 + 1}, 1d02h, GigabitEthernet0/{number % 4}')
+    return '\n'.join(lines) + '\n'
+
+
+class IOSShell:
+    """ Just enough of the IOS CLI to exercise SNAP: exec/enable/config modes,
+    sections, banners, show run, write, ping, traceroute and invalid input
+    errors.  process() takes one line of input and returns what the router
+    would print back, including the echo and the next prompt.
+    """
+
+    def __init__(self, hostname='Router', version='15.4'):
+        """ Initialise the shell. """
+
+        self.hostname = hostname
+        self.version = version
+        self.mode = 'exec'  # exec, enable, config or a config section name
+        self.config = {f'version {version}': [], f'hostname {hostname}': []}  # top level line -> lines under it
+        self.saved = self.running
+        self._section = None  # top level line of the section being configured
+        self._banner = None  # delimiter while a banner is being typed in
+        self.rtt = 0.002  # seconds a ping takes to come back from a reachable target
+        self.unreachable = set()  # targets pings and traceroutes never get an answer from
+        self.busy = 0.0  # seconds the last command kept the router busy before it printed, like a ping does
+        self.outputs = {  # canned output for show commands, by command
+            'show ip route': route_table(20),
+            'show ip interface brief': 'Interface              IP-Address      OK? Method Status                Protocol\n'
+                                       'GigabitEthernet0/0     10.0.0.2        YES NVRAM  up                    up\n'
+                                       'GigabitEthernet0/1     unassigned      YES NVRAM  administratively down down\n',
+            'dir flash: | i .bin': f'    1  -rw-   106219492  Mar 1 2018 10:00:00 +00:00  '
+                                   f'c2900-universalk9-mz.SPA.{version.replace(".", "")}-3.M.bin\n',
+        }
+
+    @property
+    def running(self):
+        """ The running config as a list of lines. """
+
+        lines = []
+        for top, under in self.config.items():
+            lines.append(top)
+            indent = '' if top.startswith('banner') else ' '
+            lines += [indent + line for line in under]
+        return lines
+
+    def prompt(self):
+        """ The prompt for the current mode. """
+
+        if self.mode == 'exec':
+            return f'{self.hostname}>'
+        if self.mode == 'enable':
+            return f'{self.hostname}#'
+        if self.mode == 'config':
+            return f'{self.hostname}(config)#'
+        return f'{self.hostname}({self.mode})#'
+
+    def process(self, line):
+        """ Handle one line of input. """
+
+        line = line.rstrip('\r\n')
+        self.busy = 0.0
+        if self._banner is not None:
+            self.config[self._section].append(line)
+            if self._banner in line:
+                self._banner = None
+                return line + '\n' + self.prompt()
+            return line + '\n'
+        echo = line + '\n'  # the prompt was already printed after the last command
+        return echo + self._execute(line.strip(), line[:1].isspace()) + self.prompt()
+
+    def _execute(self, command, indented):
+        words = command.split()
+        if not words:
+            return ''
+        if self.mode in ('exec', 'enable'):
+            return self._exec(command, words)
+        return self._config(command, words, indented)
+
+    def _exec(self, command, words):
+        if words[0] == 'enable':
+            self.mode = 'enable'
+            return ''
+        if self.mode == 'exec':
+            return '' if words[0] == 'terminal' else INVALID
+        if words[0] in ('conf', 'configure'):
+            self.mode = 'config'
+            return 'Enter configuration commands, one per line.  End with CNTL/Z.\n'
+        if words[0] in ('wr', 'write') or command == 'copy running-config startup-config':
+            self.saved = self.running
+            return 'Building configuration...\n[OK]\n'
+        if command.startswith('show run') or command.startswith('sh run'):
+            if '|' in command:
+                text = command.split('inc', 1)[-1].strip()
+                return ''.join(line + '\n' for line in self.running if text in line)
+            return 'Building configuration...\n\nCurrent configuration:\n!\n' + '\n'.join(self.running) + '\nend\n'
+        if command in self.outputs:
+            return self.outputs[command]
+        if words[0] == 'ping' and len(words) > 1:
+            return self._ping(words)
+        if words[0] == 'traceroute' and len(words) > 1:
+            return self._traceroute(words)
+        if words[0] in ('show', 'sh', 'ping', 'traceroute', 'dir', 'terminal', 'exit'):
+            return ''
+        return INVALID
+
+    @staticmethod
+    def _option(words, name, default):
+        return float(words[words.index(name) + 1]) if name in words[:-1] else default
+
+    def _ping(self, words):
+        target = words[1]
+        repeat = int(self._option(words, 'repeat', 5))
+        timeout = self._option(words, 'timeout', 2)
+        text = (f'Type escape sequence to abort.\n'
+                f'Sending {repeat}, 100-byte ICMP Echos to {target}, timeout is {timeout:g} seconds:\n')
+        if target in self.unreachable:
+            self.busy = repeat * timeout
+            return text + '.' * repeat + f'\nSuccess rate is 0 percent (0/{repeat})\n'
+        self.busy = repeat * self.rtt
+        ms = max(1, round(self.rtt * 1000))
+        return (text + '!' * repeat + f'\nSuccess rate is 100 percent ({repeat}/{repeat}), '
+                f'round-trip min/avg/max = {ms}/{ms}/{ms + 1} ms\n')
+
+    def _traceroute(self, words):
+        target = words[1]
+        timeout = self._option(words, 'timeout', 3)
+        probes = int(self._option(words, 'probe', 3))
+        max_hops = int(words[words.index('ttl') + 2]) if 'ttl' in words[:-2] else 30
+        ms = max(1, round(self.rtt * 1000))
+        lines = ['Type escape sequence to abort.', f'Tracing the route to {target}',
+                 'VRF info: (vrf in name/id, vrf out name/id)',
+                 '  1 10.0.0.1 ' + ' '.join([f'{ms} msec'] * probes)]
+        if target in self.unreachable:
+            self.busy = probes * self.rtt + (max_hops - 1) * probes * timeout
+            lines += [f'{hop:3} ' + ' '.join(['*'] * probes) for hop in range(2, max_hops + 1)]
+        else:
+            self.busy = 2 * probes * self.rtt
+            lines.append(f'  2 {target} ' + ' '.join([f'{ms + 1} msec'] * probes))
+        return '\n'.join(lines) + '\n'
+
+    def _config(self, command, words, indented):
+        if command == 'end':
+            self.mode = 'enable'
+            return ''
+        if command == 'exit':
+            self.mode = 'config' if self.mode != 'config' else 'enable'
+            return ''
+        if words[0] not in KNOWN_COMMANDS:
+            return INVALID
+        if words[0] == '!':
+            return ''
+        if words[0] in NEEDS_ARGUMENT and len(words) == 1:
+            return INCOMPLETE
+        if self.mode != 'config' and not indented:  # an unindented line goes back to global config, like IOS does
+            self.mode = 'config'
+            self._section = None
+        if words[0] == 'banner' and len(words) > 2:
+            delimiter = words[2][0]
+            self.config.pop(next((top for top in self.config if top.startswith(' '.join(words[:2]))), None), None)
+            self.config[command] = []
+            if delimiter not in command.split(None, 2)[2][1:]:
+                self._section = command
+                self._banner = delimiter
+                return f"Enter TEXT message.  End with the character '{delimiter}'.\n"
+            return ''
+        if self.mode != 'config':
+            under = self.config[self._section]
+            if words[0] == 'no':
+                if command[3:] in under:
+                    under.remove(command[3:])
+            elif command not in under:
+                under.append(command)
+            return ''
+        if words[0] == 'no':
+            self.config.pop(command[3:], None)
+            return ''
+        if words[0] == 'hostname':
+            self.config.pop(f'hostname {self.hostname}', None)
+            self.hostname = words[1]
+        self.config.setdefault(command, [])
+        if words[0] in SECTIONS:
+            self.mode = SECTIONS[words[0]]
+            self._section = command
+        return ''
+
+
+class FakeConnection:
+    """ Stands in for a netmiko connection to an IOSShell.  latency is the
+    one-way delay in seconds and baud (if set) limits how quickly the router
+    can print, like a console cable does.  send_command waits the way
+    netmiko 3's does, so global_delay_factor and fast_cli are netmiko's
+    too.  Only the connection methods SNAP uses are provided.
+    """
+
+    def __init__(self, shell=None, latency=0.0, baud=None, global_delay_factor=1, fast_cli=False):
+        """ Initialise the connection. """
+
+        self.shell = shell or IOSShell()
+        self.latency = latency
+        self.baud = baud
+        self.global_delay_factor = global_delay_factor
+        self.fast_cli = fast_cli
+        self._pending = []  # (time the text becomes readable, text)
+        self._ready_at = 0.0
+
+    def _transmit(self, text):
+        now = monotonic()
+        ready = max(self._ready_at, now + 2 * self.latency) + self.shell.busy
+        if self.baud:
+            ready += len(text) * 10 / self.baud  # 8N1 is ten bits a character
+        self._ready_at = ready
+        self._pending.append((ready, text))
+
+    def write_channel(self, data):
+        for line in data.splitlines():
+            self._transmit(self.shell.process(line))
+
+    def read_channel(self):
+        now = monotonic()
+        ready = [text for when, text in self._pending if when <= now]
+        self._pending = [(when, text) for when, text in self._pending if when > now]
+        return ''.join(ready)
+
+    def _wait(self):
+        """ Block until everything written so far has been printed. """
+
+        delay = self._ready_at - monotonic()
+        if delay > 0:
+            sleep(delay)
+        return self.read_channel()
+
+    def select_delay_factor(self, delay_factor):
+        """ netmiko's: the smaller of delay_factor and global_delay_factor with
+        fast_cli on, the bigger with it off.
+        """
+
+        if self.fast_cli:
+            return delay_factor if delay_factor and delay_factor <= self.global_delay_factor \
+                else self.global_delay_factor
+        return max(delay_factor, self.global_delay_factor)
+
+    def send_command(self, command_string, delay_factor=1, auto_find_prompt=True, **kwargs):
+        """ Like netmiko's: find the prompt (unless auto_find_prompt is off),
+        sleep delay_factor * 0.2 s, send the command and read every
+        delay_factor * 0.1 s until the echo and prompt are back.
+        """
+
+        delay_factor = self.select_delay_factor(delay_factor)
+        if auto_find_prompt:
+            self.find_prompt()
+        sleep(delay_factor * 0.2)
+        self._wait()
+        self.write_channel(command_string + '\n')
+        output = self.read_channel()
+        while self._pending:
+            sleep(delay_factor * 0.1)
+            output += self.read_channel()
+        output = output.split('\n', 1)[-1]  # strip the echo
+        return output[:output.rfind('\n') + 1].rstrip('\n') if '\n' in output else ''
+
+    @property
+    def base_prompt(self):
+        return self.shell.hostname
+
+    def set_base_prompt(self):
+        return self.find_prompt()[:-1]
+
+    def clear_buffer(self):
+        self._wait()
+
+    def send_command_timing(self, command_string, **kwargs):
+        return self.send_command(command_string)
+
+    def find_prompt(self):
+        self._wait()
+        self.write_channel('\n')
+        return self._wait().strip().splitlines()[-1]
+
+    def enable(self):
+        if self.shell.mode == 'exec':
+            self.send_command('enable')
+
+    def config_mode(self):
+        if not self.check_config_mode():
+            self.send_command('configure terminal')
+
+    def exit_config_mode(self):
+        if self.check_config_mode():
+            self.send_command('end')
+
+    def check_config_mode(self):
+        return self.shell.mode not in ('exec', 'enable')
+
+    def disconnect(self):
+        self._pending = []
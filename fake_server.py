@@ -0,0 +1,417 @@
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import sys
+import threading
+from fake_ios import IOSShell
+from time import monotonic
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''fake_ios routers on Telnet, SSH and a pty standing in for a console cable, so every tab, netmiko and the async
+transport can be used and timed on one Linux box without a router.  Each reply is held back by the round trip
+latency and, on a console with a baud rate set, by how long the router takes to print it at that speed.  SSH
+uses paramiko, which netmiko already needs.
+Run with: python fake_server.py --telnet 2 --ssh 1 --serial 1 --latency 0.02'''
+
+IAC, WILL = 255, 251
+ECHO, SUPPRESS_GO_AHEAD = 1, 3
+
+
+class _Router:
+    """ A fake router, the shell and its config are shared by every session to it. """
+
+    def __init__(self, hostname, latency, baud, credentials):
+        """ Initialise the router. """
+
+        self.shell = IOSShell(hostname)
+        self.latency = latency
+        self.baud = baud
+        self.credentials = credentials  # (username, password), or None to let anyone in
+
+    async def serve(self, read, write, login=True, press_return=False):
+        """ Log the client in then hand each line to the shell until it says
+        exit.  read() returns the next text from the client, or None once it
+        has gone.  A console waits for Return before it says anything.
+        """
+
+        replies = _Replies(self, write)
+        try:
+            await self._converse(_Lines(read), replies, login, press_return)
+            await replies.flush()
+        finally:
+            replies.stop()
+
+    async def _converse(self, lines, replies, login, press_return):
+        self.shell.mode = 'exec'
+        if press_return and await lines.read_line() is None:
+            return
+        if login:
+            replies.send('\r\nUser Access Verification\r\n\r\nUsername: ')
+            while True:
+                username = await lines.read_line()
+                replies.send('Password: ')
+                password = await lines.read_line()
+                if username is None or password is None:
+                    return
+                if self.credentials is None or (username, password) == self.credentials:
+                    break
+                replies.send('\r\n% Login invalid\r\n\r\nUsername: ')
+        replies.send('\r\n' + self.shell.prompt())
+        while True:
+            line = await lines.read_line()
+            if line is None or (line.strip() == 'exit' and self.shell.mode in ('exec', 'enable')):
+                return
+            replies.send(self.shell.process(line).replace('\n', '\r\n'))
+
+
+class _Replies:
+    """ What a router says, each reply written a round trip after the line
+    it answers plus however long the command kept the router busy.  Lines
+    the client sends without waiting are answered without waiting too, the
+    latency is on the wire rather than per command.
+    """
+
+    def __init__(self, router, write):
+        """ Initialise the writer. """
+
+        self._router = router
+        self._write = write
+        self._queue = asyncio.Queue()
+        self._ready_at = 0.0  # replies come out in order, like a real router's do
+        self._task = asyncio.get_running_loop().create_task(self._writer())
+
+    def send(self, text):
+        now = monotonic()
+        self._ready_at = max(self._ready_at, now + 2 * self._router.latency) + self._router.shell.busy
+        if not self._router.baud:
+            self._queue.put_nowait((self._ready_at, text))
+            return
+        for line in text.splitlines(keepends=True):  # a slow console prints a line at a time, not all at the end
+            self._ready_at += len(line) * 10 / self._router.baud  # 8N1 is ten bits a character
+            self._queue.put_nowait((self._ready_at, line))
+
+    async def _writer(self):
+        while True:
+            ready_at, text = await self._queue.get()
+            await asyncio.sleep(ready_at - monotonic())
+            try:
+                self._write(text)
+            except OSError:
+                pass  # the client has gone, the rest of the replies are dropped the same way
+            self._queue.task_done()
+
+    async def flush(self):
+        """ Wait for the replies still on their way. """
+
+        await self._queue.join()
+
+    def stop(self):
+        self._task.cancel()
+
+
+class _Lines:
+    """ Lines out of a stream of text, whatever mix of CR and LF ends them. """
+
+    def __init__(self, read):
+        """ Initialise the reader. """
+
+        self._read = read
+        self._buffer = ''
+        self._skip_lf = False  # the last line ended in CR, a LF straight after it belongs to it
+
+    async def read_line(self):
+        """ The next line without its ending, or None once the client has gone. """
+
+        while True:
+            if self._skip_lf and self._buffer:
+                if self._buffer[0] == '\n':
+                    self._buffer = self._buffer[1:]
+                self._skip_lf = False
+            end = min((position for position in (self._buffer.find('\r'), self._buffer.find('\n'))
+                       if position >= 0), default=-1)
+            if end >= 0:
+                line = self._buffer[:end]
+                self._skip_lf = self._buffer[end] == '\r'
+                self._buffer = self._buffer[end + 1:]
+                return line
+            data = await self._read()
+            if data is None:
+                return None
+            self._buffer += data
+
+
+def _strip_telnet(data):
+    """ Client bytes without telnet commands, a test server can ignore the
+    client's answers to its option offers.
+    """
+
+    text = bytearray()
+    position = 0
+    while position < len(data):
+        if data[position] == IAC and position + 1 < len(data):
+            position += 3 if data[position + 1] >= WILL - 1 else 2  # DO/DONT/WILL/WONT carry an option
+            continue
+        text.append(data[position])
+        position += 1
+    return text.decode('utf-8', 'replace')
+
+
+def _ssh_interface(credentials, shell_requested):
+    import paramiko  # only needed for SSH routers
+
+    class Interface(paramiko.ServerInterface):
+        def get_allowed_auths(self, username):
+            return 'password'
+
+        def check_auth_password(self, username, password):
+            if credentials is None or (username, password) == credentials:
+                return paramiko.AUTH_SUCCESSFUL
+            return paramiko.AUTH_FAILED
+
+        def check_channel_request(self, kind, chanid):
+            if kind == 'session':
+                return paramiko.OPEN_SUCCEEDED
+            return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+        def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+            return True
+
+        def check_channel_shell_request(self, channel):
+            shell_requested.set()
+            return True
+
+    return Interface()
+
+
+class FakeServer:
+    """ Fake routers listening on 127.0.0.1, one port (or pty) each.  Runs its
+    own event loop on a background thread so blocking clients like netmiko
+    can use it from any other thread.
+    """
+
+    def __init__(self, latency=0.0, baud=None, credentials=None):
+        """ Initialise the server, then start routers with telnet(), ssh() and
+        serial().  baud is the console speed, it doesn't slow the network ones.
+        """
+
+        self.latency = latency
+        self.baud = baud
+        self.credentials = credentials
+        self.routers = []  # (protocol, port or pty path) of every router started
+        self.shells = []  # each router's IOSShell, in the same order, to change what it answers
+        self._loop = asyncio.new_event_loop()
+        self._closers = []
+        self._host_key = None
+        threading.Thread(target=self._loop.run_forever, name='fake-ios-server', daemon=True).start()
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _router(self, baud=None):
+        router = _Router(f'R{len(self.shells) + 1}', self.latency, baud, self.credentials)
+        self.shells.append(router.shell)
+        return router
+
+    def telnet(self, count=1):
+        """ Start count telnet routers, returns their ports. """
+
+        return [self._run(self._telnet(self._router())) for _ in range(count)]
+
+    def ssh(self, count=1):
+        """ Start count SSH routers, returns their ports. """
+
+        return [self._run(self._ssh(self._router())) for _ in range(count)]
+
+    def serial(self, count=1, link=None):
+        """ Start count console routers, each on a pty, and return the pty
+        paths to use as the COM port.  netmiko only opens ports pyserial
+        lists, which a pty isn't, so for netmiko give link a name pyserial
+        looks for, like /dev/ttyUSBsnap, and each pty gets a symlink link0,
+        link1 ... which is returned instead.  Making them needs write access
+        to /dev.
+        """
+
+        paths = []
+        for _ in range(count):
+            path = self._run(self._serial(self._router(self.baud)))
+            if link is not None:
+                name = f'{link}{len(paths)}'
+                if os.path.lexists(name):
+                    os.unlink(name)  # left by a server that was killed
+                os.symlink(path, name)
+                self._closers.append(lambda name=name: os.unlink(name))
+                path = name
+                self.routers[-1] = ('serial', path)
+            paths.append(path)
+        return paths
+
+    async def _telnet(self, router):
+        async def session(reader, writer):
+            async def read():
+                data = await reader.read(65536)
+                return _strip_telnet(data) if data else None
+
+            writer.write(bytes([IAC, WILL, ECHO, IAC, WILL, SUPPRESS_GO_AHEAD]))  # what a Cisco offers
+            try:
+                await router.serve(read, lambda text: writer.write(text.encode()))
+            except (ConnectionError, asyncio.CancelledError):
+                pass  # the client went, or the server is closing, asyncio's stream callback chokes on a cancel
+            writer.close()
+
+        server = await asyncio.start_server(session, '127.0.0.1', 0)
+        self._closers.append(server.close)
+        return self._started('telnet', server.sockets[0].getsockname()[1])
+
+    async def _ssh(self, router):
+        import paramiko  # only needed for SSH routers
+
+        loop = asyncio.get_running_loop()
+        if self._host_key is None:
+            self._host_key = await loop.run_in_executor(None, paramiko.RSAKey.generate, 2048)
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(100)
+        listener.setblocking(False)
+
+        def handshake(client):  # blocking, paramiko runs each connection on its own thread anyway
+            client.setblocking(True)
+            transport = paramiko.Transport(client)
+            transport.add_server_key(self._host_key)
+            shell_requested = threading.Event()
+            transport.start_server(server=_ssh_interface(self.credentials, shell_requested))
+            channel = transport.accept(20)
+            if channel is None or not shell_requested.wait(20):
+                transport.close()
+                return None
+            return channel
+
+        async def session(client):
+            channel = await loop.run_in_executor(None, handshake, client)
+            if channel is None:
+                return
+            readable = asyncio.Event()
+            loop.add_reader(channel.fileno(), readable.set)
+
+            async def read():
+                while not channel.recv_ready():
+                    if channel.closed or channel.eof_received:
+                        return None
+                    readable.clear()
+                    await readable.wait()
+                return channel.recv(65536).decode('utf-8', 'replace')
+
+            try:
+                await router.serve(read, lambda text: channel.sendall(text.encode()), login=False)
+            except (ConnectionError, OSError):
+                pass
+            loop.remove_reader(channel.fileno())
+            channel.get_transport().close()
+
+        async def accept():
+            while True:
+                client, _ = await loop.sock_accept(listener)
+                loop.create_task(session(client))
+
+        task = loop.create_task(accept())
+        self._closers += [task.cancel, listener.close]
+        return self._started('ssh', listener.getsockname()[1])
+
+    async def _serial(self, router):
+        import tty
+        loop = asyncio.get_running_loop()
+        controller, cable = os.openpty()
+        tty.setraw(cable)
+        path = os.ttyname(cable)
+        readable = asyncio.Event()
+        loop.add_reader(controller, readable.set)
+
+        async def read():
+            while True:
+                try:
+                    return os.read(controller, 65536).decode('utf-8', 'replace')
+                except BlockingIOError:
+                    readable.clear()
+                    await readable.wait()
+
+        unsent = bytearray()
+
+        def write(text):  # a pty only holds a few KB, the rest goes as the client reads
+            unsent.extend(text.encode())
+            loop.add_writer(controller, send)
+
+        def send():
+            try:
+                del unsent[:os.write(controller, unsent)]
+            except BlockingIOError:
+                pass
+            if not unsent:
+                loop.remove_writer(controller)
+
+        async def console():
+            while True:  # the console is always there, log in again after every exit
+                await router.serve(read, write, press_return=True)
+
+        os.set_blocking(controller, False)
+        task = loop.create_task(console())
+        self._closers += [task.cancel, lambda: loop.remove_reader(controller), lambda: loop.remove_writer(controller),
+                          lambda: os.close(controller), lambda: os.close(cable)]
+        return self._started('serial', path)
+
+    def _started(self, protocol, where):
+        self.routers.append((protocol, where))
+        return where
+
+    async def _stop(self):
+        for closer in self._closers:
+            closer()
+        sessions = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in sessions:
+            task.cancel()
+        await asyncio.gather(*sessions, return_exceptions=True)
+
+    def close(self):
+        """ Stop every router and remove any pty symlinks. """
+
+        self._run(self._stop())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake IOS routers on 127.0.0.1 and ptys.')
+    parser.add_argument('--telnet', type=int, default=1, help='telnet routers to start')
+    parser.add_argument('--ssh', type=int, default=1, help='SSH routers to start')
+    parser.add_argument('--serial', type=int, default=0, help='console routers to start, one pty each')
+    parser.add_argument('--latency', type=float, default=0.0, help='one-way latency in seconds')
+    parser.add_argument('--baud', type=int, default=None, help='console speed of the serial routers')
+    parser.add_argument('--serial-link', help='symlink the ptys as this plus a number, e.g. /dev/ttyUSBsnap, '
+                                              'so netmiko will open them')
+    parser.add_argument('--username', help='with --password, the only login let in (anything goes otherwise)')
+    parser.add_argument('--password')
+    args = parser.parse_args()
+    credentials = (args.username, args.password) if args.username and args.password else None
+    server = FakeServer(args.latency, args.baud, credentials)
+    server.telnet(args.telnet)
+    server.ssh(args.ssh)
+    server.serial(args.serial, args.serial_link)
+    for protocol, where in server.routers:
+        print(f'{protocol:7} 127.0.0.1:{where}' if protocol != 'serial' else f'{protocol:7} {where}')
+    print('Ctrl+C to stop.')
+    signal.signal(signal.SIGTERM, lambda number, frame: sys.exit())  # still tidy up the pty links when killed
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from inventory import device_name
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+MAX_WORKERS = 8  # default number of devices worked on at the same time
+
+
+def run_fleet(devices, job, progress, done=None, max_workers=MAX_WORKERS, describe_error=str):
+    """ Run job(device, emit) against every device with at most max_workers
+    running at once.  Each device reports through progress(name, message) so
+    it gets its own stream, and done(name, ok, result) is called as each one
+    finishes.  Returns {name: (ok, result)} once every device is done, an
+    exception from one device never stops the others.
+    """
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {}
+        for device in devices:
+            name = device_name(device)
+            futures[pool.submit(job, device, partial(progress, name))] = name
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = (True, future.result())
+            except Exception as e:
+                results[name] = (False, describe_error(e))
+            if done is not None:
+                done(name, *results[name])
+    return results
+
+
+def summary(action, results):
+    """ One line summary of a fleet run. """
+
+    failed = sorted(name for name, (ok, _) in results.items() if not ok)
+    text = f'Fleet {action} complete: {len(results) - len(failed)} ok, {len(failed)} failed.'
+    if failed:
+        text += '\nFailed: ' + ', '.join(failed)
+    return text
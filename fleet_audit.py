@@ -0,0 +1,145 @@
+import config_model
+import csv
+import device_errors
+import device_ops
+import device_store
+import fleet
+import json
+import latency_profile
+import messages
+import re
+from inventory import METHOD_NAMES, device_name
+from record_table import INT, STR, Table
+from session_pool import pool
+from statistics import median
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Verify for a whole inventory before a rollout: log in to every device, a few at a time, and note whether the
+credentials work, the IOS version, the images in flash and the prompt round trip.  Each device is one login, the
+version and flash commands share it.  The report is a record_table.Table, so it sorts and filters like the
+Troubleshoot tables, and saves as CSV or JSON.  No Qt in here.'''
+
+COLUMNS = [('device', STR), ('method', STR), ('auth', STR), ('version', STR), ('version ok', STR),
+           ('images', STR), ('rtt ms', INT), ('error', STR)]
+VERSION_COMMAND = 'show run | inc version 1'
+FLASH_COMMAND = 'dir flash: | i .bin'
+
+_IMAGE = re.compile(r'\S+\.bin\b')
+
+
+def record(device, auth, show_ver='', show_flash='', rtt=None, error=''):
+    """ The report row for a device, from what its audit found. """
+
+    version = config_model.parse(show_ver).value('version') or ''
+    number = device_ops.get_version_cisco(show_ver)
+    version_ok = '' if number is None else 'yes' if number >= device_ops.MIN_VERSION else 'no'  # '' never got that far
+    images = ' '.join(_IMAGE.findall(show_flash))
+    rtt = None if rtt is None else round(rtt * 1000)
+    return (device_name(device), METHOD_NAMES[device['device_type']], auth, version, version_ok, images, rtt, error)
+
+
+def failed(device, e):
+    """ The report row for a device whose audit raised e. """
+
+    if isinstance(e, device_errors.NetMikoAuthenticationException):
+        auth = 'failed'
+    elif isinstance(e, (device_errors.NetMikoTimeoutException, TimeoutError, OSError)):
+        auth = 'unreachable'
+    else:
+        auth = 'error'
+    return record(device, auth, error=device_ops.describe_error(e))
+
+
+def audit(device, emit):
+    """ Log in with fresh credentials and return the device's report row. """
+
+    pool.close(device)  # make sure the credentials are really checked
+    with pool.session(device) as router:
+        emit(messages.progress('...connected...'))
+        samples = latency_profile.measure(router)
+        latency_profile.profiles.measured(device, samples)
+        latency_profile.apply(router, latency_profile.profiles.delay_factor(device))
+        show_ver = router.send_command(VERSION_COMMAND)
+        show_flash = router.send_command(FLASH_COMMAND)
+    return record(device, 'ok', show_ver, show_flash, median(samples))
+
+
+def describe(row):
+    """ One line about a report row, for the fleet view. """
+
+    _, _, _, version, version_ok, images, rtt, _ = row
+    images = len(images.split())
+    return (f'IOS {version or "version unknown"}{" (too old)" if version_ok == "no" else ""}, '
+            f'{images} image{"" if images == 1 else "s"} in flash, {rtt} ms round trip')
+
+
+def audit_fleet(devices, progress, done=None, max_workers=fleet.MAX_WORKERS, async_io=False, max_sessions=None):
+    """ Audit every device, max_workers at a time (or max_sessions on the
+    async transport with async_io set).  Same callbacks as fleet.run_fleet,
+    a device that can't be audited fails there with the usual message.
+    Returns the report, a row per device in inventory order.  Devices in
+    the device store get the version and round trip noted there.
+    """
+
+    rows = {}
+
+    def audited(device, emit):
+        try:
+            row = audit(device, emit)
+        except Exception as e:
+            rows[device_name(device)] = failed(device, e)
+            raise
+        rows[device_name(device)] = row
+        return describe(row)
+
+    if async_io:
+        import async_ops  # asyncio isn't loaded until it is wanted
+
+        async def async_audited(device, emit):
+            try:
+                row = await async_ops.audit(device, emit)
+            except Exception as e:
+                rows[device_name(device)] = failed(device, e)
+                raise
+            rows[device_name(device)] = row
+            return describe(row)
+
+        async_ops.run_fleet(devices, async_audited, audited, progress, done,
+                            max_sessions or async_ops.MAX_SESSIONS, device_ops.describe_error)
+    else:
+        fleet.run_fleet(devices, audited, progress, done, max_workers, device_ops.describe_error)
+    for device in devices:
+        _, _, auth, version, _, _, rtt, _ = rows[device_name(device)]
+        if auth == 'ok':
+            device_store.store.verified(device, version, rtt / 1000)
+    return Table.from_rows(COLUMNS, [rows[device_name(device)] for device in devices])
+
+
+def save(table, path):
+    """ Write the report to path, JSON if it ends in .json and CSV otherwise. """
+
+    records = [table.record(row) for row in range(len(table))]
+    with open(path, 'w', newline='') as file:
+        if path.lower().endswith('.json'):
+            json.dump(records, file, indent=1)
+        else:
+            writer = csv.DictWriter(file, table.names)
+            writer.writeheader()
+            writer.writerows(records)
+
+
+def summary(table):
+    """ One line about a finished audit, like 'Audit of 40 devices: 38 logged in, 2 failed, 3 below 15.4.' """
+
+    auth = [table.record(row)['auth'] for row in range(len(table))]
+    old = sum(table.record(row)['version ok'] == 'no' for row in range(len(table)))
+    problems = ', '.join(f'{auth.count(result)} {result}' for result in ('failed', 'unreachable', 'error')
+                         if auth.count(result))
+    return (f'Audit of {len(table)} devices: {auth.count("ok")} logged in'
+            f'{", " + problems if problems else ""}, {old} below {device_ops.MIN_VERSION}.')
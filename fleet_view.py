@@ -0,0 +1,71 @@
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QAbstractItemView, QHeaderView, QTableWidget, QTableWidgetItem
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+
+class FleetView(QTableWidget):
+    """ One row per device in a fleet run showing its status and latest
+    message.  The full stream for each device is kept so clicking a row can
+    show it in the page's log viewer.
+    """
+
+    def __init__(self, parent=None):
+        """ Initialise the table. """
+
+        super().__init__(0, 3, parent)
+        self.setHorizontalHeaderLabels(['Device', 'Status', 'Last message'])
+        self.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.streams = {}  # device name -> list of messages
+        self._rows = {}  # device name -> row
+
+    def start(self, names):
+        """ Reset the table for a new run over the named devices. """
+
+        self.setRowCount(0)
+        self.streams = {}
+        self._rows = {}
+        for name in names:
+            row = self.rowCount()
+            self.insertRow(row)
+            self.setItem(row, 0, QTableWidgetItem(name))
+            self.setItem(row, 1, QTableWidgetItem('waiting'))
+            self.setItem(row, 2, QTableWidgetItem(''))
+            self.streams[name] = []
+            self._rows[name] = row
+        self.show()
+
+    def progress(self, name, message):
+        """ A message from one device. """
+
+        self.streams.setdefault(name, []).append(message)
+        row = self._rows.get(name)
+        if row is None:
+            return
+        self.item(row, 1).setText('running')
+        lines = message.strip().splitlines()
+        self.item(row, 2).setText(lines[-1] if lines else '')
+
+    def done(self, name, ok, result):
+        """ A device has finished. """
+
+        self.progress(name, result)
+        row = self._rows.get(name)
+        if row is None:
+            return
+        status = self.item(row, 1)
+        status.setText('ok' if ok else 'failed')
+        status.setForeground(QColor('#228B22') if ok else QColor('#B22222'))
+
+    def stream(self, row):
+        """ Everything the device on row has reported so far. """
+
+        name = self.item(row, 0).text()
+        return '\n'.join(self.streams.get(name, []))
@@ -0,0 +1,97 @@
+import csv
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Connection method names an inventory file may use, mapped to the netmiko device type.'''
+DEVICE_TYPES = {
+    'console': 'cisco_ios_serial',
+    'serial': 'cisco_ios_serial',
+    'telnet': 'cisco_ios_telnet',
+    'ssh': 'cisco_ios',
+    'cisco_ios_serial': 'cisco_ios_serial',
+    'cisco_ios_telnet': 'cisco_ios_telnet',
+    'cisco_ios': 'cisco_ios',
+}
+METHOD_NAMES = {'cisco_ios_serial': 'console', 'cisco_ios_telnet': 'telnet', 'cisco_ios': 'ssh'}  # and back again
+
+
+def build_device(device_type, host, username, password, port=None):
+    """ Build the netmiko device dict for one router.  host is the COM port
+    for console or the IP for telnet and ssh, port is only needed when the
+    router doesn't listen on the usual one and can also be given on the end
+    of the IP, like 127.0.0.1:2323.
+    """
+
+    if device_type == 'cisco_ios_serial':
+        return {
+            'device_type': device_type,
+            'global_delay_factor': 2,
+            'username': username,
+            'password': password,
+            'serial_settings': {
+                'port': host}
+        }
+    if not port and host.count(':') == 1:  # an IPv6 address has more than one
+        host, port = host.split(':')
+    device = {
+        'device_type': device_type,
+        'ip': host,
+        'username': username,
+        'password': password
+    }
+    if port:
+        device['port'] = int(port)
+    return device
+
+
+def device_name(device):
+    """ A short name for a device dict, the IP (and port if it isn't the usual one) or the COM port. """
+
+    if 'ip' in device:
+        return f"{device['ip']}:{device['port']}" if device.get('port') else device['ip']
+    return device['serial_settings']['port']
+
+
+def repeated(devices):
+    """ The device_names that more than one of devices has.  A fleet run
+    reports each device under its name, so each has to be there once.
+    """
+
+    seen, names = set(), []
+    for name in map(device_name, devices):
+        if name in seen and name not in names:
+            names.append(name)
+        seen.add(name)
+    return names
+
+
+def load_inventory(path, username, password):
+    """ Read a CSV inventory with 'method' and 'host' columns (and an
+    optional 'port' column) and return a list of device dicts.  Credentials are never stored in the file, the ones
+    entered on the Router Info tab are used for every device.  A device can only be in it once.
+    """
+
+    devices = []
+    lines = {}  # device_name: the line it is on
+    with open(path, newline='') as file:
+        for row_no, row in enumerate(csv.DictReader(file), 2):
+            method = (row.get('method') or '').strip().lower()
+            host = (row.get('host') or '').strip()
+            port = (row.get('port') or '').strip()
+            if method not in DEVICE_TYPES or host == '':
+                raise ValueError(f'{path} line {row_no}: needs a method (console/telnet/ssh) and a host.')
+            if port and not port.isdigit():
+                raise ValueError(f'{path} line {row_no}: port {port} is not a number.')
+            device = build_device(DEVICE_TYPES[method], host, username, password, port)
+            name = device_name(device)
+            if name in lines:
+                raise ValueError(f'{path} line {row_no}: {name} is already on line {lines[name]}, '
+                                 'each device can only be in once.')
+            lines[name] = row_no
+            devices.append(device)
+    return devices
@@ -0,0 +1,178 @@
+import device_errors
+import load_engine
+import messages
+import re
+import threading
+from session_pool import session_key
+from statistics import median
+from time import monotonic, sleep
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''How quickly each device answers, timed on verify, and the netmiko delay factor and push pacing that go with
+it.  A fast link loses the line pace it doesn't need and a console that answers quickly drops netmiko's doubled
+waits, a slow link gets longer waits and bigger chunks.  Timeouts and routers that slow down part way through a
+load back the settings off again.  No Qt in here.'''
+
+SAMPLES = 3  # prompt round trips timed on verify, the median is kept
+ROUND_TRIP_TIMEOUT = 30  # seconds to wait for a prompt while timing it
+FAST_RTT = 0.1  # seconds, a round trip quicker than this gets the fast settings
+SLOW_RTT = 0.5  # seconds, each this much round trip adds one to netmiko's delay factor
+MAX_DELAY_FACTOR = 4
+FAST_PACE = 0.25  # line pace scale on a fast network link, a console keeps its full pace so its buffer can't overrun
+MAX_PACE_SCALE = 4
+SLOW_SYNC = 4  # a chunk taking this many times longer a line to sync than usual is the router slowing down
+MIN_SLOWDOWN = 0.5  # seconds, shorter syncs are never counted as slow
+
+
+def round_trip(router, timeout=ROUND_TRIP_TIMEOUT):
+    """ Seconds from sending Return on a netmiko connection to the prompt coming back. """
+
+    router.read_channel()  # anything left over from before
+    prompt = re.compile(re.escape(router.base_prompt) + r'[>#]\s*$')
+    output = ''
+    start = monotonic()
+    router.write_channel('\n')
+    while not prompt.search(output):
+        if monotonic() - start > timeout:
+            raise device_errors.NetMikoTimeoutException(f'No prompt back within {timeout} seconds.')
+        sleep(0.002)
+        output += router.read_channel()
+    return monotonic() - start
+
+
+def measure(router, samples=SAMPLES):
+    return [round_trip(router) for _ in range(samples)]
+
+
+def apply(router, factor):
+    """ Give a live netmiko connection a new delay factor, the way
+    ConnectHandler would have: with fast_cli on (the IOS default) a factor
+    of 1 means netmiko's quickest waits.
+    """
+
+    if factor is not None:
+        router.global_delay_factor = 0.1 if getattr(router, 'fast_cli', False) and factor == 1 else factor
+
+
+class LatencyProfiles:
+    """ A latency profile per device: the measured round trip and how many
+    timeouts and slowdowns it has had since, from which the delay factor
+    and push pacing are worked out.  Devices verify hasn't timed yet use
+    the defaults until they have a timeout.
+    """
+
+    def __init__(self):
+        """ Initialise the profiles. """
+
+        self._profiles = {}  # session_key -> {'rtt', 'timeouts', 'slowdowns', 'line_time'}
+        self._lock = threading.Lock()
+
+    def get(self, device):
+        """ A copy of the device's profile, or None if it has none. """
+
+        with self._lock:
+            profile = self._profiles.get(session_key(device))
+            return dict(profile) if profile is not None else None
+
+    def measured(self, device, samples):
+        """ Start the device's profile over from round trip samples in seconds. """
+
+        with self._lock:
+            self._profiles[session_key(device)] = {'rtt': median(samples), 'timeouts': 0, 'slowdowns': 0,
+                                                   'line_time': None}
+
+    def timed_out(self, device):
+        """ The device didn't answer in time, wait longer for it from now on. """
+
+        with self._lock:
+            profile = self._profiles.setdefault(session_key(device), {'rtt': None, 'timeouts': 0, 'slowdowns': 0,
+                                                                      'line_time': None})
+            profile['timeouts'] += 1
+
+    def chunk_synced(self, device, lines, seconds):
+        """ Note how long the router took to catch up with a chunk of lines.
+        Returns True if that was much slower than its chunks usually are,
+        which is counted as a slowdown.
+        """
+
+        with self._lock:
+            profile = self._profiles.get(session_key(device))
+            if profile is None:
+                return False
+            line_time = seconds / max(1, lines)
+            usual = profile['line_time']
+            profile['line_time'] = line_time if usual is None else (usual * 3 + line_time) / 4
+            if usual is None or line_time < SLOW_SYNC * usual or seconds < MIN_SLOWDOWN + 2 * (profile['rtt'] or 0):
+                return False
+            profile['slowdowns'] += 1
+            return True
+
+    def delay_factor(self, device):
+        """ netmiko's global_delay_factor for the device, None for its default. """
+
+        profile = self.get(device)
+        if profile is None:
+            return None
+        if profile['rtt'] is None:
+            factor = device.get('global_delay_factor', 1)
+        elif profile['rtt'] < FAST_RTT:
+            factor = 1
+        else:
+            factor = 2 + int(profile['rtt'] / SLOW_RTT)
+        return min(MAX_DELAY_FACTOR, factor + profile['timeouts'])
+
+    def connect_settings(self, device):
+        """ Extra ConnectHandler arguments for the device. """
+
+        factor = self.delay_factor(device)
+        return {} if factor is None else {'global_delay_factor': factor}
+
+    def push_profile(self, device):
+        """ load_engine.PUSH_PROFILES for the device's connection method,
+        tuned to its profile.
+        """
+
+        base = load_engine.PUSH_PROFILES[device['device_type']]
+        profile = self.get(device)
+        if profile is None:
+            return base
+        console = device['device_type'] == 'cisco_ios_serial'
+        fast = profile['rtt'] is not None and profile['rtt'] < FAST_RTT and not console
+        pace = min(MAX_PACE_SCALE, (FAST_PACE if fast else 1) * 2 ** (profile['timeouts'] + profile['slowdowns']))
+        factor = self.delay_factor(device)
+        tuned = dict(base, line_pace=base['line_pace'] * pace, sync_timeout=base['sync_timeout'] * factor)
+        if not console and profile['rtt'] is not None:  # fewer syncs to wait a slow round trip for
+            tuned['chunk_size'] = base['chunk_size'] * min(MAX_DELAY_FACTOR, 1 + int(profile['rtt'] / SLOW_RTT))
+        return tuned
+
+    def tuner(self, device, emit):
+        """ A load_engine.push_config tuner that slows the rest of a load
+        down if the router starts falling behind.
+        """
+
+        def tune(lines, seconds):
+            if self.chunk_synced(device, lines, seconds):
+                emit(messages.status('The router is falling behind, sending lines further apart.'))
+            return self.push_profile(device)
+        return tune
+
+    def describe(self, device):
+        profile = self.get(device)
+        if profile is None or profile['rtt'] is None:
+            return 'Not timed yet.'
+        push = self.push_profile(device)
+        return (f"Round trip {profile['rtt'] * 1000:.0f} ms: delay factor {self.delay_factor(device)}, "
+                f"{push['chunk_size']} line chunks, {push['line_pace'] * 1000:.1f} ms line pace.")
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+profiles = LatencyProfiles()  # shared by every tab
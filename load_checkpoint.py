@@ -0,0 +1,119 @@
+import hashlib
+import json
+import messages
+import os
+import re
+import threading
+from datetime import datetime
+from inventory import device_name
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Where a full config load had got to, kept on disk so a load that fails part way (a dropped session, a router
+that stops answering) can be resumed instead of started over.  One small JSON file per device, rewritten after
+every chunk the router confirms and removed once the load is saved.  No Qt in here.
+  Checkpoints/10.1.1.1.json   device, config hash, lines, confirmed line, time'''
+
+DEFAULT_DIR = 'Checkpoints'
+_UNSAFE = re.compile(r'[^\w.-]')  # COM ports, /dev/ttyUSB0 and host:port all become file names
+
+
+def config_hash(lines):
+    """ sha256 of the config lines, checkpoints count lines so blank ones count too. """
+
+    text = '\n'.join(line.rstrip() for line in lines)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def resume_line(lines, confirmed):
+    """ The index in lines to carry on from when the first confirmed lines
+    are on the router: the start of the section the next line is in, so a
+    section cut off by the failure is sent again whole.
+    """
+
+    start = min(confirmed, len(lines))
+    while 0 < start < len(lines) and (lines[start][:1].isspace() or not lines[start].strip()):
+        start -= 1  # a section's lines are indented under its header
+    return start
+
+
+class Checkpoints:
+    """ The unfinished loads, one per device.  A new load of a different
+    config to the same device replaces its checkpoint.
+    """
+
+    def __init__(self, path=DEFAULT_DIR):
+        """ Initialise the store, the directory is made on the first save. """
+
+        self.path = path
+        self._lock = threading.Lock()  # fleet loads save from several worker threads
+
+    def _file(self, device):
+        return os.path.join(self.path, _UNSAFE.sub('_', device_name(device)) + '.json')
+
+    def save(self, device, digest, lines, confirmed):
+        """ Record that the first confirmed of lines lines of the config with
+        hash digest are on the device.
+        """
+
+        path = self._file(device)
+        entry = {'device': device_name(device), 'hash': digest, 'lines': lines, 'confirmed': confirmed,
+                 'time': datetime.now().isoformat(timespec='seconds')}
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            temp = f'{path}.{threading.get_ident()}.tmp'
+            with open(temp, 'w') as file:
+                json.dump(entry, file)
+            os.replace(temp, path)  # a crash mid write leaves the last checkpoint, not half of one
+
+    def get(self, device, digest=None):
+        """ The device's checkpoint, None if it has none or it is for a
+        config other than the one with hash digest.
+        """
+
+        try:
+            with open(self._file(device)) as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if digest is not None and entry.get('hash') != digest:
+            return None
+        return entry
+
+    def unfinished(self, device, config):
+        """ The device's checkpoint if it is for config, None if not. """
+
+        return self.get(device, config_hash(config.splitlines()))
+
+    def clear(self, device):
+        try:
+            os.remove(self._file(device))
+        except FileNotFoundError:
+            pass
+
+    def start(self, device, lines, resume, emit):
+        """ Where a full load of lines to device should begin and a
+        callback for load_engine.push_config's confirmed.  With resume set
+        that is after the last section the device's checkpoint for this
+        config confirmed, and None if there is no such checkpoint.  Nothing
+        is saved until the router confirms a chunk, so a load that never gets
+        a line on the router (it can't connect, say) leaves no checkpoint.
+        """
+
+        digest = config_hash(lines)
+        first = 0
+        if resume:
+            entry = self.get(device, digest)
+            if entry is None:
+                return None, None
+            first = resume_line(lines, entry['confirmed'])
+            emit(messages.status(f"Resuming from line {first + 1} of {len(lines)}, checkpoint of {entry['time']}."))
+        return first, lambda confirmed: self.save(device, digest, len(lines), confirmed)
+
+
+checkpoints = Checkpoints()  # shared by every tab
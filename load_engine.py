@@ -0,0 +1,156 @@
+import messages
+import re
+import tracing
+from time import monotonic, sleep
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Chunk size and pacing for each connection method.
+chunk_size   - config lines written before we wait for the router to catch up.
+line_pace    - seconds to pause between lines inside a chunk (console buffers overrun easily).
+sync_timeout - seconds without any output from the router before we give up on a chunk.'''
+PUSH_PROFILES = {
+    'cisco_ios_serial': {'chunk_size': 20, 'line_pace': 0.005, 'sync_timeout': 120},
+    'cisco_ios_telnet': {'chunk_size': 100, 'line_pace': 0.01, 'sync_timeout': 60},
+    'cisco_ios': {'chunk_size': 200, 'line_pace': 0, 'sync_timeout': 60},
+}
+
+ERROR_MARKERS = ('% Invalid input', '% Incomplete command', '% Ambiguous command')
+
+_PROMPT_ECHO = re.compile(r'\(config[^)]*\)#(.*)$')  # Router(config-if)#description uplink
+_BANNER = re.compile(r'^\s*banner\s+\S+\s+(\S)(.*)$')
+SYNC_LINE = '! SNAP-SYNC {}'  # a comment IOS echoes back, sent after each chunk to know the router caught up
+
+
+class PushTimeout(Exception):
+    """ Raised when the router stops answering in the middle of a chunk. """
+
+
+def split_chunks(lines, chunk_size, start=0):
+    """ Split config lines from index start on into chunks of roughly
+    chunk_size lines.  Blank lines are dropped and a chunk never ends inside
+    a banner, otherwise the sync line would end up as banner text.  Yields
+    (first line number, last line number, lines), numbered from the top of
+    lines.
+    """
+
+    chunk = []
+    first = None
+    delimiter = None
+    for number, line in enumerate(lines[start:], start + 1):
+        if line.strip() == '' and delimiter is None:
+            continue
+        if first is None:
+            first = number
+        chunk.append(line)
+        if delimiter is None:
+            banner = _BANNER.match(line)
+            if banner and banner.group(1)[0] not in banner.group(2):
+                delimiter = banner.group(1)[0]  # multi-line banner, keep going until it closes
+                continue
+        elif delimiter in line:
+            delimiter = None
+        if delimiter is None and len(chunk) >= chunk_size:
+            yield first, number, chunk
+            chunk = []
+            first = None
+    if chunk:
+        yield first, number, chunk
+
+
+def scan_errors(output, chunk, first_line):
+    """ Match IOS error markers in the echoed output back to the config line
+    that caused them.  Returns a list of (line number, line, marker).
+    """
+
+    errors = []
+    position = 0
+    current = None
+    for out_line in output.splitlines():
+        echo = _PROMPT_ECHO.search(out_line)
+        if echo or (position < len(chunk) and out_line.strip() == chunk[position].strip()):
+            command = echo.group(1).strip() if echo else out_line.strip()  # first echo has no prompt in front
+            for index in range(position, len(chunk)):
+                if chunk[index].strip() == command:
+                    current = index
+                    position = index + 1
+                    break
+            continue
+        if current is not None and any(marker in out_line for marker in ERROR_MARKERS):
+            errors.append((first_line + current, chunk[current].strip(), out_line.strip()))
+    return errors
+
+
+def sync_pattern(sentinel):
+    """ Matches the sentinel's echo followed by the next prompt. """
+
+    return re.compile(re.escape(sentinel) + r'\s*[\r\n]+[^\r\n]*#')
+
+
+def report_errors(output, chunk, first_line, emit):
+    """ scan_errors on a chunk's output, each error also sent to emit. """
+
+    errors = scan_errors(output, chunk, first_line)
+    for error in errors:
+        emit(messages.error(f'----ERROR---- line {error[0]}: {error[1]}\n {error[2]}'))
+    return errors
+
+
+def _sync(router, sentinel, timeout):
+    """ Read from the channel until the router has echoed the sentinel line and
+    printed its prompt again.  Returns everything read before the sentinel.
+    """
+
+    pattern = sync_pattern(sentinel)
+    output = ''
+    last_data = monotonic()
+    while True:
+        data = router.read_channel()
+        if data:
+            output += data
+            last_data = monotonic()
+            if pattern.search(output):
+                return output[:output.find(sentinel)]
+        elif monotonic() - last_data > timeout:
+            raise PushTimeout(f'No response from the router after {timeout} seconds.')
+        else:
+            sleep(0.02)
+
+
+def push_config(router, lines, profile, emit, tuner=None, start=0, confirmed=None):
+    """ Send config lines to a router that is already in config mode.  Lines
+    go out a chunk at a time with a single prompt sync per chunk instead of a
+    round-trip per line.  Errors are reported through emit as they are found
+    and returned as a list of (line number, line, marker).  tuner, if given,
+    is called with the chunk's length and how long its sync took after each
+    chunk and returns the profile for the rest of the load.  Lines before
+    index start are skipped, they are already on the router, and confirmed,
+    if given, is called with the line number of the last line the router
+    has caught up with after each chunk.  Each chunk is a config span.
+    """
+
+    errors = []
+    for count, (first_line, last_line, chunk) in enumerate(split_chunks(lines, profile['chunk_size'], start)):
+        emit(messages.progress('\n'.join(chunk)))
+        detail = f'lines {first_line}-{last_line}'
+        with tracing.default_tracer.span('config', tracing.device_of(router), detail) as span:
+            span['bytes'] = sum(len(line) + 1 for line in chunk)
+            for line in chunk:
+                router.write_channel(line + '\n')
+                if profile['line_pace']:
+                    sleep(profile['line_pace'])
+            sentinel = SYNC_LINE.format(count)
+            router.write_channel(sentinel + '\n')
+            sync_started = monotonic()
+            output = _sync(router, sentinel, profile['sync_timeout'])
+        if tuner is not None:
+            profile = tuner(len(chunk), monotonic() - sync_started)
+        errors += report_errors(output, chunk, first_line, emit)
+        if confirmed is not None:
+            confirmed(last_line)
+    return errors
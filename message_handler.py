@@ -1,5 +1,10 @@
-from PyQt5.QtGui import (QColor)
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import (QColor, QTextCursor)
 from PyQt5.QtWidgets import QAbstractSlider
+import messages
+
+FLUSH_INTERVAL = 50  # milliseconds between updates of a buffered viewer
+MAX_BLOCKS = 50000  # lines a buffered viewer keeps before the oldest are thrown away
 
 
 class MessageHandler:
@@ -37,14 +42,30 @@ class MessageHandler:
 
 
 class LoggingMessageHandler(MessageHandler):
-    """ A message handler that captures user messages and displays them in a widget."""
+    """ A message handler that captures user messages and displays them in a
+    widget.  A buffered handler collects messages and adds them to the viewer
+    every FLUSH_INTERVAL milliseconds in one edit, so a thread emitting
+    thousands of lines doesn't make the viewer lay itself out thousands of
+    times.  If max_blocks is set the viewer only keeps that many lines.
+    """
 
-    def __init__(self, verbose, viewer):
+    def __init__(self, verbose, viewer, buffered=False, max_blocks=0):
         """ Initialise the object. """
 
         super().__init__(quiet=False, verbose=verbose)
 
         self._viewer = viewer
+        self._pending = []  # (text, format) waiting for the next flush
+
+        self._timer = None
+        if buffered:
+            self._timer = QTimer(viewer)
+            self._timer.setSingleShot(True)
+            self._timer.setInterval(FLUSH_INTERVAL)
+            self._timer.timeout.connect(self.flush)
+
+        if max_blocks:
+            viewer.setMaximumBlockCount(max_blocks)
 
         self._default_format = self._viewer.currentCharFormat()
         self._default_format.setForeground(QColor('#1E90FF'))  # blue
@@ -59,11 +80,34 @@ class LoggingMessageHandler(MessageHandler):
         self._title_format.setForeground(QColor('#1E90FF'))  # blue
         self._title_format.setFontPointSize(20)
 
+        self._failure_format = self._viewer.currentCharFormat()
+        self._failure_format.setForeground(QColor('#B22222'))  # red
+
+        self._formats = {  # format for each kind of message coming back from a thread
+            messages.STATUS: self._status_format,
+            messages.ERROR: self._failure_format,
+            messages.PROGRESS: self._default_format,
+            messages.OUTPUT: self._status_format,
+        }
+
     def clear(self):
         """ Clear the viewer. """
 
+        self._pending = []
         self._viewer.setPlainText('')
 
+    def flush(self):
+        """ Add any buffered messages to the viewer. """
+
+        pending, self._pending = self._pending, []
+        if pending:
+            self._insert(pending)
+
+    def handle(self, message):
+        """ Add a message from a worker thread to the viewer in the format for its kind. """
+
+        self._append_text(message, self._formats[messages.kind_of(message)])
+
     def status_message(self, message):
         """ Add a status message to the viewer. """
 
@@ -90,11 +134,29 @@ class LoggingMessageHandler(MessageHandler):
     def _append_text(self, text, char_format):
         """ Append text to the viewer using a specific character format. """
 
+        if self._timer is None:
+            self._insert([(text, char_format)])
+            return
+
+        self._pending.append((text, char_format))
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _insert(self, batch):
+        """ Add a batch of (text, format) messages to the end of the viewer in a single edit. """
+
         viewer = self._viewer
 
-        viewer.setCurrentCharFormat(char_format)
-        viewer.appendPlainText(text)
-        viewer.setCurrentCharFormat(self._default_format)
+        cursor = QTextCursor(viewer.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        new_block = not viewer.document().isEmpty()
+        for text, char_format in batch:
+            if new_block:
+                cursor.insertBlock()
+            cursor.insertText(text, char_format)
+            new_block = True
+        cursor.endEditBlock()
 
         # Make sure the new text is visible.
         viewer.verticalScrollBar().triggerAction(
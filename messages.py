@@ -0,0 +1,45 @@
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''The kinds of message the worker threads send back to the pages.  A message is still a str so anything
+that just wants the text (files, the fleet table, a terminal) can use it as one.  No Qt in here.'''
+
+STATUS = 'status'  # what SNAP is doing or has done
+ERROR = 'error'  # something went wrong
+PROGRESS = 'progress'  # steps along the way, config lines being sent
+OUTPUT = 'output'  # text that came back from the device
+
+
+class Message(str):
+    """ A str that knows what kind of message it is. """
+
+    def __new__(cls, text, kind=STATUS):
+        message = super().__new__(cls, text)
+        message.kind = kind
+        return message
+
+
+def status(text):
+    return Message(text, STATUS)
+
+
+def error(text):
+    return Message(text, ERROR)
+
+
+def progress(text):
+    return Message(text, PROGRESS)
+
+
+def output(text):
+    return Message(text, OUTPUT)
+
+
+def kind_of(message):
+    """ The kind of any message, plain strings count as status. """
+
+    return getattr(message, 'kind', STATUS)
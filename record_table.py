@@ -0,0 +1,138 @@
+from array import array
+from socket import inet_aton
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Parsed command output kept a column at a time.  Whole numbers go in an array.  Text columns are dictionary
+encoded, each distinct value is stored once and the rows hold its number, so the same interface name or route
+code on 900k rows costs 4 bytes a row and a filter only tests each distinct value once.  No Qt in here.'''
+
+STR = 'str'
+INT = 'int'
+IP = 'ip'  # an address or prefix, kept as text but sorted by number
+MISSING = -1  # an INT that the output didn't have
+
+
+def ip_key(value):
+    """ Sort key for '10.1.0.0/16' or '10.1.0.1', numeric with the prefix length after. """
+
+    address, _, length = value.partition('/')
+    try:
+        return int.from_bytes(inet_aton(address), 'big') << 6 | int(length or 32)
+    except (OSError, ValueError):
+        return -1
+
+
+class Table:
+    """ Typed records stored by column.  columns is a list of (name, kind). """
+
+    def __init__(self, columns):
+        """ Initialise an empty table. """
+
+        self.names = [name for name, _ in columns]
+        self.kinds = [kind for _, kind in columns]
+        self.data = [array('q') if kind == INT else array('l') for kind in self.kinds]  # numbers or value codes
+        self.values = [[] for _ in self.kinds]  # the distinct values of each text column, by code
+        self._codes = [{} for _ in self.kinds]  # value -> code for each text column
+        self._keys = {}  # column -> sort key per row, built on the first sort by that column
+
+    @classmethod
+    def from_rows(cls, columns, rows):
+        """ A table of a list of row tuples, built a column at a time which is
+        a lot quicker than append for big outputs.
+        """
+
+        table = cls(columns)
+        if rows:
+            for number, column in enumerate(zip(*rows)):
+                if table.kinds[number] == INT:
+                    if None in column:
+                        column = [MISSING if value is None else value for value in column]
+                    table.data[number] = array('q', map(int, column))
+                else:
+                    if None in column:
+                        column = ['' if value is None else value for value in column]
+                    values = list(dict.fromkeys(column))  # distinct, in the order they first appear
+                    codes = table._codes[number] = {value: code for code, value in enumerate(values)}
+                    table.data[number] = array('l', map(codes.__getitem__, column))
+                    table.values[number] = values
+        return table
+
+    def __len__(self):
+        return len(self.data[0]) if self.data else 0
+
+    def append(self, row):
+        """ Add one record, a value per column.  An INT of None is stored as MISSING. """
+
+        for number, value in enumerate(row):
+            if self.kinds[number] == INT:
+                self.data[number].append(MISSING if value is None else int(value))
+            else:
+                codes = self._codes[number]
+                code = codes.setdefault(value or '', len(codes))
+                if code == len(self.values[number]):
+                    self.values[number].append(value or '')
+                self.data[number].append(code)
+        if self._keys:
+            self._keys.clear()
+
+    def value(self, row, column):
+        value = self.data[column][row]
+        if self.kinds[column] != INT:
+            return self.values[column][value]
+        return None if value == MISSING else value
+
+    def record(self, row):
+        return {name: self.value(row, column) for column, name in enumerate(self.names)}
+
+    def column(self, name):
+        return self.names.index(name)
+
+    def sort(self, rows, column, reverse=False):
+        """ The row numbers in rows, ordered by a column. """
+
+        keys = self._keys.get(column)
+        if keys is None:
+            if self.kinds[column] == INT:
+                keys = self.data[column]
+            else:
+                key = ip_key if self.kinds[column] == IP else str.lower
+                by_code = [key(value) for value in self.values[column]]
+                keys = [by_code[code] for code in self.data[column]]
+            self._keys[column] = keys
+        return sorted(rows, key=keys.__getitem__, reverse=reverse)
+
+    def _matching(self, column, text):
+        """ The codes (or numbers) in a column whose text contains text. """
+
+        if self.kinds[column] == INT:
+            return {value for value in set(self.data[column]) if value != MISSING and text in str(value)}
+        return {code for code, value in enumerate(self.values[column]) if text in value.lower()}
+
+    def filter(self, text):
+        """ Row numbers of the records containing text in any column, or in
+        one column with 'name:text' (like 'interface:gi0/1').  An empty filter
+        matches everything.
+        """
+
+        text = text.strip().lower()
+        if not text:
+            return list(range(len(self)))
+        name, colon, wanted = text.partition(':')
+        names = [name.lower() for name in self.names]
+        if colon and name.strip() in names:
+            columns = [names.index(name.strip())]
+            text = wanted.strip()
+        else:
+            columns = range(len(self.names))
+        matches = set()
+        for column in columns:
+            matching = self._matching(column, text)
+            if matching:
+                matches.update(row for row, code in enumerate(self.data[column]) if code in matching)
+        return sorted(matches)
@@ -0,0 +1,119 @@
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
+from PyQt5.QtWidgets import QAbstractItemView, QLabel, QLineEdit, QTableView, QVBoxLayout, QWidget
+from record_table import INT, Table
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+FILTER_DELAY = 200  # ms after the last key press before the filter is applied
+
+
+class RecordModel(QAbstractTableModel):
+    """ A record_table.Table for a QTableView.  The model only holds the row
+    numbers currently shown, sorting and filtering reorder those.
+    """
+
+    def __init__(self, parent=None):
+        """ Initialise the model. """
+
+        super().__init__(parent)
+        self.table = Table([])
+        self._rows = []
+        self._filter = ''
+        self._sort = None  # (column, reverse) of the last sort, kept when the filter changes
+
+    def set_table(self, table):
+        self.beginResetModel()
+        self.table = table
+        self._filter = ''
+        self._sort = None
+        self._rows = list(range(len(table)))
+        self.endResetModel()
+
+    def set_filter(self, text):
+        self.layoutAboutToBeChanged.emit()
+        self._filter = text
+        self._rows = self.table.filter(text)
+        if self._sort is not None:
+            self._rows = self.table.sort(self._rows, *self._sort)
+        self.layoutChanged.emit()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.table.names)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            value = self.table.value(self._rows[index.row()], index.column())
+            return '' if value is None else str(value)
+        if role == Qt.TextAlignmentRole and self.table.kinds[index.column()] == INT:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.table.names[section]
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column < 0 or column >= len(self.table.names):
+            return
+        self.layoutAboutToBeChanged.emit()
+        self._sort = (column, order == Qt.DescendingOrder)
+        self._rows = self.table.sort(self._rows, *self._sort)
+        self.layoutChanged.emit()
+
+
+class RecordView(QWidget):
+    """ A filter box over a sortable table of parsed records. """
+
+    def __init__(self, parent=None):
+        """ Initialise the view. """
+
+        super().__init__(parent)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.filter = QLineEdit(placeholderText='Filter, or column:text like interface:gi0/1')
+        layout.addWidget(self.filter)
+        self.model = RecordModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setDefaultSectionSize(20)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        layout.addWidget(self.table)
+        self.count = QLabel()
+        layout.addWidget(self.count)
+        self.setLayout(layout)
+
+        self._filter_timer = QTimer(self, singleShot=True, interval=FILTER_DELAY, timeout=self._apply_filter)
+        self.filter.textChanged.connect(self._filter_timer.start)
+
+    def set_table(self, table):
+        self.filter.blockSignals(True)
+        self.filter.clear()
+        self.filter.blockSignals(False)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.model.set_table(table)
+        self.table.resizeColumnsToContents()
+        self._show_count()
+
+    def _apply_filter(self):
+        self.model.set_filter(self.filter.text())
+        self._show_count()
+
+    def _show_count(self):
+        self.count.setText(f'{self.model.rowCount()} of {len(self.model.table)} records')
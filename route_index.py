@@ -0,0 +1,127 @@
+import command_cache
+import device_ops
+import show_parsers
+import threading
+from datetime import datetime
+from session_pool import session_key
+from socket import inet_aton
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''"Which route would this IP hit?" answered on the workstation.  show ip route is parsed once per device and
+kept as one hash table per prefix length, a lookup tries the longest length first so it costs at most 33 dict
+lookups however big the routing table is.  No Qt in here.'''
+
+_indexes = {}  # session_key(device) -> RouteIndex
+_lock = threading.Lock()
+
+
+def address_number(address):
+    """ An IPv4 address as an int, ValueError if it isn't one. """
+
+    try:
+        return int.from_bytes(inet_aton(address.strip()), 'big')
+    except OSError:
+        raise ValueError(f'{address} is not an IPv4 address.')
+
+
+class RouteIndex:
+    """ Longest prefix match over a parsed routing table. """
+
+    def __init__(self, table, built=None):
+        """ Index a show_parsers.parse_routes table. """
+
+        self.table = table
+        self.built = built or datetime.now()
+        self._by_length = {}  # prefix length -> {network number: code of the prefix in the table}
+        self._codes = codes = table.data[table.column('prefix')]
+        self._first = dict(zip(reversed(codes), range(len(codes) - 1, -1, -1)))  # code -> first row with it
+        for code, prefix in enumerate(table.values[table.column('prefix')]):  # each prefix is only stored once
+            network, _, length = prefix.partition('/')
+            length = int(length or 32)
+            try:
+                number = int.from_bytes(inet_aton(network), 'big')
+            except OSError:
+                continue
+            self._by_length.setdefault(length, {})[number & (0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF] = code
+        self._lengths = sorted(self._by_length, reverse=True)
+
+    def __len__(self):
+        return len(self.table)
+
+    def lookup(self, address):
+        """ The records of the longest prefix containing address, one per path, or [] if nothing matches. """
+
+        number = address_number(address)
+        for length in self._lengths:
+            code = self._by_length[length].get(number & (0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF)
+            if code is not None:
+                row = self._first[code]
+                records = []
+                while row < len(self._codes) and self._codes[row] == code:  # equal cost paths follow each other
+                    records.append(self.table.record(row))
+                    row += 1
+                return records
+        return []
+
+    def age(self):
+        """ Seconds since the routing table was pulled. """
+
+        return (datetime.now() - self.built).total_seconds()
+
+
+def cached(device):
+    """ The device's route index, or None if there isn't one yet. """
+
+    with _lock:
+        return _indexes.get(session_key(device))
+
+
+def store(device, table, built=None):
+    """ Index a routing table already pulled from the device, like the one from the Routes button.  built is
+    when it was pulled if that wasn't just now, so the index doesn't look fresher than the output it came from.
+    """
+
+    index = RouteIndex(table, built)
+    with _lock:
+        _indexes[session_key(device)] = index
+    return index
+
+
+def refresh(device):
+    """ Pull show ip route from the device and index it. """
+
+    return store(device, show_parsers.parse_routes(device_ops.run_command(device, 'show ip route')))
+
+
+def forget(device):
+    with _lock:
+        _indexes.pop(session_key(device), None)
+
+
+command_cache.cache.listeners.append(forget)  # a load or zeroize may have changed the routes
+
+
+def describe(address, records):
+    """ The answer to a lookup as lines for the operator. """
+
+    if not records:
+        return [f'{address} has no route, not even a default.']
+    lines = []
+    for record in records:
+        distance = '' if record['distance'] is None else f" [{record['distance']}/{record['metric']}]"
+        via = f"via {record['next hop']} " if record['next hop'] else 'directly connected '
+        lines.append(f"{address} -> {record['prefix']} ({record['code']}){distance} {via}"
+                     f"{record['interface']}".rstrip())
+    return lines
+
+
+def describe_age(index):
+    seconds = int(index.age())
+    old = f'{seconds} s' if seconds < 120 else f'{seconds // 60} min'
+    return f"{len(index)} routes pulled at {index.built.strftime('%H:%M:%S')}, {old} ago."
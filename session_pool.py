@@ -0,0 +1,153 @@
+import device_errors
+import threading
+import tracing
+from contextlib import contextmanager
+from inventory import device_name
+from time import monotonic, sleep
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+IDLE_TIMEOUT = 240  # seconds a session may sit unused before it is closed, below the IOS exec-timeout
+CHECK_AFTER = 10  # seconds unused after which the prompt is checked before the session is handed out
+
+
+def session_key(device):
+    """ Device dicts aren't hashable, this is. """
+
+    return tuple(sorted((key, repr(value)) for key, value in device.items()))
+
+
+def connect(device):
+    """ Open a connection and get it to enable mode.  Its connect, login,
+    prompt, enable, command and disconnect times go to tracing.default_tracer.
+    """
+
+    from netmiko import ssh_dispatcher  # netmiko is slow to import, don't pay for it until the first connection
+    from latency_profile import profiles  # it imports this module
+    connection_class = tracing.traced(ssh_dispatcher(device['device_type']), device_name(device))
+    try:
+        router = connection_class(**dict(device, **profiles.connect_settings(device)))  # Connect to the Device
+    except device_errors.NetMikoTimeoutException:
+        profiles.timed_out(device)  # give it longer next time
+        raise
+    if device['device_type'] == 'cisco_ios_serial' and '(config' in router.find_prompt():  # a console may be
+        router.exit_config_mode()  # left there, netmiko's check_config_mode waits for a '#' a '>' login never prints
+    router.enable()
+    return router
+
+
+class _Session:
+    def __init__(self):
+        self.router = None
+        self.lock = threading.Lock()  # netmiko connections can only be used by one thread at a time
+        self.last_used = 0.0
+
+
+class SessionPool:
+    """ Keeps one logged in, enabled connection per device so the tabs don't
+    pay for the login and enable on every button press.  A session that has
+    been idle a while is checked with find_prompt before it is handed out and
+    reconnected if the socket has died, and sessions idle for longer than
+    idle_timeout are closed in the background.
+    """
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, check_after=CHECK_AFTER, connect=connect):
+        """ Initialise the pool. """
+
+        self.idle_timeout = idle_timeout
+        self.check_after = check_after
+        self._connect = connect
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    @contextmanager
+    def session(self, device):
+        """ Use the device's session, connecting if needed.  Only one thread
+        uses a session at a time.  If anything goes wrong while it is in use
+        the session is closed, the next user gets a fresh connection.
+        """
+
+        entry = self._entry(device)
+        with entry.lock:
+            router = self._checkout(entry, device)
+            try:
+                yield router
+            except Exception:
+                self._drop(entry)
+                raise
+            entry.last_used = monotonic()
+
+    def open(self, device):
+        """ A connection of its own, outside the pool, for work that needs
+        several sessions to one device at once.  The caller disconnects it.
+        """
+
+        return self._connect(device)
+
+    def close(self, device):
+        """ Close the device's session, for example before it reloads or to
+        free up a COM port.
+        """
+
+        with self._lock:
+            entry = self._sessions.pop(session_key(device), None)
+        if entry is not None:
+            with entry.lock:
+                self._drop(entry)
+
+    def close_all(self):
+        with self._lock:
+            entries = list(self._sessions.values())
+            self._sessions = {}
+        for entry in entries:
+            with entry.lock:
+                self._drop(entry)
+
+    def _entry(self, device):
+        with self._lock:
+            entry = self._sessions.setdefault(session_key(device), _Session())
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap, daemon=True)
+                self._reaper.start()
+            return entry
+
+    def _checkout(self, entry, device):
+        if entry.router is not None and monotonic() - entry.last_used > self.check_after:
+            try:
+                entry.router.find_prompt()  # health check
+            except Exception:
+                self._drop(entry)  # dead socket, reconnect below
+        if entry.router is None:
+            entry.router = self._connect(device)
+        return entry.router
+
+    @staticmethod
+    def _drop(entry):
+        router, entry.router = entry.router, None
+        if router is not None:
+            try:
+                router.disconnect()
+            except Exception:
+                pass  # it's already gone
+
+    def _reap(self):
+        while True:
+            sleep(min(self.idle_timeout / 4, 30))
+            with self._lock:
+                entries = list(self._sessions.values())
+            for entry in entries:
+                if entry.lock.acquire(blocking=False):  # skip sessions that are in use
+                    try:
+                        if entry.router is not None and monotonic() - entry.last_used > self.idle_timeout:
+                            self._drop(entry)
+                    finally:
+                        entry.lock.release()
+
+
+pool = SessionPool()  # shared by every tab
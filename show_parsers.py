@@ -0,0 +1,95 @@
+import re
+from record_table import INT, IP, STR, Table
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Turns the output of the Troubleshoot commands into tables of typed records.  One regex per line, so a
+900k line routing table is parsed once on the worker thread instead of read by eye.  No Qt in here.'''
+
+_VIA = r'\[(\d+)/(\d+)\] via (\d+\.\d+\.\d+\.\d+)(?:, (\d[\d:wdhm]*))?(?:, ([A-Za-z]\S*))?'  # age, interface
+_CODE_PREFIX = r'^([A-Za-z][*+%]?(?: [A-Z]{1,2}\d?)?)\s+(\d+\.\d+\.\d+\.\d+)(/\d+)?'
+_ROUTE = re.compile(_CODE_PREFIX + r'\s+(?:' + _VIA + r'|is directly connected, (\S+))')
+_ROUTE_WRAPPED = re.compile(_CODE_PREFIX + r'\s*$')  # a long route, its path is on the next line
+_ROUTE_MORE = re.compile(r'^\s+' + _VIA)  # another path to the same prefix, or a wrapped route's first
+_SUBNETTED = re.compile(r'^\s+\d+\.\d+\.\d+\.\d+(/\d+) is subnetted')
+_INTERFACE = re.compile(r'^(\S+)\s+(\S+)\s+(YES|NO)\s+(\S+)\s+(.+?)\s+(up|down)\s*$')
+_OSPF = re.compile(r'^(\d+\.\d+\.\d+\.\d+)\s+(\d+)\s+(\S+/\s*\S+)\s+(\S+)\s+(\d+\.\d+\.\d+\.\d+)\s+(\S+)')
+_EIGRP = re.compile(r'^(\d+)\s+(\d+\.\d+\.\d+\.\d+)\s+(\S+)\s+(\d+)\s+(\S+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)')
+_IKEV2 = re.compile(r'^(\d+)\s+(\S+?)/\d+\s+(\S+?)/\d+\s+(\S+)/(\S+)\s+(\S+)')
+
+ROUTE_COLUMNS = [('code', STR), ('prefix', IP), ('distance', INT), ('metric', INT), ('next hop', IP),
+                 ('age', STR), ('interface', STR)]
+
+
+def parse_routes(output):
+    rows = []
+    mask = ''  # the length from a 'x.x.x.x/24 is subnetted' line, older IOS leaves it off the routes
+    last = None  # code and prefix of the last route, for the extra paths of an equal cost route
+    route, wrapped, route_more, subnetted = _ROUTE.match, _ROUTE_WRAPPED.match, _ROUTE_MORE.match, _SUBNETTED.match
+    for line in output.splitlines():
+        match = route(line)
+        if match:
+            code, prefix, length, distance, metric, next_hop, age, interface, connected = match.groups()
+            last = (code, prefix + (length or mask))
+            if connected is not None:
+                rows.append(last + (None, None, '', '', connected))
+            else:
+                rows.append(last + (distance, metric, next_hop, age, interface))
+            continue
+        match = wrapped(line)
+        if match:  # the [distance/metric] via line that follows belongs to this prefix, not the one before
+            code, prefix, length = match.groups()
+            last = (code, prefix + (length or mask))
+            continue
+        match = route_more(line)
+        if match and last is not None:
+            rows.append(last + match.groups())
+            continue
+        match = subnetted(line)
+        if match:
+            mask = match.group(1)
+        elif line and not line[0].isspace():
+            mask = ''  # a new classful network
+    return Table.from_rows(ROUTE_COLUMNS, rows)
+
+
+def _simple(columns, pattern):
+    """ A parser for output with one record per matching line. """
+
+    def parse(output):
+        return Table.from_rows(columns, [match.groups() for match in map(pattern.match, output.splitlines()) if match])
+    return parse
+
+
+parse_interfaces = _simple([('interface', STR), ('address', IP), ('ok', STR), ('method', STR), ('status', STR),
+                            ('protocol', STR)], _INTERFACE)
+parse_ospf = _simple([('neighbor id', IP), ('priority', INT), ('state', STR), ('dead time', STR),
+                      ('address', IP), ('interface', STR)], _OSPF)
+parse_eigrp = _simple([('h', INT), ('address', IP), ('interface', STR), ('hold', INT), ('uptime', STR),
+                       ('srtt', INT), ('rto', INT), ('q', INT), ('seq', INT)], _EIGRP)
+parse_ikev2 = _simple([('tunnel id', INT), ('local', IP), ('remote', IP), ('fvrf', STR), ('ivrf', STR),
+                       ('status', STR)], _IKEV2)
+
+PARSERS = {
+    'show ip route': parse_routes,
+    'show ip interface brief': parse_interfaces,
+    'show ip ospf neigh': parse_ospf,
+    'show ip ospf neighbor': parse_ospf,
+    'show ip eigrp neigh': parse_eigrp,
+    'show ip eigrp neighbors': parse_eigrp,
+    'show crypto ikev2 sa': parse_ikev2,
+}
+
+
+def parse(command, output):
+    """ The output of a command as a Table, or None if there is no parser for it. """
+
+    parser = PARSERS.get(' '.join(command.split()))
+    if parser is None:
+        return None
+    return parser(output)
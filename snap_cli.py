@@ -0,0 +1,281 @@
+import argparse
+import async_ops
+import backup_archive
+import config_check
+import config_template
+import device_ops
+import device_store
+import fleet
+import fleet_audit
+import getpass
+import json
+import messages
+import os
+import sys
+import threading
+import tracing
+from datetime import datetime
+from time import monotonic, sleep
+from inventory import DEVICE_TYPES, build_device, device_name, load_inventory
+from session_pool import pool
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''SNAP without the window, for cron, jump hosts without X and pipelines.  Never imports PyQt5.
+Everything is written to stdout as JSON lines, one object per event:
+  {"device": "10.0.0.1", "event": "message", "kind": "progress", "text": "...connected..."}
+  {"device": "10.0.0.1", "event": "result", "ok": true, "result": "Load Complete"}
+  {"event": "summary", "action": "load", "ok": 3, "failed": 0}
+The password is read from SNAP_PASSWORD, the OS keyring or prompted for, it is never taken on the command line.
+Run with: python snap_cli.py load --inventory routers.csv --config branch.txt --username admin
+archive pulls configs into the backup archive, on a schedule with --every, and changed reads its index.
+audit logs in to every device and reports auth, IOS version, flash images and round trip, --report saves it.
+--async-io runs SSH and Telnet devices on the asyncio transport, --sessions of them at once on one thread.
+--trace saves the timing of every phase as JSON spans, --metrics-port serves them to Prometheus meanwhile.'''
+
+PASSWORD_VARIABLE = 'SNAP_PASSWORD'
+
+
+class JsonLines:
+    """ Writes events as JSON lines, from any number of worker threads. """
+
+    def __init__(self, stream=sys.stdout):
+        """ Initialise the writer. """
+
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, **event):
+        event['time'] = datetime.now().isoformat(timespec='milliseconds')
+        line = json.dumps(event)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def message(self, name, message):
+        self.write(device=name, event='message', kind=messages.kind_of(message), text=str(message))
+
+    def result(self, name, ok, result):
+        self.write(device=name, event='result', ok=ok, result=str(result))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run SNAP against one device or an inventory without the GUI.')
+    parser.add_argument('action', choices=['verify', 'load', 'backup', 'zeroize', 'command', 'archive', 'changed',
+                                           'audit'])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--inventory', help='CSV with method and host columns, as used by fleet mode')
+    target.add_argument('--device', help='one device as method:host, like ssh:10.0.0.1 or console:COM3')
+    target.add_argument('--store', nargs='?', const=device_store.DEFAULT_PATH,
+                        help=f'devices from the device store ({device_store.DEFAULT_PATH} if no path is given)')
+    parser.add_argument('--site', help='only the --store devices at this site')
+    parser.add_argument('--tag', help='only the --store devices with this tag')
+    parser.add_argument('--username', default=os.environ.get('SNAP_USERNAME'), help='defaults to SNAP_USERNAME')
+    parser.add_argument('--config', help='config file to load')
+    parser.add_argument('--template', help='config template to render for each device instead of --config')
+    parser.add_argument('--vars', help='CSV or YAML of variables for --template, a row per host')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only send lines that differ from the running config')
+    parser.add_argument('--remove', action='store_true',
+                        help='with --incremental, remove lines the config does not have')
+    parser.add_argument('--resume', action='store_true',
+                        help='carry on loads of --config that failed part way, from their checkpoints')
+    parser.add_argument('--command', dest='exec_command', help='exec command to run, for the command action')
+    parser.add_argument('--output-dir', default='.', help='where backups are written')
+    parser.add_argument('--archive-dir', default=backup_archive.DEFAULT_ARCHIVE, help='the backup archive')
+    parser.add_argument('--report', help='audit report to write, JSON if it ends in .json and CSV otherwise')
+    parser.add_argument('--every', type=float, default=0, help='minutes between archive runs, 0 for once')
+    parser.add_argument('--workers', type=int, default=fleet.MAX_WORKERS, help='devices worked on at the same time')
+    parser.add_argument('--async-io', action='store_true',
+                        help='verify, load, backup and command SSH/Telnet devices on the asyncio transport')
+    parser.add_argument('--sessions', type=int, default=async_ops.MAX_SESSIONS,
+                        help='devices in flight at once with --async-io')
+    parser.add_argument('--trace', help='write every connect, auth, command and config span to this JSON file')
+    parser.add_argument('--metrics-port', type=int,
+                        help='serve Prometheus metrics on http://127.0.0.1:port/metrics while running')
+    args = parser.parse_args(argv)
+    if args.action == 'changed':
+        return args
+    if args.inventory is None and args.device is None and args.store is None:
+        parser.error('one of --inventory, --device or --store is required')
+    if (args.site or args.tag) and args.store is None:
+        parser.error('--site and --tag pick devices from --store')
+    if args.username is None:
+        parser.error('--username (or SNAP_USERNAME) is required')
+    if args.action == 'load' and args.config is None and args.template is None:
+        parser.error('load needs --config or --template')
+    if args.template is not None and args.vars is None:
+        parser.error('--template needs --vars')
+    if args.action == 'command' and args.exec_command is None:
+        parser.error('command needs --command')
+    return args
+
+
+def devices_from(args, password):
+    if args.inventory is not None:
+        return load_inventory(args.inventory, args.username, password)
+    if args.store is not None:
+        if args.store != device_store.store.path:  # verify and audit note what they find in this store
+            device_store.store = device_store.DeviceStore(args.store)
+        if not os.path.exists(args.store):
+            raise ValueError(f'--store {args.store}: no such device store, import an inventory into it with '
+                             'Devices on the Router Info tab.')
+        ids = [row[0] for row in device_store.store.search(args.site, args.tag)]
+        if not ids:
+            raise ValueError(f'No devices in {args.store} match.')
+        return device_store.store.devices(ids, args.username, password)
+    method, _, host = args.device.partition(':')
+    if method.lower() not in DEVICE_TYPES or host == '':
+        raise ValueError(f'--device {args.device}: use method:host, like ssh:10.0.0.1 or console:COM3')
+    return [build_device(DEVICE_TYPES[method.lower()], host, args.username, password)]
+
+
+def make_job(args, out, devices):
+    """ The jobs run against each device for the chosen action, the
+    device_ops one and the async_ops coroutine (None if there isn't one).
+    Returns (None, None) if there is nothing to run.
+    """
+
+    if args.action == 'verify':
+        return device_ops.verify, async_ops.verify
+    if args.action == 'zeroize':
+        return device_ops.zeroize, None
+    if args.action == 'command':
+        return (lambda device, emit: device_ops.run_command(device, args.exec_command, emit),
+                lambda device, emit: async_ops.run_command(device, args.exec_command, emit))
+    if args.action == 'backup':
+        today = datetime.now().strftime('%Y%m%d-%H%M')
+
+        def file_name(device):
+            return os.path.join(args.output_dir, f'Backup Config {device_name(device).replace("/", "_")} {today}.txt')
+        return (lambda device, emit: device_ops.backup_config(device, emit, file_name(device)),
+                lambda device, emit: async_ops.backup_config(device, emit, file_name(device)))
+
+    if args.template is not None:
+        return template_job(args, out, devices)
+    with open(args.config, 'r') as file:
+        lines, problems = config_check.check(file.read())
+    for line_no, kind, message in problems:
+        out.write(event='check', line=line_no, kind=kind, text=message)
+    if config_check.errors(problems):
+        return None, None  # fails here rather than on the router
+    config = '\n'.join(lines)
+    return (lambda device, emit: device_ops.load_config(device, config, emit, args.incremental, args.remove,
+                                                        args.resume),
+            lambda device, emit: async_ops.load_config(device, config, emit, args.incremental, args.remove,
+                                                       args.resume))
+
+
+def template_job(args, out, devices):
+    """ make_job for a load of a template, rendered for each device as its
+    load starts.  (None, None) if a device has no row or a row is missing a
+    variable.
+    """
+
+    with open(args.template, 'r') as file:
+        template = config_template.compile_template(file.read())
+    variables = config_template.load_variables(args.vars)
+    problems = variables.problems(template, devices)
+    for problem in problems:
+        out.write(event='check', kind=config_check.ERROR, text=problem)
+    if problems:
+        return None, None
+
+    def config_for(device):
+        return config_template.config_for(template, variables, device)
+    return (lambda device, emit: device_ops.load_config(device, config_for(device), emit, args.incremental,
+                                                        args.remove, args.resume),
+            lambda device, emit: async_ops.load_config(device, config_for(device), emit, args.incremental,
+                                                       args.remove, args.resume))
+
+
+def changed(args, out):
+    for device, when, is_changed in backup_archive.Archive(args.archive_dir).changed():
+        out.write(device=device, event='changed', changed=is_changed, backup=when)
+    return 0
+
+
+def archive(args, out, devices):
+    """ Archive every device, then again every args.every minutes until interrupted. """
+
+    store = backup_archive.Archive(args.archive_dir)
+    while True:
+        started = monotonic()
+        results = backup_archive.archive_fleet(devices, store, out.message, out.result, args.workers)
+        pool.close_all()  # don't hold sessions open between runs
+        failed = sum(1 for ok, _ in results.values() if not ok)
+        out.write(event='summary', action='archive', ok=len(results) - failed, failed=failed)
+        if not args.every:
+            return 1 if failed else 0
+        sleep(max(0, args.every * 60 - (monotonic() - started)))
+
+
+def audit(args, out, devices):
+    """ Audit every device, write a record per device and the report if asked for. """
+
+    try:
+        table = fleet_audit.audit_fleet(devices, out.message, out.result, args.workers, args.async_io, args.sessions)
+    finally:
+        pool.close_all()
+    records = [table.record(row) for row in range(len(table))]
+    for record in records:
+        out.write(event='audit', **record)
+    if args.report:
+        fleet_audit.save(table, args.report)
+    ok = sum(record['auth'] == 'ok' for record in records)
+    out.write(event='summary', action='audit', ok=ok, failed=len(table) - ok)
+    return 0 if ok == len(table) else 1
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    out = JsonLines()
+    if args.metrics_port:
+        tracing.serve(args.metrics_port)
+    try:
+        return run(args, out)
+    finally:
+        if args.trace:
+            with open(args.trace, 'w') as file:
+                file.write(tracing.default_tracer.to_json())
+
+
+def run(args, out):
+    if args.action == 'changed':
+        return changed(args, out)
+    password = os.environ.get(PASSWORD_VARIABLE) or device_store.keyring_password(args.username)
+    if password is None:
+        password = getpass.getpass(stream=sys.stderr)
+    try:
+        devices = devices_from(args, password)
+        if args.action == 'archive':
+            return archive(args, out, devices)
+        if args.action == 'audit':
+            return audit(args, out, devices)
+        job, async_job = make_job(args, out, devices)
+    except (OSError, ValueError, config_template.TemplateError) as e:  # a bad inventory or a missing config file
+        out.write(event='error', text=str(e))
+        return 2
+    if job is None:
+        out.write(event='summary', action=args.action, ok=0, failed=len(devices))
+        return 2
+    try:
+        if args.async_io and async_job is not None:
+            results = async_ops.run_fleet(devices, async_job, job, out.message, out.result, args.sessions,
+                                          device_ops.describe_error)
+        else:
+            results = fleet.run_fleet(devices, job, out.message, out.result, args.workers, device_ops.describe_error)
+    finally:
+        pool.close_all()
+    failed = sum(1 for ok, _ in results.values() if not ok)
+    out.write(event='summary', action=args.action, ok=len(results) - failed, failed=failed)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
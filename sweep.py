@@ -0,0 +1,181 @@
+import ipaddress
+import re
+import threading
+from record_table import INT, IP, STR, Table
+from session_pool import pool
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Ping or traceroute a list of targets from the router, several at once.  IOS runs one command per session, so
+the targets are shared out over a few vty sessions and the sweep takes about as long as its slowest targets
+instead of all of them added up.  No Qt in here.'''
+
+MAX_TARGETS = 256  # a /24, anything bigger is more likely a typo than a sweep
+SESSIONS = 4  # sessions a sweep runs over at once, IOS has 5 vty lines by default and SNAP may hold one already
+PING_REPEAT = 3  # echos per target, fewer than the IOS default of 5 so a dead target costs 3 s rather than 10
+PING_TIMEOUT = 1  # seconds
+TRACE_PROBES = 1
+TRACE_TIMEOUT = 1  # seconds
+MAX_HOPS = 15
+
+_SEPARATORS = re.compile(r'[\s,;]+')
+_NAME = re.compile(r'^[\w.:-]+$')
+_SUCCESS = re.compile(r'Success rate is (\d+) percent \((\d+)/(\d+)\)'
+                      r'(?:, round-trip min/avg/max = (\d+)/(\d+)/(\d+) ms)?')
+_HOP = re.compile(r'^\s*(\d+)\s+(\S.*)$')
+_ADDRESS = re.compile(r'\d+\.\d+\.\d+\.\d+')
+_MSEC = re.compile(r'(\d+) msec')
+
+PING_COLUMNS = [('target', IP), ('result', STR), ('success %', INT), ('received', INT), ('sent', INT),
+                ('min ms', INT), ('avg ms', INT), ('max ms', INT)]
+TRACEROUTE_COLUMNS = [('target', IP), ('result', STR), ('hops', INT), ('last hop', IP), ('rtt ms', INT)]
+
+
+def is_sweep(text):
+    """ True if text is more than one target, or a prefix. """
+
+    return '/' in text or len(_SEPARATORS.split(text.strip())) > 1
+
+
+def targets(text):
+    """ The targets in a list like '10.0.0.1, 10.0.0.5 10.0.1.0/28', a
+    prefix meaning every host in it.  ValueError if something in the list
+    isn't an address, prefix or hostname.
+    """
+
+    found = []
+    for item in _SEPARATORS.split(text.strip()):
+        if not item:
+            continue
+        if '/' in item:
+            try:
+                network = ipaddress.ip_network(item, strict=False)
+            except ValueError:
+                raise ValueError(f'{item} is not a prefix.')
+            if network.num_addresses > MAX_TARGETS + 2:
+                raise ValueError(f'{item} is more than {MAX_TARGETS} targets.')
+            found += [str(host) for host in network.hosts()] or [str(network.network_address)]
+        elif _NAME.match(item):
+            found.append(item)
+        else:
+            raise ValueError(f'{item} is not an address or hostname.')
+    found = list(dict.fromkeys(found))  # each target once
+    if len(found) > MAX_TARGETS:
+        raise ValueError(f'{len(found)} targets, a sweep can have at most {MAX_TARGETS}.')
+    return found
+
+
+def ping_command(target):
+    return f'ping {target} repeat {PING_REPEAT} timeout {PING_TIMEOUT}'
+
+
+def traceroute_command(target):
+    return f'traceroute {target} timeout {TRACE_TIMEOUT} probe {TRACE_PROBES} ttl 1 {MAX_HOPS}'
+
+
+def parse_ping(output, target):
+    """ (result, success %, received, sent, min, avg, max) from ping output. """
+
+    match = _SUCCESS.search(output)
+    if match is None:
+        return ('no answer', None, None, None, None, None, None)
+    success = int(match.group(1))
+    result = 'reachable' if success == 100 else 'partial' if success else 'unreachable'
+    return (result,) + match.groups()
+
+
+def parse_traceroute(output, target):
+    """ (result, hops, last hop that answered, its rtt) from traceroute output. """
+
+    hops, last_hop, last_line, rtt = 0, '', '', None
+    for line in output.splitlines():
+        match = _HOP.match(line)
+        if match is None or ('msec' not in line and '*' not in line):
+            continue
+        hops = int(match.group(1))
+        address = _ADDRESS.search(match.group(2))
+        times = _MSEC.findall(match.group(2))
+        if address and times:
+            last_hop, last_line, rtt = address.group(), line, min(map(int, times))
+    if not hops:
+        return ('no answer', None, '', None)
+    reached = last_hop == target or target in last_line.split()  # a hostname shows as 'name (address)'
+    return ('reached' if reached else 'not reached', hops, last_hop, rtt)
+
+
+KINDS = {  # kind -> (command for a target, parser, table columns)
+    'ping': (ping_command, parse_ping, PING_COLUMNS),
+    'traceroute': (traceroute_command, parse_traceroute, TRACEROUTE_COLUMNS),
+}
+
+
+def sweep(device, targets, kind='ping', emit=None, cancelled=None, sessions=SESSIONS):
+    """ Ping or traceroute every target from the device, up to sessions of
+    them at once.  The first session is the device's pooled one, the others
+    are opened for the sweep and closed after it, over a console there is
+    only ever the one.  Returns a Table with a record per target in the
+    order given; a target that was never run because the sweep was
+    cancelled or its session failed says so in the result column.
+    """
+
+    command, parse, columns = KINDS[kind]
+    if device['device_type'] == 'cisco_ios_serial':
+        sessions = 1  # a console port is one session
+    sessions = max(1, min(sessions, len(targets)))
+    rows = [None] * len(targets)
+    pending = iter(enumerate(targets))
+    lock = threading.Lock()
+    errors = []
+
+    def work(router):  # each session takes the next target as soon as it is free
+        while True:
+            with lock:
+                item = None if cancelled is not None and cancelled() else next(pending, None)
+            if item is None:
+                return
+            number, target = item
+            rows[number] = (target,) + parse(router.send_command(command(target)), target)
+            if emit is not None:
+                emit(f'{target}: {rows[number][1]}')
+
+    def pooled():
+        with pool.session(device) as router:
+            work(router)
+
+    def own():
+        router = pool.open(device)
+        try:
+            work(router)
+        finally:
+            router.disconnect()
+
+    def run(job):
+        try:
+            job()
+        except Exception as e:  # the other sessions carry on with the remaining targets
+            errors.append(e)
+
+    workers = [threading.Thread(target=run, args=(pooled if number == 0 else own,), daemon=True)
+               for number in range(sessions)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors and not any(rows):
+        raise errors[0]
+    missing = (None,) * (len(columns) - 2)
+    return Table.from_rows(columns, [row or (target, 'not run') + missing for target, row in zip(targets, rows)])
+
+
+def summary(table, seconds):
+    """ One line about a finished sweep, like '12 targets in 3.1 s: 11 reachable, 1 unreachable.' """
+
+    results = table.data[table.column('result')]
+    values = table.values[table.column('result')]
+    counts = ', '.join(f'{results.count(code)} {value}' for code, value in enumerate(values))
+    return f'{len(table)} targets in {seconds:.1f} s: {counts}.'
@@ -0,0 +1,114 @@
+import config_check
+from config_check import DUPLICATE, ERROR, STRIPPED
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''config_check.check on configs with nested sections, checked line for line.'''
+
+
+def kinds(problems):
+    return [(line_no, kind) for line_no, kind, _ in problems]
+
+
+def test_address_families_keep_their_own_neighbors():
+    text = '''router bgp 65000
+ address-family ipv4
+  neighbor 10.0.0.1 activate
+  neighbor 10.0.0.1 activate
+ exit-address-family
+ address-family vpnv4
+  neighbor 10.0.0.1 activate
+  neighbor 10.0.0.1 send-community extended
+ exit-address-family'''
+    lines, problems = config_check.check(text)
+    assert lines == ['router bgp 65000',
+                     ' address-family ipv4',
+                     '  neighbor 10.0.0.1 activate',
+                     '',
+                     ' exit-address-family',
+                     ' address-family vpnv4',
+                     '  neighbor 10.0.0.1 activate',
+                     '  neighbor 10.0.0.1 send-community extended',
+                     ' exit-address-family']
+    assert kinds(problems) == [(4, DUPLICATE)]
+
+
+def test_policy_map_classes_keep_their_own_actions():
+    text = '''policy-map QOS
+ class VOICE
+  priority percent 20
+  set dscp ef
+ class VIDEO
+  set dscp ef
+ class VOICE
+  set dscp ef
+!'''
+    lines, problems = config_check.check(text)
+    assert lines == ['policy-map QOS',
+                     ' class VOICE',
+                     '  priority percent 20',
+                     '  set dscp ef',
+                     ' class VIDEO',
+                     '  set dscp ef',
+                     ' class VOICE',  # a header that comes back is kept for what is under it
+                     '',
+                     '!']
+    assert kinds(problems) == [(8, DUPLICATE)]
+
+
+def test_acl_remarks_are_kept_where_they_are():
+    text = '''ip access-list extended EDGE
+ remark web
+ permit tcp any any eq 80
+ remark web
+ permit tcp any any eq 443
+ permit tcp any any eq 443
+access-list 10 remark mgmt
+access-list 10 permit 10.0.0.0 0.0.0.255
+access-list 10 remark mgmt
+access-list 10 permit 10.0.0.0 0.0.0.255'''
+    lines, problems = config_check.check(text)
+    assert lines == ['ip access-list extended EDGE',
+                     ' remark web',
+                     ' permit tcp any any eq 80',
+                     ' remark web',
+                     ' permit tcp any any eq 443',
+                     '',
+                     'access-list 10 remark mgmt',
+                     'access-list 10 permit 10.0.0.0 0.0.0.255',
+                     'access-list 10 remark mgmt',
+                     '']
+    assert kinds(problems) == [(6, DUPLICATE), (10, DUPLICATE)]
+
+
+def test_preamble_is_blanked_so_line_numbers_match_the_file():
+    text = '''enable
+conf t
+hostname R1
+interface Gi0/1
+ shutdown
+end'''
+    lines, problems = config_check.check(text)
+    assert lines == ['', '', 'hostname R1', 'interface Gi0/1', ' shutdown', '']
+    assert kinds(problems) == [(1, STRIPPED), (2, STRIPPED), (6, STRIPPED)]
+
+
+def test_banner_text_is_left_alone():
+    text = '''banner motd ^C
+hostname R1
+hostname R1
+^C
+hostname R1'''
+    lines, problems = config_check.check(text)
+    assert lines == text.splitlines()
+    assert problems == []
+
+
+def test_errors_stop_the_load():
+    lines, problems = config_check.check('hostname R1\nwr\nbanner motd ^\nnever closed')
+    assert kinds(config_check.errors(problems)) == [(2, ERROR), (3, ERROR)]
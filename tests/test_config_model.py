@@ -0,0 +1,69 @@
+import config_model
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''config_model.diff, what an incremental load sends.'''
+
+RUNNING = '''Building configuration...
+
+Current configuration : 1024 bytes
+!
+version 15.4
+hostname R1
+!
+interface GigabitEthernet0/1
+ description uplink
+ ip address 10.0.0.1 255.255.255.0
+ shutdown
+!
+router ospf 1
+ network 10.0.0.0 0.0.0.255 area 0
+!
+ip domain-lookup
+end'''
+
+
+def test_matching_configs_need_nothing():
+    assert config_model.diff(RUNNING, RUNNING) == []
+
+
+def test_only_changed_lines_are_sent_under_their_header():
+    intended = RUNNING.replace(' description uplink', ' description core').replace(
+        'router ospf 1\n', 'router ospf 1\n passive-interface default\n')
+    assert config_model.diff(RUNNING, intended) == ['interface GigabitEthernet0/1',
+                                                   ' description core',
+                                                   'router ospf 1',
+                                                   ' passive-interface default']
+
+
+def test_new_sections_are_sent_whole():
+    intended = RUNNING + '\ninterface Loopback0\n ip address 1.1.1.1 255.255.255.255'
+    assert config_model.diff(RUNNING, intended) == ['interface Loopback0', ' ip address 1.1.1.1 255.255.255.255']
+
+
+def test_remove_takes_out_extras_first():
+    intended = RUNNING.replace(' shutdown\n', '').replace('ip domain-lookup\n', 'ip domain-name lab\n')
+    assert config_model.diff(RUNNING, intended) == ['ip domain-name lab']  # extras stay unless asked
+    assert config_model.diff(RUNNING, intended, remove=True) == ['no ip domain-lookup',
+                                                                 'interface GigabitEthernet0/1',
+                                                                 ' no shutdown',
+                                                                 'ip domain-name lab']
+
+
+def test_headers_are_never_removed():
+    intended = 'version 15.4\nhostname R2'
+    assert config_model.diff(RUNNING, intended, remove=True) == ['no router ospf 1', 'no ip domain-lookup',
+                                                                 'hostname R2']
+
+
+def test_banner_delimiters_typed_or_from_show_run_match():
+    running = 'banner exec ^CAuthorised use only^C\nbanner motd ^C\nMaintenance tonight\n^C'
+    intended = 'banner exec ^Authorised use only^\nbanner motd ^\nMaintenance tonight\n^'
+    assert config_model.diff(running, intended, remove=True) == []
+    changed = intended.replace('tonight', 'tomorrow')
+    assert config_model.diff(running, changed, remove=True) == ['banner motd ^', 'Maintenance tomorrow', '^']
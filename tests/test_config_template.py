@@ -0,0 +1,32 @@
+import pytest
+from config_template import TemplateError, Variables, compile_template, config_for
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Templates render per device, and a device that can't be rendered says which device it is.'''
+
+DEVICE = {'device_type': 'cisco_ios', 'ip': '10.0.0.1'}
+
+
+def test_placeholders_render():
+    variables = Variables([{'host': '10.0.0.1', 'name': 'R1'}])
+    assert config_for(compile_template('hostname {{ name }}\n'), variables, DEVICE) == 'hostname R1'
+
+
+def test_a_device_has_one_row():
+    with pytest.raises(TemplateError, match=r'vars.csv row 3: 10.0.0.1 is already in row 1'):
+        Variables([{'host': '10.0.0.1'}, {'host': '10.0.0.2'}, {'host': '10.0.0.1'}], 'vars.csv')
+    assert len(Variables([{'host': '10.0.0.1'}, {'host': '10.0.0.1', 'port': '2323'}])) == 2
+
+
+def test_jinja_errors_name_the_device():
+    pytest.importorskip('jinja2')
+    template = compile_template('hostname {{ site.name }}\n{% if vlan %}vlan {{ vlan }}{% endif %}\n')
+    variables = Variables([{'host': '10.0.0.1', 'site': {}, 'vlan': 10}])
+    with pytest.raises(TemplateError, match=r'^10.0.0.1: '):
+        config_for(template, variables, DEVICE)
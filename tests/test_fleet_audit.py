@@ -0,0 +1,30 @@
+import fleet_audit
+from device_ops import get_version_cisco
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''The IOS version check on verify and audit, including devices that don't say which version they run.'''
+
+DEVICE = {'device_type': 'cisco_ios', 'ip': '10.0.0.1'}
+
+
+def test_version_numbers():
+    assert get_version_cisco('version 15.2\n') == 15.2
+    assert get_version_cisco('version 16.9.4\n') == 16.9
+
+
+def test_no_version_is_unknown_not_an_error():
+    assert get_version_cisco('') is None
+    assert get_version_cisco('version unknown\n') is None
+
+
+def test_audit_row_for_a_device_without_a_version():
+    row = fleet_audit.record(DEVICE, 'ok', '', 'flash:c2900.bin')
+    assert row[3:5] == ('', '')
+    assert fleet_audit.describe(row).startswith('IOS version unknown, 1 image')
+    assert fleet_audit.record(DEVICE, 'ok', 'version 12.4\n')[3:5] == ('12.4', 'no')
@@ -0,0 +1,35 @@
+import pytest
+from inventory import build_device, load_inventory, repeated
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Inventories list each device once, fleet runs report each under its name.'''
+
+
+def test_inventory_loads_in_order(tmp_path):
+    path = tmp_path / 'routers.csv'
+    path.write_text('method,host,port\nssh,10.0.0.1,\ntelnet,10.0.0.1,2323\nconsole,COM3,\n')
+    devices = load_inventory(str(path), 'admin', 'secret')
+    assert [device['device_type'] for device in devices] == ['cisco_ios', 'cisco_ios_telnet', 'cisco_ios_serial']
+    assert devices[1]['port'] == 2323
+
+
+def test_a_host_twice_is_rejected_with_both_lines(tmp_path):
+    path = tmp_path / 'routers.csv'
+    path.write_text('method,host\nssh,10.0.0.1\nssh,10.0.0.2\ntelnet,10.0.0.1\n')
+    with pytest.raises(ValueError, match=r'line 4: 10\.0\.0\.1 is already on line 2'):
+        load_inventory(str(path), 'admin', 'secret')
+
+
+def test_repeated_names():
+    devices = [build_device('cisco_ios', '10.0.0.1', 'admin', 'secret'),
+               build_device('cisco_ios_telnet', '10.0.0.1', 'admin', 'secret'),
+               build_device('cisco_ios', '10.0.0.1:2222', 'admin', 'secret'),
+               build_device('cisco_ios', '10.0.0.1', 'admin', 'secret')]
+    assert repeated(devices) == ['10.0.0.1']
+    assert repeated(devices[1:3]) == []
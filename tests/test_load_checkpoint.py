@@ -0,0 +1,69 @@
+from load_checkpoint import Checkpoints, resume_line
+from load_engine import split_chunks
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Where a resumed load carries on from, and the chunks it sends from there.'''
+
+LINES = ['hostname R1',                  # 1
+         'interface Gi0/1',              # 2
+         ' description uplink',          # 3
+         ' no shutdown',                 # 4
+         '',                             # 5
+         'banner motd ^C',               # 6
+         'first line',                   # 7
+         '',                             # 8
+         '^C',                           # 9
+         'router ospf 1',                # 10
+         ' network 10.0.0.0 0.0.0.255 area 0']  # 11
+
+
+def test_resume_at_the_next_top_level_line():
+    assert resume_line(LINES, 0) == 0
+    assert resume_line(LINES, 1) == 1
+    assert resume_line(LINES, 9) == 9
+
+
+def test_resume_sends_a_cut_off_section_again_whole():
+    assert resume_line(LINES, 2) == 1
+    assert resume_line(LINES, 3) == 1
+    assert resume_line(LINES, 10) == 9
+
+
+def test_resume_skips_back_over_blank_lines():
+    assert resume_line(LINES, 4) == 1  # the blank line after the interface could be a line config_check took out
+
+
+def test_resume_after_the_end():
+    assert resume_line(LINES, 11) == 11
+    assert resume_line(LINES, 50) == 11
+
+
+def test_chunks_number_lines_from_the_top():
+    assert list(split_chunks(LINES, 3)) == [(1, 3, LINES[0:3]),
+                                            (4, 9, [' no shutdown', 'banner motd ^C', 'first line', '', '^C']),
+                                            (10, 11, LINES[9:11])]
+
+
+def test_chunks_from_a_start_index():
+    assert list(split_chunks(LINES, 3, start=9)) == [(10, 11, LINES[9:11])]
+    assert list(split_chunks(LINES, 2, start=resume_line(LINES, 3))) == [
+        (2, 3, LINES[1:3]), (4, 9, [' no shutdown', 'banner motd ^C', 'first line', '', '^C']),
+        (10, 11, LINES[9:11])]
+    assert list(split_chunks(LINES, 3, start=len(LINES))) == []
+
+
+def test_no_checkpoint_until_a_chunk_is_confirmed(tmp_path):
+    device = {'device_type': 'cisco_ios_telnet', 'ip': '10.1.1.1'}
+    checkpoints = Checkpoints(str(tmp_path))
+    first, confirmed = checkpoints.start(device, LINES, False, lambda message: None)
+    assert first == 0
+    assert checkpoints.get(device) is None  # a load that can't connect leaves nothing to resume
+    confirmed(4)
+    assert checkpoints.unfinished(device, '\n'.join(LINES))['confirmed'] == 4
+    assert checkpoints.start(device, LINES, True, lambda message: None)[0] == 1
@@ -0,0 +1,55 @@
+import route_index
+import show_parsers
+from datetime import datetime, timedelta
+from route_index import RouteIndex
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''show ip route parsed into a table, and the route index built from it.'''
+
+ROUTES = '''Codes: L - local, C - connected, S - static, R - RIP, M - mobile, B - BGP
+Gateway of last resort is 10.1.1.254 to network 0.0.0.0
+
+S*    0.0.0.0/0 [1/0] via 10.1.1.254
+      10.0.0.0/8 is variably subnetted, 2 subnets, 2 masks
+C        10.1.1.0/24 is directly connected, GigabitEthernet0/1
+L        10.1.1.1/32 is directly connected, GigabitEthernet0/1
+O E2     192.168.100.0/24 
+           [110/20] via 10.1.1.2, 00:01:02, GigabitEthernet0/1
+           [110/20] via 10.1.1.3, 00:01:02, GigabitEthernet0/1
+      172.16.0.0/24 is subnetted, 1 subnets
+D        172.16.5.0 [90/130816] via 10.1.1.2, 2d01h, GigabitEthernet0/1'''
+
+
+def rows(table):
+    return [tuple(table.record(row).values()) for row in range(len(table))]
+
+
+def test_routes_one_row_per_path():
+    assert rows(show_parsers.parse_routes(ROUTES)) == [
+        ('S*', '0.0.0.0/0', 1, 0, '10.1.1.254', '', ''),
+        ('C', '10.1.1.0/24', None, None, '', '', 'GigabitEthernet0/1'),
+        ('L', '10.1.1.1/32', None, None, '', '', 'GigabitEthernet0/1'),
+        ('O E2', '192.168.100.0/24', 110, 20, '10.1.1.2', '00:01:02', 'GigabitEthernet0/1'),
+        ('O E2', '192.168.100.0/24', 110, 20, '10.1.1.3', '00:01:02', 'GigabitEthernet0/1'),
+        ('D', '172.16.5.0/24', 90, 130816, '10.1.1.2', '2d01h', 'GigabitEthernet0/1')]
+
+
+def test_a_wrapped_route_keeps_its_own_prefix():
+    index = RouteIndex(show_parsers.parse_routes(ROUTES))
+    assert [record['next hop'] for record in index.lookup('192.168.100.7')] == ['10.1.1.2', '10.1.1.3']
+    assert [record['code'] for record in index.lookup('10.1.1.9')] == ['C']
+    assert [record['prefix'] for record in index.lookup('8.8.8.8')] == ['0.0.0.0/0']
+
+
+def test_an_index_from_cached_output_is_as_old_as_the_output():
+    device = {'device_type': 'cisco_ios', 'ip': '10.0.0.1'}
+    index = route_index.store(device, show_parsers.parse_routes(ROUTES), datetime.now() - timedelta(seconds=300))
+    assert route_index.cached(device) is index
+    assert 299 < index.age() < 310
+    route_index.forget(device)
@@ -0,0 +1,230 @@
+import json
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic, time
+
+__author__ = "Jason Hernandez"
+__copyright__ = "Copyright 2018"
+__credits__ = ["KTByers - Netmiko", "PyQt5"]
+__license__ = "MIT"
+__version__ = "1.0"
+__email__ = "JThern@github"
+
+'''Where the time goes in a device operation.  Each phase (connect, auth, prompt, enable, a command, a config
+chunk, disconnect) is recorded as a span with its device, duration and bytes.  The last RING_SIZE spans are kept
+for the Profile tab and the JSON export, and every span also goes into per-phase histograms that only ever count
+up, which is what Prometheus wants from /metrics.  No Qt in here.'''
+
+RING_SIZE = 10000  # spans kept
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)  # seconds, histogram upper bounds
+METRICS_PORT = 9464  # the HTTP endpoint only listens on 127.0.0.1
+PHASES = ('connect', 'auth', 'prompt', 'enable', 'command', 'config', 'disconnect')
+
+NETMIKO_PHASES = {  # netmiko connection methods timed by traced(), and their phase
+    'establish_connection': 'connect',  # socket or serial port open, and login (SSH logs in here)
+    'telnet_login': 'auth',  # called from inside establish_connection, so inside its connect span
+    'serial_login': 'auth',
+    'session_preparation': 'prompt',  # find the prompt, paging off
+    'enable': 'enable',
+    'send_command': 'command',
+    'disconnect': 'disconnect',
+}
+
+
+class Tracer:
+    """ The span ring buffer and the histograms. """
+
+    def __init__(self, size=RING_SIZE):
+        """ Initialise an empty tracer. """
+
+        self.spans = deque(maxlen=size)
+        self._stats = {}  # phase -> {'count', 'errors', 'seconds', 'bytes', 'buckets'}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, phase, device='', detail=''):
+        """ Time the block as a span.  Yields the span so the block can set
+        its 'bytes', an exception marks it failed and is passed on.
+        """
+
+        entry = {'phase': phase, 'device': device, 'detail': detail, 'start': time(), 'seconds': 0.0,
+                 'bytes': 0, 'ok': True}
+        started = monotonic()
+        try:
+            yield entry
+        except Exception:
+            entry['ok'] = False
+            raise
+        finally:
+            entry['seconds'] = monotonic() - started
+            self.add(entry)
+
+    def add(self, entry):
+        with self._lock:
+            self.spans.append(entry)
+            stats = self._stats.setdefault(entry['phase'], {'count': 0, 'errors': 0, 'seconds': 0.0, 'bytes': 0,
+                                                            'buckets': [0] * len(BUCKETS)})
+            stats['count'] += 1
+            stats['errors'] += not entry['ok']
+            stats['seconds'] += entry['seconds']
+            stats['bytes'] += entry['bytes']
+            for number, bound in enumerate(BUCKETS):
+                if entry['seconds'] <= bound:
+                    stats['buckets'][number] += 1  # cumulative, like Prometheus buckets
+
+    def recent(self, phase=None):
+        """ The spans in the ring, oldest first, of one phase or all of them. """
+
+        with self._lock:
+            return [entry for entry in self.spans if phase is None or entry['phase'] == phase]
+
+    def stats(self):
+        """ {phase: {'count', 'errors', 'seconds', 'bytes', 'buckets'}} since the start. """
+
+        with self._lock:
+            return {phase: dict(stats, buckets=list(stats['buckets'])) for phase, stats in self._stats.items()}
+
+    def clear(self):
+        """ Forget the spans in the ring.  The histograms keep counting,
+        Prometheus counters must never go down.
+        """
+
+        with self._lock:
+            self.spans.clear()
+
+    def summary(self):
+        """ A row per phase from the spans in the ring: (phase, count,
+        errors, median ms, 90th percentile ms, max ms, bytes).
+        """
+
+        rows = []
+        spans = self.recent()
+        for phase in sorted({entry['phase'] for entry in spans}, key=_phase_order):
+            times = sorted(entry['seconds'] for entry in spans if entry['phase'] == phase)
+            phase_spans = [entry for entry in spans if entry['phase'] == phase]
+            rows.append((phase, len(times), sum(not entry['ok'] for entry in phase_spans),
+                         round(times[len(times) // 2] * 1000), round(times[int(len(times) * 0.9)] * 1000),
+                         round(times[-1] * 1000), sum(entry['bytes'] for entry in phase_spans)))
+        return rows
+
+    def to_json(self):
+        return json.dumps(self.recent(), indent=1)
+
+    def prometheus(self):
+        """ The histograms in the Prometheus text format. """
+
+        lines = ['# HELP snap_phase_seconds Time spent in each phase of a device operation.',
+                 '# TYPE snap_phase_seconds histogram']
+        stats = self.stats()
+        for phase in sorted(stats, key=_phase_order):
+            counts = stats[phase]
+            for bound, count in zip(BUCKETS, counts['buckets']):
+                lines.append(f'snap_phase_seconds_bucket{{phase="{phase}",le="{bound}"}} {count}')
+            lines.append(f'snap_phase_seconds_bucket{{phase="{phase}",le="+Inf"}} {counts["count"]}')
+            lines.append(f'snap_phase_seconds_sum{{phase="{phase}"}} {counts["seconds"]:.6f}')
+            lines.append(f'snap_phase_seconds_count{{phase="{phase}"}} {counts["count"]}')
+        for name, key, text in (('snap_phase_bytes_total', 'bytes', 'Bytes sent or received in each phase.'),
+                                ('snap_phase_errors_total', 'errors', 'Spans in each phase that failed.')):
+            lines += [f'# HELP {name} {text}', f'# TYPE {name} counter']
+            lines += [f'{name}{{phase="{phase}"}} {stats[phase][key]}' for phase in sorted(stats, key=_phase_order)]
+        return '\n'.join(lines) + '\n'
+
+
+def histogram(seconds):
+    """ How many of the durations fall in each of BUCKETS, and how many are past the last. """
+
+    counts = [0] * (len(BUCKETS) + 1)
+    for value in seconds:
+        counts[bisect_left(BUCKETS, value)] += 1
+    return counts
+
+
+def bucket_label(number):
+    """ '25ms', '2.5s' or '>60s' for a histogram() count. """
+
+    if number == len(BUCKETS):
+        return f'>{BUCKETS[-1]}s'
+    bound = BUCKETS[number]
+    return f'{bound * 1000:g}ms' if bound < 1 else f'{bound:g}s'
+
+
+def _phase_order(phase):
+    return PHASES.index(phase) if phase in PHASES else len(PHASES)
+
+
+def _size(result):
+    return len(result) if isinstance(result, (str, bytes)) else 0
+
+
+def timed(method, phase, tracer):
+    """ A connection class's method wrapped in a span per call, for the
+    connection's trace_name.  A str the method returns counts as the span's
+    bytes, a command is the span's detail.
+    """
+
+    @wraps(method)
+    def call(self, *args, **kwargs):
+        detail = str(args[0] if args else kwargs.get('command_string', '')) if phase == 'command' else ''
+        with tracer.span(phase, self.trace_name, detail) as entry:
+            result = method(self, *args, **kwargs)
+            entry['bytes'] = _size(result)
+            return result
+    return call
+
+
+def traced(connection_class, device, tracer=None):
+    """ A subclass of a netmiko connection class whose NETMIKO_PHASES are
+    timed, for the device named device.  Its __init__ connects like the
+    class's own, so the connect and login are timed too.
+    """
+
+    tracer = tracer or default_tracer
+    methods = {name: timed(getattr(connection_class, name), phase, tracer)
+               for name, phase in NETMIKO_PHASES.items() if hasattr(connection_class, name)}
+    return type(connection_class.__name__, (connection_class,), dict(methods, trace_name=device))
+
+
+def device_of(router):
+    """ The device name a traced() connection has, '' if it isn't one. """
+
+    return getattr(router, 'trace_name', '')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        tracer = self.server.tracer
+        if self.path == '/metrics':
+            body, kind = tracer.prometheus(), 'text/plain; version=0.0.4'
+        elif self.path in ('/spans', '/spans.json'):
+            body, kind = tracer.to_json(), 'application/json'
+        else:
+            self.send_error(404, 'Try /metrics or /spans')
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', kind)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass  # a scrape every 15 seconds would fill the console
+
+
+def serve(port=METRICS_PORT, tracer=None, host='127.0.0.1'):
+    """ Serve /metrics (Prometheus) and /spans (JSON) on a daemon thread.
+    Returns the server, shutdown() and server_close() stop it.
+    """
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.tracer = tracer or default_tracer
+    threading.Thread(target=server.serve_forever, name='snap-metrics', daemon=True).start()
+    return server
+
+
+default_tracer = Tracer()  # shared by every tab